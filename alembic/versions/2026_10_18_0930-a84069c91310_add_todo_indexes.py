@@ -0,0 +1,64 @@
+"""add todo indexes
+
+Revision ID: a84069c91310
+Revises: 75f5ed60fe36
+Create Date: 2026-10-18 09:30:12.418273
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a84069c91310"
+down_revision: Union[str, None] = "75f5ed60fe36"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 稼働中のテーブルをロックしないよう、トランザクション外で並行して作成する
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_todos_user_id_id",
+            "todos",
+            ["user_id", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_todos_user_id_done_due_date",
+            "todos",
+            ["user_id", "done", "due_date"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_todos_user_id_due_date_undone",
+            "todos",
+            ["user_id", "due_date", "id"],
+            unique=False,
+            postgresql_where=sa.text("NOT done"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_todos_user_id_due_date_undone",
+            table_name="todos",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_todos_user_id_done_due_date",
+            table_name="todos",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_todos_user_id_id",
+            table_name="todos",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,36 @@
+"""add users todo_version
+
+Revision ID: 5c1f0e7b92d4
+Revises: a84069c91310
+Create Date: 2026-10-18 10:00:41.906518
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5c1f0e7b92d4"
+down_revision: Union[str, None] = "a84069c91310"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 定数のデフォルト値のため、テーブルを書き換えずに追加される
+    op.add_column(
+        "users",
+        sa.Column(
+            "todo_version",
+            sa.BigInteger(),
+            server_default=sa.text("0"),
+            nullable=False,
+            comment="Todoのバージョン",
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("users", "todo_version")
@@ -0,0 +1,57 @@
+"""add todos search_vector
+
+Revision ID: 13a8284a3028
+Revises: 5c1f0e7b92d4
+Create Date: 2026-10-18 10:30:28.054355
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "13a8284a3028"
+down_revision: Union[str, None] = "5c1f0e7b92d4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 生成列の追加はテーブルを書き換えるため、追加中はtodosテーブルへの書き込みが待たされる
+    op.add_column(
+        "todos",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('simple', title), 'A') || "
+                "setweight(to_tsvector('simple', detail), 'B')",
+                persisted=True,
+            ),
+            nullable=False,
+            comment="全文検索用のベクトル",
+        ),
+    )
+    # 稼働中のテーブルをロックしないよう、トランザクション外で並行して作成する
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_todos_search_vector",
+            "todos",
+            ["search_vector"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_todos_search_vector",
+            table_name="todos",
+            postgresql_concurrently=True,
+        )
+    op.drop_column("todos", "search_vector")
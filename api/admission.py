@@ -0,0 +1,381 @@
+"""同時実行数を制限し、過負荷時にリクエストを破棄するミドルウェアの定義ファイル"""
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Iterator
+
+from starlette import status
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.config import settings
+from api.deadline import get_remaining_seconds
+from api.responses import FastJSONResponse
+from api.route_rules import RouteRules
+
+SHED_QUEUE_FULL: str = "queue_full"
+SHED_EVICTED: str = "evicted"
+SHED_TIMEOUT: str = "timeout"
+
+priority_rules: RouteRules[int] = RouteRules(settings.admission_priorities)
+
+
+@dataclass(order=True)
+class Waiter:
+    """
+    実行を待っているリクエスト
+
+    Attributes:
+    - priority: 優先度(小さいほど優先する)
+    - sequence: 同じ優先度での到着順
+    - future: 実行の可否を受け取るFuture(Noneの場合は実行、文字列の場合は破棄の理由)
+    """
+
+    priority: int
+    sequence: int
+    future: asyncio.Future[str | None] = field(compare=False)
+
+
+@dataclass
+class AdmissionMetrics:
+    """
+    同時実行数の制限の計測値
+
+    Attributes:
+    - admitted: 実行したリクエスト数
+    - shed: 破棄の理由ごとの、破棄したリクエスト数
+    - queue_wait_seconds_total: 実行を待った時間の合計(秒)
+    """
+
+    admitted: int = 0
+    shed: dict[str, int] = field(default_factory=dict)
+    queue_wait_seconds_total: float = 0.0
+
+
+class AdaptiveLimiter:
+    """
+    応答時間に応じて上限を調整する同時実行数の制限
+
+    - 上限に達している場合は、優先度順・到着順の待ち行列で待たせる
+    - 待ち行列が上限に達した場合は、より優先度の低い待ちを破棄して入れ替える
+    - 待ち時間が上限を超えた場合は、処理を行わずに破棄する
+    - 応答時間が目標を超えた場合は上限を倍率で減らし、上限まで使い切っている間は少しずつ増やす(AIMD)
+    - イベントループ内(1ワーカー内)でのみ制限する
+
+    Attributes:
+    - limit: 同時実行数の上限(調整中の値のため小数を含む)
+    - min_limit: 同時実行数の上限の最小値
+    - max_limit: 同時実行数の上限の最大値
+    - max_queue: 待ち行列の最大件数
+    - latency_target_seconds: 応答時間の目標(秒)
+    - decrease_factor: 応答時間が目標を超えた場合に上限に掛ける倍率
+    - in_flight: 実行中のリクエスト数
+    - metrics: 計測値
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        max_queue: int,
+        latency_target_seconds: float,
+        decrease_factor: float,
+    ) -> None:
+        """
+        インスタンスメソッド
+
+        Args:
+        - initial_limit: 同時実行数の上限の初期値
+        - min_limit: 同時実行数の上限の最小値
+        - max_limit: 同時実行数の上限の最大値
+        - max_queue: 待ち行列の最大件数
+        - latency_target_seconds: 応答時間の目標(秒)
+        - decrease_factor: 応答時間が目標を超えた場合に上限に掛ける倍率
+        """
+        self.min_limit: int = max(min_limit, 1)
+        self.max_limit: int = max(max_limit, self.min_limit)
+        self.limit: float = float(
+            min(max(initial_limit, self.min_limit), self.max_limit)
+        )
+        self.max_queue: int = max_queue
+        self.latency_target_seconds: float = latency_target_seconds
+        self.decrease_factor: float = decrease_factor
+        self.in_flight: int = 0
+        self.metrics: AdmissionMetrics = AdmissionMetrics()
+        self._queue: list[Waiter] = []
+        self._sequence: Iterator[int] = itertools.count()
+        self._decreased_at: float = 0.0
+
+    @property
+    def queued(self) -> int:
+        """
+        待っているリクエスト数
+
+        Returns:
+        - 待っているリクエスト数
+        """
+        return len(self._queue)
+
+    def _shed(self, reason: str) -> str:
+        """
+        破棄したリクエストを記録
+
+        Args:
+        - reason: 破棄の理由
+
+        Returns:
+        - 破棄の理由
+        """
+        self.metrics.shed[reason] = self.metrics.shed.get(reason, 0) + 1
+        return reason
+
+    def _remove(self, waiter: Waiter) -> None:
+        """
+        待ち行列から待ちを取り除く
+
+        - 待ち行列は最大件数までのため、取り除いた後にヒープを作り直す
+
+        Args:
+        - waiter: 取り除く待ち
+        """
+        self._queue.remove(waiter)
+        heapq.heapify(self._queue)
+
+    def _evict(self, priority: int) -> bool:
+        """
+        待ち行列から、指定した優先度より低い待ちのうち最も低い待ちを破棄
+
+        Args:
+        - priority: 新しく待つリクエストの優先度
+
+        Returns:
+        - 破棄できた場合はTrue、より低い優先度の待ちがない場合はFalse
+        """
+        if not self._queue:
+            return False
+        worst: Waiter = max(self._queue)
+        if worst.priority <= priority:
+            return False
+        self._remove(worst)
+        worst.future.set_result(self._shed(SHED_EVICTED))
+        return True
+
+    def _dispatch(self) -> None:
+        """
+        上限に空きがある分だけ、待ち行列の先頭から実行させる
+        """
+        while self._queue and self.in_flight < int(self.limit):
+            waiter: Waiter = heapq.heappop(self._queue)
+            waiter.future.set_result(None)
+            self.in_flight += 1
+
+    async def acquire(
+        self,
+        priority: int,
+        timeout_seconds: float,
+    ) -> str | None:
+        """
+        実行枠を確保
+
+        Args:
+        - priority: 優先度(小さいほど優先する)
+        - timeout_seconds: 待ち時間の上限(秒)
+
+        Returns:
+        - 確保できた場合はNone、破棄した場合はその理由
+        """
+        if self.in_flight < int(self.limit) and not self._queue:
+            self.in_flight += 1
+            self.metrics.admitted += 1
+            return None
+        if len(self._queue) >= self.max_queue and not self._evict(priority):
+            return self._shed(SHED_QUEUE_FULL)
+
+        waiter: Waiter = Waiter(
+            priority,
+            next(self._sequence),
+            asyncio.get_running_loop().create_future(),
+        )
+        heapq.heappush(self._queue, waiter)
+        started_at: float = time.perf_counter()
+        try:
+            await asyncio.wait({waiter.future}, timeout=timeout_seconds)
+        except BaseException:
+            # 実行枠を確保した直後に呼び出し元がキャンセルされた場合は、枠を返す
+            if waiter.future.done() and waiter.future.result() is None:
+                self.release(None)
+            elif not waiter.future.done():
+                waiter.future.cancel()
+                self._remove(waiter)
+            raise
+        finally:
+            self.metrics.queue_wait_seconds_total += (
+                time.perf_counter() - started_at
+            )
+
+        if not waiter.future.done():
+            waiter.future.cancel()
+            self._remove(waiter)
+            return self._shed(SHED_TIMEOUT)
+        result: str | None = waiter.future.result()
+        if result is None:
+            self.metrics.admitted += 1
+        return result
+
+    def release(self, latency_seconds: float | None) -> None:
+        """
+        実行枠を返し、応答時間から上限を調整
+
+        Args:
+        - latency_seconds: 実行開始から応答開始までの時間(秒)、
+          実行していない場合はNone(上限を調整しない)
+        """
+        self.in_flight -= 1
+        if latency_seconds is not None:
+            self._adjust(latency_seconds)
+        self._dispatch()
+
+    def _adjust(self, latency_seconds: float) -> None:
+        """
+        応答時間から上限を調整
+
+        - 目標を超えた場合は、目標時間あたり1回まで上限を倍率で減らす
+        - 上限まで使い切っていた場合は、上限の逆数ずつ増やす(上限分の応答ごとに1増える)
+
+        Args:
+        - latency_seconds: 実行開始から応答開始までの時間(秒)
+        """
+        now: float = time.monotonic()
+        if latency_seconds > self.latency_target_seconds:
+            if now - self._decreased_at >= self.latency_target_seconds:
+                self.limit = max(
+                    float(self.min_limit),
+                    self.limit * self.decrease_factor,
+                )
+                self._decreased_at = now
+        elif self.in_flight + 1 >= int(self.limit):
+            self.limit = min(
+                float(self.max_limit),
+                self.limit + 1 / self.limit,
+            )
+
+
+def get_priority(scope: Scope) -> int:
+    """
+    リクエストの優先度を取得
+
+    - 「メソッド パス」(パスパラメータを含む)、メソッドの順に設定を参照し、
+      どちらもない場合は既定の優先度とする
+
+    Args:
+    - scope: リクエストの情報
+
+    Returns:
+    - 優先度(小さいほど優先する)
+    """
+    return priority_rules.get(
+        scope["method"],
+        scope["path"],
+        settings.admission_default_priority,
+    )
+
+
+limiter: AdaptiveLimiter = AdaptiveLimiter(
+    settings.admission_initial_limit,
+    settings.admission_min_limit,
+    settings.admission_max_limit,
+    settings.admission_max_queue,
+    settings.admission_latency_target_seconds,
+    settings.admission_decrease_factor,
+)
+
+
+class AdmissionMiddleware:
+    """
+    同時実行数を制限するASGIミドルウェア
+
+    - DBのコネクションプールを待つリクエストが積み上がる前に、入口で実行数を制限する
+    - 破棄したリクエストには、処理を行わずに503とRetry-Afterを返す
+    - ヘルスチェックなどの除外パスは制限しない
+    - リクエストに期限がある場合は、期限を過ぎるまでに実行できない待ちも破棄する
+    - 応答時間はレスポンスの送信開始までとし、ストリーミングの送信時間は含めない
+    - 応答せずに終わったリクエストは、応答時間が目標を超えたものとして上限を減らす
+
+    Attributes:
+    - app: ASGIアプリケーション
+    - limiter: 同時実行数の制限
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiter: AdaptiveLimiter = limiter,
+    ) -> None:
+        """
+        インスタンスメソッド
+
+        Args:
+        - app: ASGIアプリケーション
+        - limiter: 同時実行数の制限
+        """
+        self.app: ASGIApp = app
+        self.limiter: AdaptiveLimiter = limiter
+
+    async def __call__(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        """
+        リクエストを処理
+
+        Args:
+        - scope: リクエストの情報
+        - receive: メッセージを受信する関数
+        - send: メッセージを送信する関数
+        """
+        if (
+            scope["type"] != "http"
+            or scope["path"] in settings.admission_exempt_paths
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        queue_timeout_seconds: float = settings.admission_queue_timeout_seconds
+        remaining_seconds: float | None = get_remaining_seconds()
+        if remaining_seconds is not None:
+            queue_timeout_seconds = min(
+                queue_timeout_seconds,
+                max(remaining_seconds, 0.0),
+            )
+        shed_reason: str | None = await self.limiter.acquire(
+            get_priority(scope),
+            queue_timeout_seconds,
+        )
+        if shed_reason is not None:
+            response: FastJSONResponse = FastJSONResponse(
+                {"detail": "Service Unavailable"},
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(settings.admission_retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        started_at: float = time.perf_counter()
+        latency_seconds: float | None = None
+
+        async def send_with_latency(message: Message) -> None:
+            nonlocal latency_seconds
+            if message["type"] == "http.response.start":
+                latency_seconds = time.perf_counter() - started_at
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_latency)
+        finally:
+            # 例外や期限切れのキャンセルで応答せずに終わった場合は、
+            # 過負荷の兆候として目標を超えた応答時間とみなす
+            self.limiter.release(
+                latency_seconds if latency_seconds is not None else math.inf
+            )
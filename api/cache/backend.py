@@ -0,0 +1,74 @@
+"""キャッシュのバックエンドの共通インターフェースの定義ファイル"""
+from abc import ABC, abstractmethod
+
+
+class CacheError(Exception):
+    """
+    キャッシュのバックエンドの操作に失敗した場合の例外
+
+    - 呼び出し側はキャッシュなしとして処理を続ける
+    """
+
+
+class CacheBackend(ABC):
+    """
+    キャッシュのバックエンド
+
+    - キーと値はどちらもバイト列で扱い、値のエンコードは呼び出し側で行う
+    - 操作に失敗した場合は、CacheErrorを送出する
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None:
+        """
+        値を取得
+
+        Args:
+        - key: キー
+
+        Returns:
+        - 値、存在しないか失効している場合はNone
+        """
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        """
+        値を保存
+
+        Args:
+        - key: キー
+        - value: 値
+        - ttl_seconds: 保持する秒数
+        """
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        """
+        値を削除
+
+        Args:
+        - keys: キーの一覧
+        """
+
+    async def close(self) -> None:
+        """
+        接続を閉じる
+        """
+
+
+class NullBackend(CacheBackend):
+    """
+    何も保存しないバックエンド
+
+    - キャッシュを無効にする場合に使用する
+    """
+
+    async def get(self, key: str) -> bytes | None:
+        """常にNoneを返す"""
+        return None
+
+    async def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        """何もしない"""
+
+    async def delete(self, *keys: str) -> None:
+        """何もしない"""
@@ -0,0 +1,234 @@
+"""アプリケーションで使用するキャッシュの定義ファイル"""
+import logging
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+from api.cache.backend import CacheBackend, CacheError, NullBackend
+from api.cache.memory import MemoryBackend
+from api.cache.redis import RedisBackend
+from api.cache.single_flight import SingleFlight
+from api.config import settings
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheMetrics:
+    """
+    キャッシュの計測値
+
+    Attributes:
+    - hits: 名前空間ごとのヒット数
+    - misses: 名前空間ごとのミス数
+    - coalesced: 名前空間ごとの、実行中の取得の結果を共有した数
+    - errors: 名前空間ごとの、バックエンドの操作に失敗した数
+    """
+
+    hits: dict[str, int] = field(default_factory=dict)
+    misses: dict[str, int] = field(default_factory=dict)
+    coalesced: dict[str, int] = field(default_factory=dict)
+    errors: dict[str, int] = field(default_factory=dict)
+
+    @staticmethod
+    def increment(counts: dict[str, int], namespace: str) -> None:
+        """
+        名前空間の件数を1増やす
+
+        Args:
+        - counts: 名前空間ごとの件数
+        - namespace: 名前空間
+        """
+        counts[namespace] = counts.get(namespace, 0) + 1
+
+
+class Cache:
+    """
+    キャッシュ
+
+    - 名前空間とキーから、バックエンドのキーを生成する
+    - 同じキーの同時の取得は、1回のバックエンドへの問い合わせと読み込みにまとめる
+    - バックエンドの操作に失敗した場合は、キャッシュなしとして処理を続ける
+
+    Attributes:
+    - backend: キャッシュのバックエンド
+    - prefix: バックエンドのキーの接頭辞
+    - metrics: キャッシュの計測値
+    """
+
+    def __init__(self, backend: CacheBackend, prefix: str) -> None:
+        """
+        インスタンスメソッド
+
+        Args:
+        - backend: キャッシュのバックエンド
+        - prefix: バックエンドのキーの接頭辞
+        """
+        self.backend: CacheBackend = backend
+        self.prefix: str = prefix
+        self.metrics: CacheMetrics = CacheMetrics()
+        self._single_flight: SingleFlight = SingleFlight()
+
+    @property
+    def enabled(self) -> bool:
+        """
+        キャッシュが有効か
+
+        Returns:
+        - True/False
+        """
+        return not isinstance(self.backend, NullBackend)
+
+    def build_key(self, namespace: str, key: str) -> str:
+        """
+        バックエンドのキーを生成
+
+        Args:
+        - namespace: 名前空間
+        - key: 名前空間内のキー
+
+        Returns:
+        - バックエンドのキー
+        """
+        return f"{self.prefix}:{namespace}:{key}"
+
+    async def get_or_set(
+        self,
+        namespace: str,
+        key: str,
+        loader: Callable[[], Awaitable[bytes]],
+        ttl_seconds: float,
+    ) -> bytes:
+        """
+        値を取得し、存在しない場合は読み込んで保存
+
+        - 同じキーの同時の取得は、キャッシュが無効の場合も1回の読み込みにまとめる
+        - キャッシュが無効の場合は、常に読み込む
+        - 読み込みで例外が発生した場合は、保存せずにそのまま送出する
+
+        Args:
+        - namespace: 名前空間
+        - key: 名前空間内のキー
+        - loader: 値を読み込む関数
+        - ttl_seconds: 保持する秒数
+
+        Returns:
+        - 値
+        """
+        backend_key: str = self.build_key(namespace, key)
+
+        async def get_or_load() -> bytes:
+            if not self.enabled:
+                return await loader()
+            value: bytes | None = await self._get(namespace, backend_key)
+            if value is not None:
+                CacheMetrics.increment(self.metrics.hits, namespace)
+                return value
+            CacheMetrics.increment(self.metrics.misses, namespace)
+            value = await loader()
+            await self._set(namespace, backend_key, value, ttl_seconds)
+            return value
+
+        value, shared = await self._single_flight.do(backend_key, get_or_load)
+        if shared:
+            CacheMetrics.increment(self.metrics.coalesced, namespace)
+        return value
+
+    def forget(self, namespace: str, key: str) -> None:
+        """
+        実行中の取得を切り離す
+
+        - 以降の取得は、実行中の読み込みを待たずに新しく読み込む
+        - 更新前に開始した読み込みの結果を、更新後の呼び出し元に共有しないために使う
+
+        Args:
+        - namespace: 名前空間
+        - key: 名前空間内のキー
+        """
+        self._single_flight.forget(self.build_key(namespace, key))
+
+    async def delete(self, namespace: str, *keys: str) -> None:
+        """
+        値を削除
+
+        Args:
+        - namespace: 名前空間
+        - keys: 名前空間内のキーの一覧
+        """
+        if not self.enabled or not keys:
+            return
+        try:
+            await self.backend.delete(
+                *(self.build_key(namespace, key) for key in keys)
+            )
+        except CacheError as e:
+            CacheMetrics.increment(self.metrics.errors, namespace)
+            logger.warning(f"キャッシュを削除できませんでした: {e!r}")
+
+    async def _get(self, namespace: str, backend_key: str) -> bytes | None:
+        """
+        バックエンドから値を取得
+
+        Args:
+        - namespace: 名前空間
+        - backend_key: バックエンドのキー
+
+        Returns:
+        - 値、存在しないか取得に失敗した場合はNone
+        """
+        try:
+            return await self.backend.get(backend_key)
+        except CacheError as e:
+            CacheMetrics.increment(self.metrics.errors, namespace)
+            logger.warning(f"キャッシュを取得できませんでした: {e!r}")
+            return None
+
+    async def _set(
+        self,
+        namespace: str,
+        backend_key: str,
+        value: bytes,
+        ttl_seconds: float,
+    ) -> None:
+        """
+        バックエンドに値を保存
+
+        Args:
+        - namespace: 名前空間
+        - backend_key: バックエンドのキー
+        - value: 値
+        - ttl_seconds: 保持する秒数
+        """
+        try:
+            await self.backend.set(backend_key, value, ttl_seconds)
+        except CacheError as e:
+            CacheMetrics.increment(self.metrics.errors, namespace)
+            logger.warning(f"キャッシュを保存できませんでした: {e!r}")
+
+    async def close(self) -> None:
+        """
+        バックエンドの接続を閉じる
+        """
+        await self.backend.close()
+
+
+def create_backend() -> CacheBackend:
+    """
+    環境変数で指定したキャッシュのバックエンドを生成
+
+    Returns:
+    - キャッシュのバックエンド
+    """
+    if settings.cache_backend == "none":
+        return NullBackend()
+    if settings.cache_backend == "memory":
+        return MemoryBackend(settings.cache_memory_max_size)
+    if settings.cache_backend == "redis":
+        return RedisBackend(
+            settings.cache_redis_url,
+            settings.cache_redis_pool_size,
+            settings.cache_redis_timeout_seconds,
+        )
+    raise ValueError(f"Unknown cache backend: {settings.cache_backend}")
+
+
+cache: Cache = Cache(create_backend(), settings.cache_key_prefix)
@@ -0,0 +1,74 @@
+"""プロセス内のキャッシュのバックエンドの定義ファイル"""
+import time
+from collections import OrderedDict
+
+from api.cache.backend import CacheBackend
+
+
+class MemoryBackend(CacheBackend):
+    """
+    プロセス内のLRUキャッシュ
+
+    - 上限件数を超えた場合は、最も参照されていないエントリから削除する
+    - ワーカーごとに保持するため、他のワーカーとは共有されない
+    """
+
+    def __init__(self, max_size: int) -> None:
+        """
+        インスタンスメソッド
+
+        Args:
+        - max_size: 保持する最大件数
+        """
+        self.max_size: int = max_size
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+
+    async def get(self, key: str) -> bytes | None:
+        """
+        値を取得
+
+        Args:
+        - key: キー
+
+        Returns:
+        - 値、存在しないか失効している場合はNone
+        """
+        entry: tuple[float, bytes] | None = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        """
+        値を保存
+
+        Args:
+        - key: キー
+        - value: 値
+        - ttl_seconds: 保持する秒数
+        """
+        if self.max_size <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def delete(self, *keys: str) -> None:
+        """
+        値を削除
+
+        Args:
+        - keys: キーの一覧
+        """
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """全エントリを削除"""
+        self._entries.clear()
@@ -0,0 +1,279 @@
+"""Redisプロトコルのキャッシュのバックエンドの定義ファイル
+
+- Redisのクライアントライブラリには依存せず、RESP(v2)を直接送受信する
+- キャッシュに必要なコマンド(GET・SET・DEL・AUTH・SELECT・PING)のみ扱う
+"""
+import asyncio
+from typing import Any
+from urllib.parse import unquote, urlsplit
+
+from api.cache.backend import CacheBackend, CacheError
+
+
+class RedisError(CacheError):
+    """
+    Redisとの通信に失敗した場合の例外
+    """
+
+
+class RedisReplyError(RedisError):
+    """
+    Redisがエラーを返した場合の例外
+
+    - 通信自体は成功しているため、接続は再利用できる
+    """
+
+
+def encode_command(*args: str | bytes | int) -> bytes:
+    """
+    コマンドをRESPの配列にエンコード
+
+    Args:
+    - args: コマンド名と引数
+
+    Returns:
+    - 送信するバイト列
+    """
+    parts: list[bytes] = [f"*{len(args)}\r\n".encode()]
+    for arg in args:
+        value: bytes = arg if isinstance(arg, bytes) else str(arg).encode()
+        parts.append(f"${len(value)}\r\n".encode())
+        parts.append(value + b"\r\n")
+    return b"".join(parts)
+
+
+async def read_reply(reader: asyncio.StreamReader) -> Any:
+    """
+    RESPの応答を読み込む
+
+    Args:
+    - reader: 読み込み用のストリーム
+
+    Returns:
+    - 応答(文字列・整数・バイト列・None・配列)
+    """
+    line: bytes = await reader.readline()
+    if not line.endswith(b"\r\n"):
+        raise RedisError("Connection closed")
+    prefix, payload = line[:1], line[1:-2]
+    if prefix == b"+":
+        return payload.decode()
+    if prefix == b"-":
+        raise RedisReplyError(payload.decode())
+    if prefix == b":":
+        return int(payload)
+    if prefix == b"$":
+        length: int = int(payload)
+        if length < 0:
+            return None
+        return (await reader.readexactly(length + 2))[:-2]
+    if prefix == b"*":
+        count: int = int(payload)
+        if count < 0:
+            return None
+        return [await read_reply(reader) for _ in range(count)]
+    raise RedisError(f"Unexpected reply: {line!r}")
+
+
+class RedisConnection:
+    """
+    Redisへの1つの接続
+
+    Attributes:
+    - reader: 読み込み用のストリーム
+    - writer: 書き込み用のストリーム
+    """
+
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        """
+        インスタンスメソッド
+
+        Args:
+        - reader: 読み込み用のストリーム
+        - writer: 書き込み用のストリーム
+        """
+        self.reader: asyncio.StreamReader = reader
+        self.writer: asyncio.StreamWriter = writer
+
+    async def execute(self, *args: str | bytes | int) -> Any:
+        """
+        コマンドを実行
+
+        Args:
+        - args: コマンド名と引数
+
+        Returns:
+        - 応答
+        """
+        self.writer.write(encode_command(*args))
+        await self.writer.drain()
+        return await read_reply(self.reader)
+
+    def close(self) -> None:
+        """
+        接続を閉じる
+        """
+        self.writer.close()
+
+
+class RedisBackend(CacheBackend):
+    """
+    Redisプロトコルのキャッシュ
+
+    - 全ワーカーで共有するキャッシュとして使用する
+    - 接続はプールし、上限数まで必要に応じて作成する
+    - 通信に失敗した接続は破棄し、次のコマンドで新しく接続する
+
+    Attributes:
+    - host: ホスト名
+    - port: ポート番号
+    - password: パスワード
+    - db: データベース番号
+    - pool_size: 接続数の上限
+    - timeout_seconds: 接続・コマンドの待ち時間(秒)
+    """
+
+    def __init__(
+        self,
+        url: str,
+        pool_size: int,
+        timeout_seconds: float,
+    ) -> None:
+        """
+        インスタンスメソッド
+
+        Args:
+        - url: 接続先のURL(redis://[:password@]host[:port][/db])
+        - pool_size: 接続数の上限
+        - timeout_seconds: 接続・コマンドの待ち時間(秒)
+        """
+        parsed = urlsplit(url)
+        self.host: str = parsed.hostname or "localhost"
+        self.port: int = parsed.port or 6379
+        self.password: str | None = (
+            unquote(parsed.password) if parsed.password else None
+        )
+        self.db: int = int(parsed.path.lstrip("/") or 0)
+        self.pool_size: int = pool_size
+        self.timeout_seconds: float = timeout_seconds
+        self._idle: list[RedisConnection] = []
+        self._semaphore: asyncio.Semaphore = asyncio.Semaphore(pool_size)
+
+    async def _connect(self) -> RedisConnection:
+        """
+        新しく接続し、認証とデータベースの選択を行う
+
+        Returns:
+        - Redisへの接続
+        """
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        conn: RedisConnection = RedisConnection(reader, writer)
+        try:
+            if self.password is not None:
+                await conn.execute("AUTH", self.password)
+            if self.db:
+                await conn.execute("SELECT", self.db)
+        except BaseException:
+            conn.close()
+            raise
+        return conn
+
+    async def execute(self, *args: str | bytes | int) -> Any:
+        """
+        プールの接続でコマンドを実行
+
+        Args:
+        - args: コマンド名と引数
+
+        Returns:
+        - 応答
+        """
+        async with self._semaphore:
+            conn: RedisConnection | None = (
+                self._idle.pop() if self._idle else None
+            )
+            try:
+                async with asyncio.timeout(self.timeout_seconds):
+                    if conn is None:
+                        conn = await self._connect()
+                    reply: Any = await conn.execute(*args)
+            except RedisReplyError:
+                assert conn is not None
+                self._idle.append(conn)
+                raise
+            except (
+                EOFError,
+                OSError,
+                TimeoutError,
+                ValueError,
+                RedisError,
+            ) as e:
+                if conn is not None:
+                    conn.close()
+                raise RedisError(repr(e)) from e
+            except BaseException:
+                # キャンセルなどで応答を読み切れていない接続は再利用しない
+                if conn is not None:
+                    conn.close()
+                raise
+            self._idle.append(conn)
+            return reply
+
+    async def ping(self) -> bool:
+        """
+        疎通を確認
+
+        Returns:
+        - True/False
+        """
+        return await self.execute("PING") == "PONG"
+
+    async def get(self, key: str) -> bytes | None:
+        """
+        値を取得
+
+        Args:
+        - key: キー
+
+        Returns:
+        - 値、存在しない場合はNone
+        """
+        return await self.execute("GET", key)
+
+    async def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        """
+        値を保存
+
+        Args:
+        - key: キー
+        - value: 値
+        - ttl_seconds: 保持する秒数
+        """
+        await self.execute(
+            "SET",
+            key,
+            value,
+            "PX",
+            max(int(ttl_seconds * 1000), 1),
+        )
+
+    async def delete(self, *keys: str) -> None:
+        """
+        値を削除
+
+        Args:
+        - keys: キーの一覧
+        """
+        if keys:
+            await self.execute("DEL", *keys)
+
+    async def close(self) -> None:
+        """
+        プールの接続をすべて閉じる
+        """
+        while self._idle:
+            self._idle.pop().close()
@@ -0,0 +1,89 @@
+"""同じキーの同時実行をまとめる処理の定義ファイル"""
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    同じキーの同時実行を1回にまとめる
+
+    - 実行中のキーが呼び出された場合は、実行中の処理の結果(例外を含む)を共有する
+    - 結果は保持せず、処理が完了した後の呼び出しは新しく実行する
+    - 先に実行した呼び出し元がキャンセルされた場合は、待っていた呼び出し元が改めて実行する
+    - イベントループ内(1ワーカー内)でのみまとめる
+    """
+
+    def __init__(self) -> None:
+        """
+        インスタンスメソッド
+        """
+        self._calls: dict[Hashable, asyncio.Future[Any]] = {}
+
+    def __len__(self) -> int:
+        """
+        実行中のキーの数
+
+        Returns:
+        - 実行中のキーの数
+        """
+        return len(self._calls)
+
+    def forget(self, key: Hashable) -> None:
+        """
+        実行中のキーを切り離す
+
+        - 以降の呼び出しは、実行中の処理を待たずに新しく実行する
+        - 更新前に開始した読み込みの結果を、更新後の呼び出し元に共有しないために使う
+
+        Args:
+        - key: 同時実行をまとめるキー
+        """
+        self._calls.pop(key, None)
+
+    async def do(
+        self,
+        key: Hashable,
+        fn: Callable[[], Awaitable[T]],
+    ) -> tuple[T, bool]:
+        """
+        処理を実行、もしくは実行中の処理の結果を待つ
+
+        Args:
+        - key: 同時実行をまとめるキー
+        - fn: 実行する処理
+
+        Returns:
+        - 処理の結果と、実行中の処理の結果を共有したか
+        """
+        future: asyncio.Future[Any] | None = self._calls.get(key)
+        if future is not None:
+            try:
+                return await asyncio.shield(future), True
+            except asyncio.CancelledError:
+                current: asyncio.Task | None = asyncio.current_task()
+                if not future.cancelled() or (
+                    current is not None and current.cancelling()
+                ):
+                    raise
+            return await self.do(key, fn)
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result: T = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # 待っている呼び出し元がいない場合に、未取得の警告を出さない
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            if self._calls.get(key) is future:
+                del self._calls[key]
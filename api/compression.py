@@ -0,0 +1,587 @@
+"""レスポンスを圧縮するミドルウェアの定義ファイル"""
+import hashlib
+import importlib
+import importlib.util
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Protocol
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.config import settings
+from api.settings import constant
+
+
+def import_optional(name: str) -> Any:
+    """
+    インストールされている場合のみモジュールを読み込む
+
+    Args:
+    - name: モジュール名
+
+    Returns:
+    - モジュール、インストールされていない場合はNone
+    """
+    if importlib.util.find_spec(name) is None:
+        return None
+    return importlib.import_module(name)
+
+
+brotli: Any = import_optional("brotli")
+zstandard: Any = import_optional("zstandard")
+
+
+class Compressor(Protocol):
+    """
+    圧縮の共通インターフェース
+    """
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        """
+        データを圧縮
+
+        Args:
+        - data: 圧縮するデータ
+        - flush: 圧縮済みのデータをすべて出力するか
+
+        Returns:
+        - 圧縮したデータ
+        """
+        ...
+
+    def finish(self) -> bytes:
+        """
+        圧縮を終了
+
+        Returns:
+        - 残りの圧縮したデータ
+        """
+        ...
+
+
+class GzipCompressor:
+    """
+    gzipの圧縮
+    """
+
+    def __init__(self) -> None:
+        """
+        インスタンスメソッド
+        """
+        self._compressor: Any = zlib.compressobj(
+            settings.compression_gzip_level,
+            zlib.DEFLATED,
+            zlib.MAX_WBITS | 16,
+        )
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        """データを圧縮(Compressor.compressを参照)"""
+        output: bytes = self._compressor.compress(data)
+        if flush:
+            output += self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        return output
+
+    def finish(self) -> bytes:
+        """圧縮を終了(Compressor.finishを参照)"""
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliCompressor:
+    """
+    brotliの圧縮(brotliがインストールされている場合のみ使用する)
+    """
+
+    def __init__(self) -> None:
+        """
+        インスタンスメソッド
+        """
+        self._compressor: Any = brotli.Compressor(
+            quality=settings.compression_brotli_quality
+        )
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        """データを圧縮(Compressor.compressを参照)"""
+        output: bytes = self._compressor.process(data)
+        if flush:
+            output += self._compressor.flush()
+        return output
+
+    def finish(self) -> bytes:
+        """圧縮を終了(Compressor.finishを参照)"""
+        return self._compressor.finish()
+
+
+class ZstdCompressor:
+    """
+    zstdの圧縮(zstandardがインストールされている場合のみ使用する)
+    """
+
+    def __init__(self) -> None:
+        """
+        インスタンスメソッド
+        """
+        self._compressor: Any = zstandard.ZstdCompressor(
+            level=settings.compression_zstd_level
+        ).compressobj()
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        """データを圧縮(Compressor.compressを参照)"""
+        output: bytes = self._compressor.compress(data)
+        if flush:
+            output += self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        return output
+
+    def finish(self) -> bytes:
+        """圧縮を終了(Compressor.finishを参照)"""
+        return self._compressor.flush()
+
+
+def get_compressors() -> dict[str, Callable[[], Compressor]]:
+    """
+    利用できる圧縮方式を取得
+
+    - 環境変数で指定した優先順のうち、ライブラリがインストールされているものを返す
+
+    Returns:
+    - Content-Encodingの値と、圧縮のクラスの辞書(優先順)
+    """
+    available: dict[str, Callable[[], Compressor]] = {"gzip": GzipCompressor}
+    if brotli is not None:
+        available["br"] = BrotliCompressor
+    if zstandard is not None:
+        available["zstd"] = ZstdCompressor
+    return {
+        encoding: available[encoding]
+        for encoding in settings.compression_encodings
+        if encoding in available
+    }
+
+
+def parse_accept_encoding(accept_encoding: str) -> dict[str, float]:
+    """
+    Accept-Encodingヘッダーを解析
+
+    Args:
+    - accept_encoding: Accept-Encodingヘッダーの値
+
+    Returns:
+    - 圧縮方式(小文字)と重み(q値)の辞書
+    """
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        encoding, _, params = item.partition(";")
+        encoding = encoding.strip().lower()
+        if not encoding:
+            continue
+        weight: float = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[encoding] = weight
+    return weights
+
+
+def select_encoding(
+    accept_encoding: str,
+    encodings: list[str],
+) -> str | None:
+    """
+    レスポンスの圧縮方式を選択
+
+    - 重みが最も大きい方式を選択し、重みが同じ場合はサーバーの優先順で選択する
+    - 重みが0の方式は選択しない
+
+    Args:
+    - accept_encoding: Accept-Encodingヘッダーの値
+    - encodings: 利用できる圧縮方式(優先順)
+
+    Returns:
+    - 圧縮方式、圧縮しない場合はNone
+    """
+    weights: dict[str, float] = parse_accept_encoding(accept_encoding)
+    selected: str | None = None
+    selected_weight: float = 0.0
+    for encoding in encodings:
+        weight: float = weights.get(encoding, weights.get("*", 0.0))
+        if weight > selected_weight:
+            selected, selected_weight = encoding, weight
+    return selected
+
+
+@dataclass
+class CompressionMetrics:
+    """
+    レスポンスの圧縮の計測値
+
+    Attributes:
+    - responses: 圧縮方式ごとの圧縮したレスポンス数
+    - input_bytes: 圧縮方式ごとの圧縮前のバイト数
+    - output_bytes: 圧縮方式ごとの圧縮後のバイト数
+    - cpu_seconds: 圧縮方式ごとの圧縮に要したCPU時間(秒)
+    - cache_hits: 圧縮済みのキャッシュを返したレスポンス数
+    - skipped: 最小サイズ未満のため圧縮しなかったレスポンス数
+    """
+
+    responses: dict[str, int] = field(default_factory=dict)
+    input_bytes: dict[str, int] = field(default_factory=dict)
+    output_bytes: dict[str, int] = field(default_factory=dict)
+    cpu_seconds: dict[str, float] = field(default_factory=dict)
+    cache_hits: int = 0
+    skipped: int = 0
+
+    def observe(
+        self,
+        encoding: str,
+        input_bytes: int,
+        output_bytes: int,
+        cpu_seconds: float,
+    ) -> None:
+        """
+        圧縮したデータの計測値を記録
+
+        Args:
+        - encoding: 圧縮方式
+        - input_bytes: 圧縮前のバイト数
+        - output_bytes: 圧縮後のバイト数
+        - cpu_seconds: 圧縮に要したCPU時間(秒)
+        """
+        self.input_bytes[encoding] = (
+            self.input_bytes.get(encoding, 0) + input_bytes
+        )
+        self.output_bytes[encoding] = (
+            self.output_bytes.get(encoding, 0) + output_bytes
+        )
+        self.cpu_seconds[encoding] = (
+            self.cpu_seconds.get(encoding, 0.0) + cpu_seconds
+        )
+
+
+metrics: CompressionMetrics = CompressionMetrics()
+
+
+class CompressedBodyCache:
+    """
+    圧縮済みのレスポンスボディのキャッシュ
+
+    - 圧縮前のボディのダイジェストと圧縮方式をキーに、圧縮したボディを保持する
+        - ETagはボディのハッシュではなく、同じETagでもボディが異なる場合があるため、
+          ボディそのものから求めたキーを使う
+    - ダイジェストの計算は圧縮より十分に軽いため、同じボディは再度圧縮せずに返せる
+    - 合計サイズが上限を超えた場合は、最も参照されていないエントリから削除する(LRU)
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        """
+        インスタンスメソッド
+
+        Args:
+        - max_bytes: 保持する圧縮済みボディの合計バイト数の上限
+        """
+        self.max_bytes: int = max_bytes
+        self.size: int = 0
+        self._entries: OrderedDict[tuple[bytes, str], bytes] = OrderedDict()
+
+    @staticmethod
+    def digest(body: bytes) -> bytes:
+        """
+        圧縮前のボディのダイジェストを取得
+
+        Args:
+        - body: 圧縮前のボディ
+
+        Returns:
+        - ボディのダイジェスト
+        """
+        return hashlib.blake2b(body, digest_size=16).digest()
+
+    def get(self, digest: bytes, encoding: str) -> bytes | None:
+        """
+        圧縮済みのボディを取得
+
+        Args:
+        - digest: 圧縮前のボディのダイジェスト
+        - encoding: 圧縮方式
+
+        Returns:
+        - 圧縮済みのボディ、存在しない場合はNone
+        """
+        body: bytes | None = self._entries.get((digest, encoding))
+        if body is not None:
+            self._entries.move_to_end((digest, encoding))
+        return body
+
+    def set(self, digest: bytes, encoding: str, body: bytes) -> None:
+        """
+        圧縮済みのボディを保存
+
+        Args:
+        - digest: 圧縮前のボディのダイジェスト
+        - encoding: 圧縮方式
+        - body: 圧縮済みのボディ
+        """
+        if len(body) > self.max_bytes:
+            return
+        previous: bytes | None = self._entries.pop((digest, encoding), None)
+        if previous is not None:
+            self.size -= len(previous)
+        self._entries[(digest, encoding)] = body
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            _, oldest = self._entries.popitem(last=False)
+            self.size -= len(oldest)
+
+    def clear(self) -> None:
+        """全エントリを削除"""
+        self._entries.clear()
+        self.size = 0
+
+
+compressed_body_cache: CompressedBodyCache = CompressedBodyCache(
+    settings.compression_cache_max_bytes
+)
+
+
+def is_compressible(scope: Scope, message: Message) -> bool:
+    """
+    レスポンスを圧縮できるか確認
+
+    - 以下の場合は圧縮しない
+        - HEADリクエスト、ボディのないステータスコード
+        - すでにContent-Encodingが指定されている
+        - Cache-Controlでno-transformが指定されている
+        - 圧縮の効果がないContent-Type(画像など)
+
+    Args:
+    - scope: リクエストの情報
+    - message: レスポンスの開始メッセージ
+
+    Returns:
+    - True/False
+    """
+    if scope["method"] == "HEAD" or message["status"] in (204, 304):
+        return False
+    headers: Headers = Headers(raw=message["headers"])
+    if "content-encoding" in headers:
+        return False
+    if "no-transform" in headers.get("cache-control", "").lower():
+        return False
+    media_type: str = (
+        headers.get("content-type", "").split(";")[0].strip().lower()
+    )
+    return media_type.startswith("text/") or (
+        media_type in constant.COMPRESSIBLE_MEDIA_TYPES
+    )
+
+
+def run_compressor(
+    encoding: str,
+    compressor: Compressor,
+    data: bytes,
+    flush: bool,
+    finish: bool,
+) -> bytes:
+    """
+    データを圧縮し、CPU時間を計測
+
+    Args:
+    - encoding: 圧縮方式
+    - compressor: 圧縮
+    - data: 圧縮するデータ
+    - flush: 圧縮済みのデータをすべて出力するか
+    - finish: 圧縮を終了するか
+
+    Returns:
+    - 圧縮したデータ
+    """
+    started_at: float = time.thread_time()
+    output: bytes = compressor.compress(data, flush)
+    if finish:
+        output += compressor.finish()
+    metrics.observe(
+        encoding,
+        len(data),
+        len(output),
+        time.thread_time() - started_at,
+    )
+    return output
+
+
+class CompressionMiddleware:
+    """
+    レスポンスを圧縮するASGIミドルウェア
+
+    - Accept-Encodingで受け付けられる方式のうち、優先順の高い方式で圧縮する
+        - gzipに加え、brotli・zstandardがインストールされている場合はbr・zstdも使用する
+    - ボディ全体が一度に送られる場合は、最小サイズ未満のレスポンスは圧縮しない
+        - 強いETagがある(同じボディを繰り返し返す)場合は、
+          圧縮したボディをボディのダイジェストでキャッシュする
+    - ストリーミングの場合は、チャンクを順に圧縮し、一定サイズごと、および最後にフラッシュして送信する
+        - チャンク(1行)ごとにフラッシュすると、フラッシュの度に付くブロックの区切りで
+          圧縮率が大きく下がるため、フラッシュの回数を減らす
+    - 圧縮したレスポンスのETagは、圧縮前と区別するため弱いETagにする
+    - 圧縮の対象となるレスポンスには、Vary: Accept-Encodingを付与する
+
+    Attributes:
+    - app: ASGIアプリケーション
+    - minimum_size: 圧縮するボディの最小バイト数
+    - stream_flush_bytes: ストリーミングで、フラッシュする間隔(圧縮前のバイト数)
+    - encodings: 利用できる圧縮方式(優先順)
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        インスタンスメソッド
+
+        Args:
+        - app: ASGIアプリケーション
+        """
+        self.app: ASGIApp = app
+        self.minimum_size: int = settings.compression_minimum_size
+        self.stream_flush_bytes: int = settings.compression_stream_flush_bytes
+        self.encodings: list[str] = list(get_compressors())
+
+    async def __call__(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        """
+        リクエストを処理
+
+        Args:
+        - scope: リクエストの情報
+        - receive: リクエストの受信関数
+        - send: レスポンスの送信関数
+        """
+        if scope["type"] != "http" or not self.encodings:
+            await self.app(scope, receive, send)
+            return
+
+        encoding: str | None = select_encoding(
+            Headers(scope=scope).get("accept-encoding", ""),
+            self.encodings,
+        )
+        start_message: Message | None = None
+        stream: tuple[str, Compressor] | None = None
+        unflushed_bytes: int = 0
+        passthrough: bool = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, stream, unflushed_bytes, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+
+            body: bytes = message.get("body", b"")
+            more_body: bool = message.get("more_body", False)
+            if stream is None:
+                assert start_message is not None
+                passthrough = True
+                if not is_compressible(scope, start_message):
+                    await send(start_message)
+                    await send(message)
+                    return
+                headers: MutableHeaders = MutableHeaders(scope=start_message)
+                headers.add_vary_header("Accept-Encoding")
+                if encoding is None or (
+                    not more_body and len(body) < self.minimum_size
+                ):
+                    if encoding is not None:
+                        metrics.skipped += 1
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                etag: str | None = headers.get("etag")
+                strong_etag: str | None = (
+                    None if etag is None or etag.startswith("W/") else etag
+                )
+                if strong_etag is not None:
+                    headers["ETag"] = f"W/{strong_etag}"
+                headers["Content-Encoding"] = encoding
+                metrics.responses[encoding] = (
+                    metrics.responses.get(encoding, 0) + 1
+                )
+                if not more_body:
+                    compressed: bytes = self.compress_body(
+                        encoding,
+                        body,
+                        strong_etag is not None,
+                    )
+                    headers["Content-Length"] = str(len(compressed))
+                    await send(start_message)
+                    await send({**message, "body": compressed})
+                    return
+
+                # ストリーミングは全体のサイズが分からないため、常に圧縮する
+                del headers["Content-Length"]
+                stream = (encoding, get_compressors()[encoding]())
+                passthrough = False
+                await send(start_message)
+
+            stream_encoding, compressor = stream
+            unflushed_bytes += len(body)
+            flush: bool = more_body and (
+                unflushed_bytes >= self.stream_flush_bytes
+            )
+            compressed_chunk: bytes = run_compressor(
+                stream_encoding,
+                compressor,
+                body,
+                flush=flush,
+                finish=not more_body,
+            )
+            if flush:
+                unflushed_bytes = 0
+            # 圧縮器内に溜まっただけで出力がない場合は、空のチャンクを送らない
+            if compressed_chunk or not more_body:
+                await send({**message, "body": compressed_chunk})
+
+        await self.app(scope, receive, send_compressed)
+
+    @staticmethod
+    def compress_body(encoding: str, body: bytes, cacheable: bool) -> bytes:
+        """
+        ボディ全体を圧縮
+
+        - キャッシュできる場合は、ボディのダイジェストで圧縮済みのボディを
+          キャッシュから取得・保存する
+
+        Args:
+        - encoding: 圧縮方式
+        - body: 圧縮するボディ
+        - cacheable: 圧縮済みのボディをキャッシュするか
+
+        Returns:
+        - 圧縮したボディ
+        """
+        if not cacheable:
+            return run_compressor(
+                encoding,
+                get_compressors()[encoding](),
+                body,
+                flush=False,
+                finish=True,
+            )
+        digest: bytes = CompressedBodyCache.digest(body)
+        compressed: bytes | None = compressed_body_cache.get(digest, encoding)
+        if compressed is not None:
+            metrics.cache_hits += 1
+            return compressed
+        compressed = run_compressor(
+            encoding,
+            get_compressors()[encoding](),
+            body,
+            flush=False,
+            finish=True,
+        )
+        compressed_body_cache.set(digest, encoding, compressed)
+        return compressed
@@ -16,54 +16,239 @@ class Settings(BaseSettings):
 
     Attributes:
     - access_token_expire_minutes: アクセストークンの有効時間(分)
+    - admission_decrease_factor: 応答時間が目標を超えた場合に同時実行数の上限に掛ける倍率
+    - admission_default_priority: 設定のないリクエストの優先度(小さいほど優先する)
+    - admission_enabled: 同時実行数の制限を有効にするか
+    - admission_exempt_paths: 同時実行数を制限しないパスの一覧
+    - admission_initial_limit: 同時実行数の上限の初期値
+    - admission_latency_target_seconds: 同時実行数の上限を調整する応答時間の目標(秒)
+    - admission_max_limit: 同時実行数の上限の最大値
+    - admission_max_queue: 実行を待つリクエストの最大件数
+    - admission_min_limit: 同時実行数の上限の最小値
+    - admission_priorities: 「メソッド パス」もしくはメソッドごとの優先度
+        - パスには「/todo/detail/{todo_id}」のようなパスパラメータを含められる
+    - admission_queue_timeout_seconds: 実行を待つ時間の上限(超えた場合は503を返す)
+    - admission_retry_after: 過負荷で破棄した場合に返すRetry-Afterの秒数
     - algorithm: jwtの署名で使用するアルゴリズム
     - app_title: アプリのタイトル
+    - cache_backend: キャッシュのバックエンド(none・memory・redis)
+    - cache_key_prefix: キャッシュのキーの接頭辞
+    - cache_memory_max_size: プロセス内のキャッシュに保持する最大件数
+    - cache_redis_pool_size: Redisへの接続数の上限
+    - cache_redis_timeout_seconds: Redisへの接続・コマンドの待ち時間(秒)
+    - cache_redis_url: RedisのURL
+    - cache_todo_ttl_seconds: Todoをキャッシュする秒数
+    - cache_user_ttl_seconds: ユーザーをキャッシュする秒数
+    - compression_brotli_quality: brotliの圧縮レベル(0〜11)
+    - compression_cache_max_bytes: 圧縮済みのレスポンスボディをキャッシュする合計バイト数
+    - compression_enabled: レスポンスを圧縮するか
+    - compression_encodings: 使用する圧縮方式(優先順、br・zstdはライブラリが必要)
+    - compression_gzip_level: gzipの圧縮レベル(1〜9)
+    - compression_minimum_size: 圧縮するレスポンスボディの最小バイト数
+    - compression_stream_flush_bytes: ストリーミングで、圧縮したデータを送信する
+      間隔(圧縮前のバイト数)
+    - compression_zstd_level: zstdの圧縮レベル(1〜22)
     - cors_credentials: Cookieの共有を許可するか
     - cors_headers: クロスオリジンリクエストに対応するHTTPリクエストヘッダ
     - cors_methods: クロスオリジンリクエストを許可するHTTPメソッド
     - cors_origins: クロスオリジンリクエストを許可するオリジン
     - db_echo: SQLのログを出力するか
-    - db_port: DBのポート番号
+    - db_max_overflow: コネクションプールのサイズを超えて作成できる接続数
+    - db_pool_pre_ping: 接続の取得時に疎通確認を行うか
+    - db_pool_recycle: 接続を再作成するまでの秒数(-1の場合は再作成しない)
+    - db_pool_size: コネクションプールに保持する接続数
+    - db_pool_timeout: コネクションプールから接続を取得する際の待ち時間(秒)
+    - db_port: DBのポート番号(ホストに公開するポート番号)
+    - db_read_your_writes_max_size: ワーカー内に書き込みを記録する最大ユーザー数
+        - キャッシュが無効の場合のみ使う
+    - db_read_your_writes_seconds: 書き込み後にプライマリから読み取る秒数
+        - cache_backendがredisの場合は、全ワーカーで記録を共有する
+    - db_replica_retry_seconds: 接続に失敗したレプリカを再度選択するまでの秒数
+    - db_statement_cache_size: 接続ごとにキャッシュするプリペアドステートメントの数
+    - db_statement_timeout_ms: SQLの実行時間の上限(ミリ秒、0の場合は無制限)
+    - db_warmup_connections: 起動時に事前に作成するDB接続の数(プールのサイズが上限)
+    - db_warmup_retry_seconds: 起動時のウォームアップに失敗した場合に再度試みるまでの秒数
     - docs_url: SwaggerUIのURL
+    - health_db_ping_timeout_seconds: ヘルスチェックでのDBの疎通確認の待ち時間(秒)
+    - health_db_ping_ttl_seconds: ヘルスチェックでのDBの疎通確認の結果をキャッシュする秒数
+    - log_duplicate_loggers: 同じ内容のログを抑制するロガー名
+        - 認証の失敗(401)・Todoが存在しない(404)など、
+          クライアント起因で大量に出力されるロガーのみ指定する
+    - log_duplicate_window_seconds: 同じ内容のログを抑制する秒数(0の場合は抑制しない)
+    - log_flush_batch_size: ログをフラッシュせずに書き込む最大件数
+    - log_queue_size: 書き込み待ちのログの最大件数(超えた場合は破棄する)
+    - openapi_enabled: OpenAPIスキーマとドキュメントを公開するか
+    - openapi_file: ビルド時に生成したOpenAPIスキーマのファイルパス(未指定の場合は初回アクセス時に生成)
+        - ファイルが存在しない場合も初回アクセス時に生成する
+        - ファイルのスキーマの上限値は、ビルド時の既定の設定のもの
+    - password_hash_max_queue: パスワードハッシュ計算の最大待ち数
+    - password_hash_retry_after: 過負荷時に返すRetry-Afterの秒数
+    - password_hash_workers: パスワードハッシュ計算のワーカー数
     - postgres_alembic_host: PostgreSQLのalembicでのホスト名
     - postgres_db: PostgreSQLのデータベース名
     - postgres_host: PostgreSQLのホスト名
     - postgres_password: PostgreSQLのパスワード
+    - postgres_port: PostgreSQLのポート番号
+    - postgres_read_hosts: 読み取り専用レプリカのホスト名一覧
     - postgres_user: PostgreSQLのユーザ名
+    - rate_limit_backend: レート制限の保存先(memory/redis、redisはcache_redis_*の接続先を使う)
+    - rate_limit_default: 設定のないルートに適用するレート制限(「件数/秒数」形式、未指定の場合は制限しない)
+    - rate_limit_enabled: レート制限を有効にするか
+    - rate_limit_max_keys: プロセス内で保持するレート制限のバケットの最大件数
+    - rate_limit_routes: 「メソッド パス」ごとのレート制限(「件数/秒数」形式)
+    - rate_limit_sweep_seconds: 満杯まで補充されたバケットを削除する間隔(秒)
     - redoc_url: ReDocのURL
+    - request_timeout_default_seconds: リクエストの処理時間の上限の既定値(秒、0の場合は無制限)
+    - request_timeout_exempt_paths: 処理時間を制限しないパスの一覧
+    - request_timeout_header: クライアントが処理時間の上限(秒)を短くするヘッダー名
+    - request_timeout_routes: 「メソッド パス」ごとの処理時間の上限(秒、0の場合は無制限)
+        - パスには「/todo/detail/{todo_id}」のようなパスパラメータを含められる
     - secret_key: jwtで使用するアルゴリズムに適したキー
+    - server_access_log: アクセスログを出力するか
+    - server_backlog: 接続待ちキューの最大数
+    - server_forwarded_allow_ips: X-Forwarded-*ヘッダーを信頼するプロキシのIP
+    - server_graceful_shutdown_seconds: 停止時に処理中のリクエストを待つ秒数
+    - server_host: サーバーのホスト
+    - server_keep_alive_seconds: Keep-Alive接続を維持する秒数
+    - server_limit_concurrency: 同時接続数の上限(0の場合は無制限、超えた場合は503)
+    - server_port: サーバーのポート番号
+    - server_timing_enabled: レスポンスにServer-Timingヘッダーを付与するか
+    - server_workers: ワーカープロセス数(0の場合はCPUのコア数)
     - test_db_echo: テスト時にSQLのログを出力するか
     - test_postgres_db: テスト用のPostgreSQLのデータベース名
     - test_postgres_host: テスト用のPostgreSQLのホスト名
     - test_postgres_password: テスト用のPostgreSQLのパスワード
     - test_postgres_user: テスト用のPostgreSQLのユーザ名
+    - todo_bulk_max_size: Todoの一括操作で1度に指定できる最大件数
+    - todo_list_default_limit: Todo一覧の1ページあたりのデフォルト件数
+    - todo_list_max_limit: Todo一覧の1ページあたりの最大件数
+    - todo_search_max_length: Todoの全文検索のキーワードの最大文字数
+    - todo_stream_batch_size: Todo一覧のストリーミング時に1度に取得する件数
+    - token_cache_max_size: 検証済みトークンのキャッシュの最大件数
+    - token_cache_ttl_seconds: 検証済みトークンのキャッシュの保持時間(秒)
     - token_url: OAuth2PasswordBearerのtokenUrlパラメータに定義するURL
 
     - model_config: クラスの設定を定義
     """
 
     access_token_expire_minutes: int = 30
+    admission_decrease_factor: float = 0.9
+    admission_default_priority: int = 1
+    admission_enabled: bool = True
+    admission_exempt_paths: list[str] = ["/healthz", "/readyz", "/metrics"]
+    admission_initial_limit: int = 20
+    admission_latency_target_seconds: float = 0.5
+    admission_max_limit: int = 100
+    admission_max_queue: int = 100
+    admission_min_limit: int = 2
+    admission_priorities: dict[str, int] = {
+        "GET": 0,
+        "HEAD": 0,
+        "POST /token": 2,
+        "POST /user/create": 2,
+    }
+    admission_queue_timeout_seconds: float = 1.0
+    admission_retry_after: int = 1
     algorithm: str = "HS256"
     app_title: str = "Todo App"
+    cache_backend: str = "none"
+    cache_key_prefix: str = "todo-api"
+    cache_memory_max_size: int = 10000
+    cache_redis_pool_size: int = 10
+    cache_redis_timeout_seconds: float = 0.5
+    cache_redis_url: str = "redis://localhost:6379/0"
+    cache_todo_ttl_seconds: float = 300.0
+    cache_user_ttl_seconds: float = 60.0
+    compression_brotli_quality: int = 4
+    compression_cache_max_bytes: int = 8 * 1024 * 1024
+    compression_enabled: bool = True
+    compression_encodings: list[str] = ["br", "zstd", "gzip"]
+    compression_gzip_level: int = 6
+    compression_minimum_size: int = 1024
+    compression_stream_flush_bytes: int = 16 * 1024
+    compression_zstd_level: int = 3
     cors_credentials: bool = True
     cors_headers: list[str] = ["*"]
     cors_methods: list[str] = ["*"]
     cors_origins: list[str] = ["*"]
     db_echo: bool = False
+    db_max_overflow: int = 10
+    db_pool_pre_ping: bool = False
+    db_pool_recycle: int = -1
+    db_pool_size: int = 5
+    db_pool_timeout: float = 30.0
     db_port: int = 5432
+    db_read_your_writes_max_size: int = 10000
+    db_read_your_writes_seconds: float = 5.0
+    db_replica_retry_seconds: float = 30.0
+    db_statement_cache_size: int = 100
+    db_statement_timeout_ms: int = 0
+    db_warmup_connections: int = 5
+    db_warmup_retry_seconds: float = 5.0
     docs_url: str | None = "/docs"
+    health_db_ping_timeout_seconds: float = 1.0
+    health_db_ping_ttl_seconds: float = 1.0
+    log_duplicate_loggers: list[str] = [
+        "api.services.auth",
+        "api.services.todo",
+        "api.services.user",
+    ]
+    log_duplicate_window_seconds: float = 10.0
+    log_flush_batch_size: int = 100
+    log_queue_size: int = 10000
+    openapi_enabled: bool = True
+    openapi_file: str | None = None
+    password_hash_max_queue: int = 64
+    password_hash_retry_after: int = 1
+    password_hash_workers: int = 4
     postgres_alembic_host: str = "localhost"
     postgres_db: str = "postgres"
     postgres_host: str = "db"
     postgres_password: str = "postgres"
+    postgres_port: int = 5432
+    postgres_read_hosts: list[str] = []
     postgres_user: str = "postgres"
+    rate_limit_backend: str = "memory"
+    rate_limit_default: str | None = None
+    rate_limit_enabled: bool = True
+    rate_limit_max_keys: int = 100000
+    rate_limit_routes: dict[str, str] = {
+        "POST /token": "10/60",
+        "POST /user/create": "5/60",
+    }
+    rate_limit_sweep_seconds: float = 60.0
     redoc_url: str | None = "/redoc"
+    request_timeout_default_seconds: float = 30.0
+    request_timeout_exempt_paths: list[str] = ["/todo/list/stream"]
+    request_timeout_header: str = "X-Request-Timeout"
+    request_timeout_routes: dict[str, float] = {
+        "POST /todo/bulk/create": 60.0,
+        "PATCH /todo/bulk/update": 60.0,
+        "POST /todo/bulk/delete": 60.0,
+    }
     secret_key: str = ""
+    server_access_log: bool = False
+    server_backlog: int = 2048
+    server_forwarded_allow_ips: str = "127.0.0.1"
+    server_graceful_shutdown_seconds: int = 30
+    server_host: str = "0.0.0.0"
+    server_keep_alive_seconds: int = 5
+    server_limit_concurrency: int = 0
+    server_port: int = 8000
+    server_timing_enabled: bool = True
+    server_workers: int = 0
     test_db_echo: bool = False
     test_postgres_db: str = "test_db"
     test_postgres_host: str = "test_db"
     test_postgres_password: str = "password"
     test_postgres_user: str = "test_user"
+    todo_bulk_max_size: int = 1000
+    todo_list_default_limit: int = 100
+    todo_list_max_limit: int = 1000
+    todo_search_max_length: int = 200
+    todo_stream_batch_size: int = 500
+    token_cache_max_size: int = 10000
+    token_cache_ttl_seconds: int = 60
     token_url: str = "token"
 
     def get_async_url(self) -> URL:
@@ -71,6 +256,7 @@ class Settings(BaseSettings):
         PostgreSQLへの非同期接続情報(URL)を取得
 
         - URLを生成
+        - 接続ごとにキャッシュするプリペアドステートメントの数を指定する
 
         Returns:
         - PostgreSQLへの非同期接続情報(URL)
@@ -79,9 +265,14 @@ class Settings(BaseSettings):
             drivername="postgresql+asyncpg",
             database=self.postgres_db,
             host=self.postgres_host,
-            port=5432,
+            port=self.postgres_port,
             username=self.postgres_user,
             password=self.postgres_password,
+            query={
+                "prepared_statement_cache_size": str(
+                    self.db_statement_cache_size
+                ),
+            },
         )
 
     def get_oauth2_scheme(self) -> OAuth2PasswordBearer:
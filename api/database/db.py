@@ -1,35 +1,297 @@
 """DB関連の定義ファイル"""
-from typing import Any, AsyncGenerator
+import logging
+from typing import Any, AsyncGenerator, Awaitable, Callable
 
+from fastapi import Request
+from sqlalchemy import TextClause, event, exc, text
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
     create_async_engine,
 )
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.orm import (
+    ORMExecuteState,
+    Session,
+    declarative_base,
+    sessionmaker,
+)
 
+from api.cache.cache import cache
+from api.cache.memory import MemoryBackend
 from api.config import settings
+from api.database.pool import InstrumentedAsyncQueuePool
+from api.database.replica import ReadYourWritesTracker, ReplicaRouter
+from api.deadline import get_statement_timeout_ms
+from api.monitoring.timing import measure
+from api.services.token_cache import get_token_subject
+from api.settings import constant
+
+logger: logging.Logger = logging.getLogger(__name__)
 
 Base: Any = declarative_base()
 
+# SET LOCAL statement_timeoutと同じ(第3引数のtrueでトランザクション内のみ有効)
+# 値をバインドし、SQLの文字列を1つに保つことで、プリペアドステートメントを再利用する
+SET_STATEMENT_TIMEOUT: TextClause = text(
+    "SELECT set_config('statement_timeout', :timeout, true)"
+)
+
+
+def get_engine_options() -> dict[str, Any]:
+    """
+    エンジンの設定を取得
+
+    - コネクションプールの設定を環境変数から取得する
+    - SQLの実行時間の上限が指定されている場合は、接続時にサーバー側に設定する
+
+    Returns:
+    - create_async_engineに渡すキーワード引数
+    """
+    connect_args: dict[str, Any] = {}
+    if settings.db_statement_timeout_ms > 0:
+        connect_args["server_settings"] = {
+            "statement_timeout": str(settings.db_statement_timeout_ms),
+        }
+    return {
+        "echo": settings.db_echo,
+        "poolclass": InstrumentedAsyncQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "connect_args": connect_args,
+    }
+
 
 async_engine: AsyncEngine = create_async_engine(
     settings.get_async_url(),
-    echo=settings.db_echo,
+    **get_engine_options(),
 )
 async_session: sessionmaker = sessionmaker(  # type: ignore
     bind=async_engine,
     class_=AsyncSession,
 )
 
+# 読み取り用のセッションは、BEGIN・COMMITを発行しない自動コミットモードで接続する
+async_read_primary_engine: AsyncEngine = async_engine.execution_options(
+    isolation_level="AUTOCOMMIT",
+)
+async_read_engines: list[AsyncEngine] = [
+    create_async_engine(
+        settings.get_async_url().set(host=host),
+        isolation_level="AUTOCOMMIT",
+        **get_engine_options(),
+    )
+    for host in settings.postgres_read_hosts
+]
+async_read_session: sessionmaker = sessionmaker(  # type: ignore
+    bind=async_read_primary_engine,
+    class_=AsyncSession,
+)
+replica_router: ReplicaRouter = ReplicaRouter(
+    async_read_engines,
+    settings.db_replica_retry_seconds,
+)
+# キャッシュが無効の場合は、ワーカー内のLRUに記録する
+read_your_writes: ReadYourWritesTracker = ReadYourWritesTracker(
+    (
+        cache.backend
+        if cache.enabled
+        else MemoryBackend(settings.db_read_your_writes_max_size)
+    ),
+    cache.build_key(constant.CACHE_NAMESPACE_READ_YOUR_WRITES, "user"),
+    settings.db_read_your_writes_seconds,
+)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_orm_execute_writes(orm_execute_state: ORMExecuteState) -> None:
+    """
+    INSERT・UPDATE・DELETE文を実行したセッションに書き込みありの印を付ける
+
+    Args:
+    - orm_execute_state: 実行するSQLの情報
+    """
+    if (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        orm_execute_state.session.info["has_writes"] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush_writes(session: Session, flush_context: Any) -> None:
+    """
+    フラッシュしたセッションに書き込みありの印を付ける
+
+    Args:
+    - session: DBセッション
+    - flush_context: フラッシュの情報
+    """
+    session.info["has_writes"] = True
+
 
-async def get_db() -> AsyncGenerator:
+@event.listens_for(Session, "after_begin")
+def _set_statement_timeout(
+    session: Session,
+    transaction: Any,
+    connection: Any,
+) -> None:
+    """
+    トランザクションの開始時に、リクエストの期限までの残り時間をSQLの実行時間の上限に設定する
+
+    - get_dbで取得したセッションのみ対象とする
+    - SET LOCAL相当のため、トランザクションの終了とともに接続の設定に戻る
+
+    Args:
+    - session: DBセッション
+    - transaction: トランザクション
+    - connection: DB接続
+    """
+    if not session.info.get("statement_deadline"):
+        return
+    timeout_ms: int | None = get_statement_timeout_ms()
+    if timeout_ms is not None:
+        connection.execute(SET_STATEMENT_TIMEOUT, {"timeout": str(timeout_ms)})
+
+
+def has_writes(session: AsyncSession) -> bool:
+    """
+    セッションで書き込みを行ったか確認
+
+    - INSERT・UPDATE・DELETE文を実行したか、フラッシュしたか
+    - フラッシュしていない変更があるか
+
+    Args:
+    - session: 非同期データベースセッション
+
+    Returns:
+    - True/False
+    """
+    return bool(
+        session.info.get("has_writes")
+        or session.new
+        or session.dirty
+        or session.deleted
+    )
+
+
+def add_after_commit(
+    session: AsyncSession,
+    callback: Callable[[], Awaitable[None]],
+) -> None:
+    """
+    コミット後に実行する処理を登録
+
+    - キャッシュの削除など、コミットした内容が他から読み取れるようになってから
+      行う必要がある処理に使用する
+    - ロールバックした場合は実行しない
+
+    Args:
+    - session: 非同期データベースセッション
+    - callback: コミット後に実行する処理
+    """
+    session.info.setdefault("after_commit", []).append(callback)
+
+
+async def run_after_commit(session: AsyncSession) -> None:
+    """
+    登録したコミット後の処理を実行
+
+    Args:
+    - session: 非同期データベースセッション
+    """
+    callbacks: list[Callable[[], Awaitable[None]]] = session.info.pop(
+        "after_commit", []
+    )
+    for callback in callbacks:
+        await callback()
+
+
+async def get_db(request: Request) -> AsyncGenerator:
     """
     非同期データベースセッションを取得
 
+    - 書き込みがあった場合のみコミットし、読み取りのみの場合はコミットを省略する
+    - 例外が発生した場合は、ロールバックする
+    - 書き込みがあった場合は、ユーザーの書き込みを記録し、
+      コミット後の処理を実行する
+    - リクエストに期限がある場合は、トランザクションごとに残り時間を
+      statement_timeoutに設定し、期限を過ぎたSQLをサーバー側でキャンセルさせる
+
+    Args:
+    - request: リクエスト
+
     Yields:
     - 非同期データベースセッション
     """
-    async with async_session() as session:
+    async with async_session(info={"statement_deadline": True}) as session:
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
+        if not has_writes(session):
+            return
+        # COMMITはカーソルを経由しないため、ここでDBの時間として計測する
+        with measure("db"):
+            await session.commit()
+        await read_your_writes.mark_write(
+            get_token_subject(request.headers.get("Authorization"))
+        )
+        await run_after_commit(session)
+
+
+async def get_read_db(request: Request) -> AsyncGenerator:
+    """
+    読み取り用の非同期データベースセッションを取得
+
+    - 自動コミットモードのセッションのため、BEGIN・COMMITの往復が発生しない
+    - レプリカをラウンドロビンで選択し、接続できたレプリカのセッションを返す
+    - 接続に失敗したレプリカは一定時間選択せず、次のレプリカに接続する
+    - 以下の場合は、プライマリのセッションを返す
+        - レプリカが設定されていない、もしくはすべてのレプリカに接続できない
+        - ユーザーが直近に書き込みを行った(自身の書き込みを読み取れるようにする)
+
+    Args:
+    - request: リクエスト
+
+    Yields:
+    - 読み取り用の非同期データベースセッション
+    """
+    if not await read_your_writes.has_recent_write(
+        get_token_subject(request.headers.get("Authorization"))
+    ):
+        for index, engine in replica_router.candidates():
+            session: AsyncSession = async_read_session(bind=engine)
+            try:
+                await session.connection()
+            except (OSError, TimeoutError, exc.DBAPIError):
+                logger.warning(f"レプリカ{index}に接続できませんでした")
+                replica_router.mark_unhealthy(index)
+                await session.close()
+                continue
+            replica_router.mark_healthy(index)
+            try:
+                yield session
+            finally:
+                await session.close()
+            return
+
+    async with async_read_session() as session:
         yield session
-        await session.commit()
+
+
+def get_session_factory() -> sessionmaker:
+    """
+    非同期データベースセッションのファクトリを取得
+
+    - レスポンスのストリーミング中など、リクエストの処理後もセッションを
+      利用する場合に、呼び出し側でセッションを生成するために使用する
+
+    Returns:
+    - 非同期データベースセッションのファクトリ
+    """
+    return async_session
@@ -0,0 +1,121 @@
+"""コネクションプールの計測の定義ファイル"""
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import exc
+from sqlalchemy.pool import (
+    AsyncAdaptedQueuePool,
+    ConnectionPoolEntry,
+    Pool,
+    QueuePool,
+)
+
+
+@dataclass
+class PoolMetrics:
+    """
+    コネクションプールの計測値
+
+    Attributes:
+    - checkouts: プールから接続を取得した回数
+    - timeouts: 接続の取得がタイムアウトした回数
+    - wait_seconds_total: 接続の取得を待った時間の合計(秒)
+    - wait_seconds_max: 接続の取得を待った時間の最大値(秒)
+    """
+
+    checkouts: int = 0
+    timeouts: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+
+    def observe(self, wait_seconds: float) -> None:
+        """
+        接続の取得1回分の計測値を記録
+
+        Args:
+        - wait_seconds: 接続の取得を待った時間(秒)
+        """
+        self.checkouts += 1
+        self.wait_seconds_total += wait_seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, wait_seconds)
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    計測付きの非同期コネクションプール
+
+    - 接続の取得にかかった時間と、タイムアウトの回数を記録する
+
+    Attributes:
+    - metrics: コネクションプールの計測値
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """
+        インスタンスメソッド
+
+        Args:
+        - args: AsyncAdaptedQueuePoolに渡す引数
+        - kwargs: AsyncAdaptedQueuePoolに渡すキーワード引数
+        """
+        super().__init__(*args, **kwargs)
+        self.metrics: PoolMetrics = PoolMetrics()
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        """
+        プールから接続を取得
+
+        Returns:
+        - 接続のエントリ
+        """
+        started_at: float = time.perf_counter()
+        try:
+            entry: ConnectionPoolEntry = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        self.metrics.observe(time.perf_counter() - started_at)
+        return entry
+
+    def recreate(self) -> QueuePool:
+        """
+        同じ設定でプールを再生成
+
+        - engine.dispose()などで再生成された場合も、計測値を引き継ぐ
+
+        Returns:
+        - 再生成したプール
+        """
+        pool: QueuePool = super().recreate()
+        if isinstance(pool, InstrumentedAsyncQueuePool):
+            pool.metrics = self.metrics
+        return pool
+
+
+def get_pool_stats(pool: Pool) -> dict[str, Any]:
+    """
+    コネクションプールの状態を取得
+
+    Args:
+    - pool: コネクションプール
+
+    Returns:
+    - プールの状態と計測値
+    """
+    stats: dict[str, Any] = {}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+        )
+    if isinstance(pool, InstrumentedAsyncQueuePool):
+        stats.update(
+            checkouts=pool.metrics.checkouts,
+            timeouts=pool.metrics.timeouts,
+            wait_seconds_total=pool.metrics.wait_seconds_total,
+            wait_seconds_max=pool.metrics.wait_seconds_max,
+        )
+    return stats
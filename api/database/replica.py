@@ -0,0 +1,172 @@
+"""読み取り専用レプリカの振り分けの定義ファイル"""
+import logging
+import time
+from typing import Iterator
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from api.cache.backend import CacheBackend, CacheError
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+class ReplicaRouter:
+    """
+    読み取り専用レプリカの振り分け
+
+    - ラウンドロビンでレプリカを選択する
+    - 接続に失敗したレプリカは、一定時間選択しない
+
+    Attributes:
+    - engines: レプリカのエンジン一覧
+    - retry_seconds: 接続に失敗したレプリカを再度選択するまでの秒数
+    """
+
+    def __init__(
+        self,
+        engines: list[AsyncEngine],
+        retry_seconds: float,
+    ) -> None:
+        """
+        インスタンスメソッド
+
+        Args:
+        - engines: レプリカのエンジン一覧
+        - retry_seconds: 接続に失敗したレプリカを再度選択するまでの秒数
+        """
+        self.engines: list[AsyncEngine] = engines
+        self.retry_seconds: float = retry_seconds
+        self._next_index: int = 0
+        self._unhealthy_until: dict[int, float] = {}
+
+    def candidates(self) -> Iterator[tuple[int, AsyncEngine]]:
+        """
+        接続を試みるレプリカを順に取得
+
+        - 前回の次のレプリカから順に、正常なレプリカを返す
+
+        Yields:
+        - レプリカの番号とエンジン
+        """
+        if not self.engines:
+            return
+        start: int = self._next_index
+        self._next_index = (start + 1) % len(self.engines)
+        now: float = time.monotonic()
+        for offset in range(len(self.engines)):
+            index: int = (start + offset) % len(self.engines)
+            if self._unhealthy_until.get(index, 0.0) <= now:
+                yield index, self.engines[index]
+
+    def mark_unhealthy(self, index: int) -> None:
+        """
+        レプリカを異常とする
+
+        Args:
+        - index: レプリカの番号
+        """
+        self._unhealthy_until[index] = time.monotonic() + self.retry_seconds
+
+    def mark_healthy(self, index: int) -> None:
+        """
+        レプリカを正常とする
+
+        Args:
+        - index: レプリカの番号
+        """
+        self._unhealthy_until.pop(index, None)
+
+    def is_healthy(self, index: int) -> bool:
+        """
+        レプリカが正常か確認
+
+        Args:
+        - index: レプリカの番号
+
+        Returns:
+        - True/False
+        """
+        return self._unhealthy_until.get(index, 0.0) <= time.monotonic()
+
+
+class ReadYourWritesTracker:
+    """
+    ユーザーごとの最終書き込みの記録
+
+    - 書き込み直後のユーザーの読み取りを、一定時間プライマリに振り分けるために使用する
+    - ユーザーは、トークンのユーザー名(sub)で識別する(トークンを取り直しても同じ)
+    - 記録はキャッシュのバックエンドに保持時間付きで保存する
+        - Redisの場合は全ワーカーで共有し、それ以外はワーカーごとに保持する
+    - バックエンドの操作に失敗した場合は、直近に書き込みがあったものとして扱う
+
+    Attributes:
+    - backend: 記録を保存するキャッシュのバックエンド
+    - prefix: バックエンドのキーの接頭辞
+    - window_seconds: 書き込み後にプライマリから読み取る秒数
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        prefix: str,
+        window_seconds: float,
+    ) -> None:
+        """
+        インスタンスメソッド
+
+        Args:
+        - backend: 記録を保存するキャッシュのバックエンド
+        - prefix: バックエンドのキーの接頭辞
+        - window_seconds: 書き込み後にプライマリから読み取る秒数
+        """
+        self.backend: CacheBackend = backend
+        self.prefix: str = prefix
+        self.window_seconds: float = window_seconds
+
+    def build_key(self, user_key: str) -> str:
+        """
+        バックエンドのキーを生成
+
+        Args:
+        - user_key: ユーザーの識別子
+
+        Returns:
+        - バックエンドのキー
+        """
+        return f"{self.prefix}:{user_key}"
+
+    async def mark_write(self, user_key: str | None) -> None:
+        """
+        書き込みを記録
+
+        Args:
+        - user_key: ユーザーの識別子
+        """
+        if user_key is None or self.window_seconds <= 0:
+            return
+        try:
+            await self.backend.set(
+                self.build_key(user_key),
+                b"1",
+                self.window_seconds,
+            )
+        except CacheError as e:
+            logger.warning(f"書き込みを記録できませんでした: {e!r}")
+
+    async def has_recent_write(self, user_key: str | None) -> bool:
+        """
+        直近に書き込みがあったか確認
+
+        Args:
+        - user_key: ユーザーの識別子
+
+        Returns:
+        - True/False
+        """
+        if user_key is None or self.window_seconds <= 0:
+            return False
+        try:
+            return await self.backend.get(self.build_key(user_key)) is not None
+        except CacheError as e:
+            logger.warning(f"書き込みの記録を取得できませんでした: {e!r}")
+            return True
@@ -0,0 +1,201 @@
+"""リクエストの処理期限の定義ファイル
+
+- 期限はcontextvarで保持し、DBセッションなどリクエスト内の処理から参照する
+- 期限を過ぎた場合は、処理をキャンセルして504を返す
+"""
+import asyncio
+import logging
+import math
+import time
+from contextvars import ContextVar
+
+from fastapi import Request
+from sqlalchemy import exc
+from starlette import status
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.config import settings
+from api.responses import FastJSONResponse
+from api.route_rules import RouteRules
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# PostgreSQLのquery_canceled(statement_timeoutによるキャンセルを含む)
+QUERY_CANCELED_PGCODE: str = "57014"
+
+timeout_rules: RouteRules[float] = RouteRules(settings.request_timeout_routes)
+
+request_deadline: ContextVar[float | None] = ContextVar(
+    "request_deadline",
+    default=None,
+)
+
+
+def get_remaining_seconds() -> float | None:
+    """
+    リクエストの期限までの残り時間を取得
+
+    Returns:
+    - 残り時間(秒)、期限がない場合はNone
+    """
+    deadline: float | None = request_deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def get_statement_timeout_ms() -> int | None:
+    """
+    リクエストの期限までの残り時間を、SQLの実行時間の上限として取得
+
+    Returns:
+    - SQLの実行時間の上限(ミリ秒、1以上)、期限がない場合はNone
+    """
+    remaining_seconds: float | None = get_remaining_seconds()
+    if remaining_seconds is None:
+        return None
+    return max(math.ceil(remaining_seconds * 1000), 1)
+
+
+def get_timeout_seconds(scope: Scope) -> float | None:
+    """
+    リクエストの処理時間の上限を取得
+
+    - 「メソッド パス」ごとの設定、既定値の順に参照する(0の場合は上限なし)
+    - ヘッダーで指定された場合は、設定の上限より短い場合のみその値を使う
+        - クライアントが上限を延ばしたり、上限のないルートに設定したりはできない
+
+    Args:
+    - scope: リクエストの情報
+
+    Returns:
+    - 処理時間の上限(秒)、上限がない場合はNone
+    """
+    if scope["path"] in settings.request_timeout_exempt_paths:
+        return None
+    timeout_seconds: float = timeout_rules.get(
+        scope["method"],
+        scope["path"],
+        settings.request_timeout_default_seconds,
+    )
+    if timeout_seconds <= 0:
+        return None
+    header: str | None = Headers(scope=scope).get(
+        settings.request_timeout_header
+    )
+    if header is not None:
+        try:
+            header_seconds: float = float(header)
+        except ValueError:
+            return timeout_seconds
+        if math.isfinite(header_seconds) and header_seconds > 0:
+            return min(header_seconds, timeout_seconds)
+    return timeout_seconds
+
+
+def build_timeout_response() -> FastJSONResponse:
+    """
+    期限を過ぎたリクエストのレスポンスを生成
+
+    Returns:
+    - 504のレスポンス
+    """
+    return FastJSONResponse(
+        {"detail": "Gateway Timeout"},
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+    )
+
+
+async def handle_query_canceled(
+    request: Request,
+    e: Exception,
+) -> Response:
+    """
+    期限によりキャンセルされたSQLの例外を、504のレスポンスに変換する例外ハンドラー
+
+    - 期限のないリクエストや、他の理由のDBの例外はそのまま送出する
+
+    Args:
+    - request: リクエスト
+    - e: DBの例外
+
+    Returns:
+    - 504のレスポンス
+    """
+    if (
+        isinstance(e, exc.DBAPIError)
+        and getattr(e.orig, "pgcode", None) == QUERY_CANCELED_PGCODE
+        and request_deadline.get() is not None
+    ):
+        logger.warning("期限を過ぎたため、SQLをキャンセルしました")
+        return build_timeout_response()
+    raise e
+
+
+class DeadlineMiddleware:
+    """
+    リクエストの処理期限を設定するASGIミドルウェア
+
+    - 期限をcontextvarに設定し、asyncio.timeoutで処理全体を打ち切る
+    - レスポンスの送信開始前に期限を過ぎた場合は、504を返す
+    - ストリーミングなどの除外パスには期限を設定しない
+
+    Attributes:
+    - app: ASGIアプリケーション
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        インスタンスメソッド
+
+        Args:
+        - app: ASGIアプリケーション
+        """
+        self.app: ASGIApp = app
+
+    async def __call__(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        """
+        リクエストを処理
+
+        Args:
+        - scope: リクエストの情報
+        - receive: メッセージを受信する関数
+        - send: メッセージを送信する関数
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timeout_seconds: float | None = get_timeout_seconds(scope)
+        if timeout_seconds is None:
+            await self.app(scope, receive, send)
+            return
+
+        response_started: bool = False
+
+        async def send_with_state(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        token = request_deadline.set(time.monotonic() + timeout_seconds)
+        timeout: asyncio.Timeout = asyncio.timeout(timeout_seconds)
+        try:
+            async with timeout:
+                await self.app(scope, receive, send_with_state)
+        except TimeoutError:
+            if not timeout.expired():
+                raise
+            logger.warning(
+                f"期限({timeout_seconds}秒)を過ぎたため、処理を打ち切りました: "
+                f"{scope['method']} {scope['path']}"
+            )
+            if response_started:
+                return
+            await build_timeout_response()(scope, receive, send)
+        finally:
+            request_deadline.reset(token)
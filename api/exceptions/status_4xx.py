@@ -4,6 +4,33 @@ from typing import Any
 from fastapi import HTTPException, status
 
 
+class BadRequestException(HTTPException):
+    """400 BadRequest"""
+
+    def __init__(
+        self,
+        detail: Any = None,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        """
+        インスタンスメソッド
+
+        - 初期化しなくても使用可能
+            - raise BadRequestException
+        - レスポンス情報を変更したい場合には引数として渡す
+        - detailがNoneの場合は、継承元クラスのデフォルト値が使用される
+
+        Args:
+        - detail: レスポンスボディのエラー詳細情報
+        - headers: レスポンスヘッダーの追加情報
+        """
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=detail,
+            headers=headers,
+        )
+
+
 class UnauthorizedException(HTTPException):
     """401 Unauthorized"""
 
@@ -56,3 +83,30 @@ class NotFoundException(HTTPException):
             detail=detail,
             headers=headers,
         )
+
+
+class TooManyRequestsException(HTTPException):
+    """429 TooManyRequests"""
+
+    def __init__(
+        self,
+        detail: Any = None,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        """
+        インスタンスメソッド
+
+        - 初期化しなくても使用可能
+            - raise TooManyRequestsException
+        - レスポンス情報を変更したい場合には引数として渡す
+        - detailがNoneの場合は、継承元クラスのデフォルト値が使用される
+
+        Args:
+        - detail: レスポンスボディのエラー詳細情報
+        - headers: レスポンスヘッダーの追加情報
+        """
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=detail,
+            headers=headers,
+        )
@@ -0,0 +1,187 @@
+"""アプリケーションの起動・停止時の処理の定義ファイル"""
+import asyncio
+import logging
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+from fastapi import FastAPI
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+from api.cache.cache import cache
+from api.config import settings
+from api.database import db
+from api.schemas import todo as todo_schemas
+from api.services import auth as auth_services
+from api.services import hasher
+from api.services import todo as todo_services
+from api.services.rate_limit import rate_limiter
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WarmupState:
+    """
+    ウォームアップの状態
+
+    Attributes:
+    - ready: ウォームアップが完了したか
+    - attempts: ウォームアップを試みた回数
+    - connections: 事前に接続したDB接続の数(レプリカを含む)
+    - duration_seconds: ウォームアップに要した時間(秒)
+    - error: 直近のウォームアップの失敗理由
+    """
+
+    ready: bool = False
+    attempts: int = 0
+    connections: int = 0
+    duration_seconds: float = 0.0
+    error: str | None = None
+
+
+warmup_state: WarmupState = WarmupState()
+
+
+def get_warmup_statements() -> list[Select]:
+    """
+    ウォームアップで実行するSQLを取得
+
+    - サービスが発行するSQLと同じ文を、該当する行がない値で実行する
+    - asyncpgのプリペアドステートメントは接続ごとにキャッシュされるため、接続ごとに実行する
+
+    Returns:
+    - SELECT文の一覧
+    """
+    return [
+        auth_services.build_user_by_user_name_stmt(""),
+        todo_services.build_todo_list_stmt(
+            0,
+            todo_schemas.TodoListFilter(),
+        ).limit(settings.todo_list_default_limit + 1),
+        todo_services.build_todo_detail_stmt(0, 0),
+        todo_services.build_todo_search_stmt(0, "").limit(
+            settings.todo_list_default_limit + 1
+        ),
+    ]
+
+
+async def warm_connection(conn: AsyncConnection) -> None:
+    """
+    DB接続で、頻繁に実行するSQLを準備
+
+    Args:
+    - conn: 非同期のDB接続
+    """
+    async with AsyncSession(bind=conn) as session:
+        for stmt in get_warmup_statements():
+            await session.scalars(stmt)
+
+
+async def prefill_pool(engine: AsyncEngine, count: int) -> int:
+    """
+    コネクションプールに事前に接続を作成
+
+    - 同時に接続を取得することで、プールに指定した数の接続を作成する
+    - 作成した接続は、頻繁に実行するSQLを準備してからプールに戻す
+
+    Args:
+    - engine: 非同期エンジン
+    - count: 作成する接続の数
+
+    Returns:
+    - 作成した接続の数
+    """
+    async with AsyncExitStack() as stack:
+        conns: list[AsyncConnection] = list(
+            await asyncio.gather(
+                *(
+                    stack.enter_async_context(engine.connect())
+                    for _ in range(count)
+                )
+            )
+        )
+        await asyncio.gather(*(warm_connection(conn) for conn in conns))
+    return len(conns)
+
+
+async def prime_password_hasher() -> None:
+    """
+    パスワードハッシュ計算のワーカーを準備
+
+    - bcryptのバックエンドを読み込み、ワーカーのスレッドを起動しておく
+    """
+    await asyncio.gather(
+        *(
+            auth_services.get_hashed_password("warmup")
+            for _ in range(settings.password_hash_workers)
+        )
+    )
+
+
+async def warm_up() -> None:
+    """
+    ウォームアップを行う
+
+    - プライマリとレプリカのコネクションプールに、事前に接続を作成する
+    - パスワードハッシュ計算のワーカーを準備する
+    - 失敗した場合は、一定時間後に再度試みる
+    """
+    count: int = min(settings.db_warmup_connections, settings.db_pool_size)
+    while not warmup_state.ready:
+        warmup_state.attempts += 1
+        started_at: float = time.perf_counter()
+        try:
+            connections: int = await prefill_pool(
+                db.async_read_primary_engine,
+                count,
+            )
+            for engine in db.async_read_engines:
+                connections += await prefill_pool(engine, count)
+            await prime_password_hasher()
+        except Exception as e:
+            warmup_state.error = repr(e)
+            logger.warning(f"ウォームアップに失敗しました: {e!r}")
+            await asyncio.sleep(settings.db_warmup_retry_seconds)
+            continue
+        warmup_state.connections = connections
+        warmup_state.duration_seconds = time.perf_counter() - started_at
+        warmup_state.error = None
+        warmup_state.ready = True
+        logger.info("ウォームアップが完了しました")
+
+
+async def dispose_engines() -> None:
+    """
+    すべてのエンジンの接続を閉じる
+    """
+    await db.async_engine.dispose()
+    for engine in db.async_read_engines:
+        await engine.dispose()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    アプリケーションの起動・停止時の処理
+
+    - 起動時に、ウォームアップをバックグラウンドで開始する
+        - ウォームアップが完了するまで、/readyzは503を返す
+    - 停止時に、ウォームアップを中止し、DB接続・キャッシュとレート制限の接続・ワーカープールを閉じる
+
+    Args:
+    - app: FastAPIアプリケーション
+    """
+    task: asyncio.Task = asyncio.create_task(warm_up())
+    try:
+        yield
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        warmup_state.ready = False
+        await dispose_engines()
+        await cache.close()
+        await rate_limiter.close()
+        hasher.shutdown()
@@ -1,9 +1,17 @@
 """FastAPIアプリケーションのメインファイル"""
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy import exc
 
+from api.admission import AdmissionMiddleware
+from api.compression import CompressionMiddleware
 from api.config import settings
-from api.routers import auth, todo, user
+from api.deadline import DeadlineMiddleware, handle_query_canceled
+from api.lifespan import lifespan
+from api.monitoring.middleware import RequestIdMiddleware, TimingMiddleware
+from api.openapi import setup_openapi
+from api.routers import auth, health, monitoring, todo, user
+from api.services.rate_limit import enforce_rate_limit
 from api.settings import constant
 from api.settings.logging import setup_logging
 
@@ -12,8 +20,13 @@ setup_logging()
 app: FastAPI = FastAPI(
     title=settings.app_title,
     openapi_tags=constant.TAGS_METADATA,
-    docs_url=settings.docs_url,
-    redoc_url=settings.redoc_url,
+    openapi_url=None,
+    docs_url=None,
+    redoc_url=None,
+    lifespan=lifespan,
+    dependencies=(
+        [Depends(enforce_rate_limit)] if settings.rate_limit_enabled else None
+    ),
 )
 
 app.add_middleware(
@@ -23,7 +36,20 @@ app.add_middleware(
     allow_methods=settings.cors_methods,
     allow_headers=settings.cors_headers,
 )
+if settings.compression_enabled:
+    app.add_middleware(CompressionMiddleware)  # type: ignore
+if settings.admission_enabled:
+    app.add_middleware(AdmissionMiddleware)  # type: ignore
+app.add_middleware(DeadlineMiddleware)  # type: ignore
+app.add_middleware(TimingMiddleware)  # type: ignore
+app.add_middleware(RequestIdMiddleware)  # type: ignore
+
+app.add_exception_handler(exc.DBAPIError, handle_query_canceled)
 
 app.include_router(auth.router)
+app.include_router(health.router)
+app.include_router(monitoring.router)
 app.include_router(todo.router)
 app.include_router(user.router)
+
+setup_openapi(app)
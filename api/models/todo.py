@@ -2,10 +2,21 @@
 import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Boolean, Date, ForeignKey, Integer, String
+from sqlalchemy import (
+    Boolean,
+    Computed,
+    Date,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    text,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from api.database.db import Base
+from api.settings import constant
 
 if TYPE_CHECKING:
     from api.models import user as user_models
@@ -19,16 +30,38 @@ class Todo(Base):
 
     Attributes:
     - __tablename__: テーブル名を定義
+    - __table_args__: インデックスを定義
+        - ユーザーIDとIDの複合インデックス(一覧・詳細の取得)
+        - ユーザーID・完了フラグ・期限の複合インデックス(絞り込み)
+        - 未完了のTodoに限定した、ユーザーID・期限・IDの部分インデックス
+        - 全文検索用のGINインデックス
 
     - id: IDのカラム
     - detail: 詳細のカラム
     - due_date: 期限のカラム
     - done: 完了フラグのカラム
     - user_id: ユーザーIDのカラム(外部キー)
+    - search_vector: 全文検索用のカラム(タイトル・詳細から生成、遅延読み込み)
     - user: usersテーブルと関連付けするように指定
     """
 
     __tablename__: str = "todos"
+    __table_args__: tuple = (
+        Index("ix_todos_user_id_id", "user_id", "id"),
+        Index("ix_todos_user_id_done_due_date", "user_id", "done", "due_date"),
+        Index(
+            "ix_todos_user_id_due_date_undone",
+            "user_id",
+            "due_date",
+            "id",
+            postgresql_where=text("NOT done"),
+        ),
+        Index(
+            "ix_todos_search_vector",
+            "search_vector",
+            postgresql_using="gin",
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, comment="ID")
     title: Mapped[str] = mapped_column(
@@ -56,6 +89,18 @@ class Todo(Base):
         ForeignKey("users.id"),
         comment="ユーザーID",
     )
+    # タイトルの一致を詳細の一致より高く評価するため、重みを付ける
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(
+            f"setweight(to_tsvector('{constant.TODO_SEARCH_CONFIG}', title), "
+            f"'A') || setweight(to_tsvector('{constant.TODO_SEARCH_CONFIG}'"
+            ", detail), 'B')",
+            persisted=True,
+        ),
+        deferred=True,
+        comment="全文検索用のベクトル",
+    )
 
     user: Mapped["user_models.User"] = relationship(
         "User",
@@ -1,7 +1,7 @@
 """ユーザーモデルの定義ファイル"""
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Integer, String
+from sqlalchemy import BigInteger, Integer, String, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from api.database.db import Base
@@ -23,6 +23,7 @@ class User(Base):
     - username: ユーザー名のカラム
     - email: メールアドレスのカラム
     - hashed_password: ハッシュ化パスワードのカラム
+    - todo_version: Todoのバージョンのカラム(Todoを変更するたびに1増やす)
     - todos: todosテーブルと関連付けするように指定
     """
 
@@ -46,6 +47,12 @@ class User(Base):
         nullable=False,
         comment="ハッシュ化パスワード",
     )
+    todo_version: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        server_default=text("0"),
+        comment="Todoのバージョン",
+    )
 
     todos: Mapped[list["todo_models.Todo"]] = relationship(
         "Todo",
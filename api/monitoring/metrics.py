@@ -0,0 +1,423 @@
+"""ルートごとの処理時間の集計と、Prometheus形式での出力の定義ファイル"""
+import bisect
+import threading
+from dataclasses import dataclass, field
+
+from api import admission, compression
+from api.cache.cache import cache
+from api.database import db
+from api.database.pool import get_pool_stats
+from api.services import hasher
+from api.services.rate_limit import rate_limiter
+from api.settings import constant
+from api.settings import logging as logging_settings
+
+POOL_STATS: dict[str, str] = {
+    "size": "gauge",
+    "checked_out": "gauge",
+    "overflow": "gauge",
+    "checkouts": "counter",
+    "timeouts": "counter",
+    "wait_seconds_total": "counter",
+    "wait_seconds_max": "gauge",
+}
+HASHER_STATS: dict[str, str] = {
+    "in_flight": "gauge",
+    "completed": "counter",
+    "rejected": "counter",
+    "wait_seconds_total": "counter",
+    "wait_seconds_max": "gauge",
+    "compute_seconds_total": "counter",
+}
+
+
+@dataclass
+class Histogram:
+    """
+    累積バケットのヒストグラム
+
+    Attributes:
+    - buckets: バケットの上限値一覧(昇順)
+    - counts: バケットごとの観測数(累積ではない)
+    - total: 観測値の合計
+    - count: 観測数
+    """
+
+    buckets: tuple[float, ...]
+    counts: list[int] = field(default_factory=list)
+    total: float = 0.0
+    count: int = 0
+
+    def __post_init__(self) -> None:
+        """
+        バケットごとの観測数を初期化(最後の要素は+Inf)
+        """
+        self.counts = [0] * (len(self.buckets) + 1)
+
+    def observe(self, value: float) -> None:
+        """
+        値を記録
+
+        Args:
+        - value: 観測値
+        """
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def render(self, name: str, labels: str) -> list[str]:
+        """
+        Prometheus形式の行を取得
+
+        Args:
+        - name: メトリクス名
+        - labels: ラベル(「key="value",...」の形式)
+
+        Returns:
+        - バケット・合計・観測数の行
+        """
+        lines: list[str] = []
+        cumulative: int = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(
+                f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+            )
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{{{labels}}} {self.total}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+class RequestMetrics:
+    """
+    ルートごとのリクエストの処理時間の集計
+
+    - ルートはパスのテンプレート(例: /todo/detail/{todo_id})で集計する
+    - マッチしなかったリクエストは、1つのルートとしてまとめて集計する
+
+    Attributes:
+    - buckets: ヒストグラムのバケットの上限値一覧(秒)
+    """
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        """
+        インスタンスメソッド
+
+        Args:
+        - buckets: ヒストグラムのバケットの上限値一覧(秒)
+        """
+        self.buckets: tuple[float, ...] = buckets
+        self._lock: threading.Lock = threading.Lock()
+        self._durations: dict[tuple[str, str], Histogram] = {}
+        self._stages: dict[tuple[str, str, str], Histogram] = {}
+        self._responses: dict[tuple[str, str, int], int] = {}
+
+    def observe(
+        self,
+        method: str,
+        route: str,
+        status_code: int,
+        total_seconds: float,
+        stages: dict[str, float],
+    ) -> None:
+        """
+        1リクエストの処理時間を記録
+
+        Args:
+        - method: HTTPメソッド
+        - route: ルートのパス
+        - status_code: ステータスコード
+        - total_seconds: リクエスト全体の所要時間(秒)
+        - stages: 処理段階ごとの所要時間(秒)
+        """
+        with self._lock:
+            self._durations.setdefault(
+                (method, route), Histogram(self.buckets)
+            ).observe(total_seconds)
+            for stage, seconds in stages.items():
+                self._stages.setdefault(
+                    (method, route, stage), Histogram(self.buckets)
+                ).observe(seconds)
+            key: tuple[str, str, int] = (method, route, status_code)
+            self._responses[key] = self._responses.get(key, 0) + 1
+
+    def render(self) -> list[str]:
+        """
+        Prometheus形式の行を取得
+
+        Returns:
+        - リクエスト数と処理時間のヒストグラムの行
+        """
+        lines: list[str] = [
+            "# HELP http_requests_total Total HTTP requests.",
+            "# TYPE http_requests_total counter",
+        ]
+        with self._lock:
+            for (method, route, status_code), count in sorted(
+                self._responses.items()
+            ):
+                lines.append(
+                    f'http_requests_total{{method="{method}",'
+                    f'route="{route}",status="{status_code}"}} {count}'
+                )
+            lines += [
+                "# HELP http_request_duration_seconds "
+                "Time until the response starts.",
+                "# TYPE http_request_duration_seconds histogram",
+            ]
+            for (method, route), histogram in sorted(self._durations.items()):
+                lines += histogram.render(
+                    "http_request_duration_seconds",
+                    f'method="{method}",route="{route}"',
+                )
+            lines += [
+                "# HELP http_request_stage_duration_seconds "
+                "Time spent per stage (auth, db, serialize).",
+                "# TYPE http_request_stage_duration_seconds histogram",
+            ]
+            for (method, route, stage), histogram in sorted(
+                self._stages.items()
+            ):
+                lines += histogram.render(
+                    "http_request_stage_duration_seconds",
+                    f'method="{method}",route="{route}",stage="{stage}"',
+                )
+        return lines
+
+    def clear(self) -> None:
+        """
+        集計をすべて削除
+        """
+        with self._lock:
+            self._durations.clear()
+            self._stages.clear()
+            self._responses.clear()
+
+
+request_metrics: RequestMetrics = RequestMetrics(
+    constant.METRICS_LATENCY_BUCKETS
+)
+
+
+def _render_samples(
+    name: str,
+    metric_type: str,
+    help_text: str,
+    values: dict[str, float],
+) -> list[str]:
+    """
+    ラベルごとの値をPrometheus形式の行に変換
+
+    Args:
+    - name: メトリクス名
+    - metric_type: メトリクスの種類(counter/gauge)
+    - help_text: メトリクスの説明
+    - values: ラベル(「key="value"」の形式、ラベルなしは空文字)と値の辞書
+
+    Returns:
+    - メトリクスの行
+    """
+    lines: list[str] = [
+        f"# HELP {name} {help_text}",
+        f"# TYPE {name} {metric_type}",
+    ]
+    for labels, value in values.items():
+        lines.append(
+            f"{name}{{{labels}}} {value}" if labels else f"{name} {value}"
+        )
+    return lines
+
+
+def render_metrics() -> str:
+    """
+    すべてのメトリクスをPrometheus形式で取得
+
+    - ルートごとの処理時間
+    - コネクションプールの状態
+    - パスワードハッシュ計算のワーカープールの状態
+    - レスポンスの圧縮の計測値
+    - キャッシュのヒット・ミス数
+
+    Returns:
+    - Prometheus形式のテキスト
+    """
+    lines: list[str] = request_metrics.render()
+
+    pools: dict[str, dict] = {
+        "primary": get_pool_stats(db.async_engine.pool),
+    }
+    for index, engine in enumerate(db.async_read_engines):
+        pools[f"replica{index}"] = get_pool_stats(engine.pool)
+    for stat, metric_type in POOL_STATS.items():
+        lines += _render_samples(
+            f"db_pool_{stat}",
+            metric_type,
+            f"Connection pool {stat.replace('_', ' ')}.",
+            {
+                f'pool="{name}"': stats[stat]
+                for name, stats in pools.items()
+                if stat in stats
+            },
+        )
+
+    hasher_values: dict[str, float] = {
+        "in_flight": hasher.get_in_flight(),
+        "completed": hasher.metrics.completed,
+        "rejected": hasher.metrics.rejected,
+        "wait_seconds_total": hasher.metrics.wait_seconds_total,
+        "wait_seconds_max": hasher.metrics.wait_seconds_max,
+        "compute_seconds_total": hasher.metrics.compute_seconds_total,
+    }
+    for stat, value in hasher_values.items():
+        lines += _render_samples(
+            f"password_hash_{stat}",
+            HASHER_STATS[stat],
+            f"Password hash worker pool {stat.replace('_', ' ')}.",
+            {"": value},
+        )
+
+    lines += _render_samples(
+        "log_records_dropped",
+        "counter",
+        "Log records dropped because the log queue was full.",
+        {"": logging_settings.metrics.dropped},
+    )
+    lines += _render_samples(
+        "log_records_suppressed",
+        "counter",
+        "Duplicate log records suppressed.",
+        {"": logging_settings.metrics.suppressed},
+    )
+
+    compression_values: dict[str, tuple[str, dict[str, float]]] = {
+        "responses": (
+            "Responses compressed.",
+            dict(compression.metrics.responses),
+        ),
+        "input_bytes": (
+            "Bytes before compression.",
+            dict(compression.metrics.input_bytes),
+        ),
+        "output_bytes": (
+            "Bytes after compression.",
+            dict(compression.metrics.output_bytes),
+        ),
+        "cpu_seconds": (
+            "CPU time spent compressing.",
+            dict(compression.metrics.cpu_seconds),
+        ),
+    }
+    for stat, (help_text, values) in compression_values.items():
+        lines += _render_samples(
+            f"http_response_compression_{stat}_total",
+            "counter",
+            help_text,
+            {
+                f'encoding="{encoding}"': value
+                for encoding, value in sorted(values.items())
+            },
+        )
+    lines += _render_samples(
+        "http_response_compression_cache_hits_total",
+        "counter",
+        "Compressed bodies served from the cache.",
+        {"": compression.metrics.cache_hits},
+    )
+    lines += _render_samples(
+        "http_response_compression_skipped_total",
+        "counter",
+        "Responses below the minimum size left uncompressed.",
+        {"": compression.metrics.skipped},
+    )
+
+    cache_values: dict[str, tuple[str, dict[str, int]]] = {
+        "hits": ("Cache hits.", dict(cache.metrics.hits)),
+        "misses": ("Cache misses.", dict(cache.metrics.misses)),
+        "coalesced": (
+            "Cache lookups that shared an in-flight load.",
+            dict(cache.metrics.coalesced),
+        ),
+        "errors": ("Cache backend errors.", dict(cache.metrics.errors)),
+    }
+    for stat, (help_text, counts) in cache_values.items():
+        lines += _render_samples(
+            f"cache_{stat}_total",
+            "counter",
+            help_text,
+            {
+                f'namespace="{namespace}"': count
+                for namespace, count in sorted(counts.items())
+            },
+        )
+
+    lines += _render_samples(
+        "admission_admitted_total",
+        "counter",
+        "Requests admitted by the concurrency limiter.",
+        {"": admission.limiter.metrics.admitted},
+    )
+    lines += _render_samples(
+        "admission_shed_total",
+        "counter",
+        "Requests shed with 503 by the concurrency limiter.",
+        {
+            f'reason="{reason}"': count
+            for reason, count in sorted(admission.limiter.metrics.shed.items())
+        },
+    )
+    lines += _render_samples(
+        "admission_queue_wait_seconds_total",
+        "counter",
+        "Time requests spent waiting for the concurrency limiter.",
+        {"": admission.limiter.metrics.queue_wait_seconds_total},
+    )
+    admission_gauges: dict[str, tuple[str, float]] = {
+        "limit": (
+            "Current adaptive concurrency limit.",
+            admission.limiter.limit,
+        ),
+        "in_flight": (
+            "Requests currently admitted.",
+            admission.limiter.in_flight,
+        ),
+        "queued": (
+            "Requests waiting for the concurrency limiter.",
+            admission.limiter.queued,
+        ),
+    }
+    for stat, (help_text, value) in admission_gauges.items():
+        lines += _render_samples(
+            f"admission_{stat}",
+            "gauge",
+            help_text,
+            {"": value},
+        )
+
+    rate_limit_values: dict[str, tuple[str, dict[str, int]]] = {
+        "allowed": (
+            "Requests allowed by the rate limiter.",
+            dict(rate_limiter.metrics.allowed),
+        ),
+        "limited": (
+            "Requests rejected with 429 by the rate limiter.",
+            dict(rate_limiter.metrics.limited),
+        ),
+    }
+    for stat, (help_text, counts) in rate_limit_values.items():
+        lines += _render_samples(
+            f"rate_limit_{stat}_total",
+            "counter",
+            help_text,
+            {
+                f'rule="{rule}"': count
+                for rule, count in sorted(counts.items())
+            },
+        )
+    lines += _render_samples(
+        "rate_limit_errors_total",
+        "counter",
+        "Rate limit store errors (requests were allowed).",
+        {"": rate_limiter.metrics.errors},
+    )
+    return "\n".join(lines) + "\n"
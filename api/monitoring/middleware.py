@@ -0,0 +1,217 @@
+"""リクエストの処理時間を計測するミドルウェアの定義ファイル"""
+import functools
+import inspect
+import time
+import uuid
+from typing import Any, Callable
+
+from fastapi.routing import APIRoute
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.config import settings
+from api.monitoring.metrics import request_metrics
+from api.monitoring.timing import (
+    RequestTimings,
+    mark_endpoint_finished,
+    request_timings,
+)
+from api.settings import constant
+from api.settings.logging import request_id
+
+UNMATCHED_ROUTE: str = "unmatched"
+
+
+class TimedRoute(APIRoute):
+    """
+    パスオペレーション関数の終了時刻を記録するルート
+
+    - 終了時刻からレスポンスの送信開始までを、シリアライズの時間として計測するために使用する
+    - APIRouterのroute_classに指定する
+    """
+
+    def __init__(
+        self,
+        path: str,
+        endpoint: Callable[..., Any],
+        **kwargs: Any,
+    ) -> None:
+        """
+        インスタンスメソッド
+
+        - パスオペレーション関数を、終了時刻を記録する関数で包む
+        - 引数の解析はfunctools.wrapsで引き継いだ元の関数のシグネチャで行われる
+
+        Args:
+        - path: パス
+        - endpoint: パスオペレーション関数
+        - kwargs: APIRouteに渡すキーワード引数
+        """
+        wrapped: Callable[..., Any]
+        if inspect.iscoroutinefunction(endpoint):
+
+            @functools.wraps(endpoint)
+            async def wrapped(*args: Any, **kwargs: Any) -> Any:
+                try:
+                    return await endpoint(*args, **kwargs)
+                finally:
+                    mark_endpoint_finished()
+
+        else:
+
+            @functools.wraps(endpoint)
+            def wrapped(*args: Any, **kwargs: Any) -> Any:
+                try:
+                    return endpoint(*args, **kwargs)
+                finally:
+                    mark_endpoint_finished()
+
+        super().__init__(path, wrapped, **kwargs)
+
+
+class TimingMiddleware:
+    """
+    リクエストの処理時間を計測するASGIミドルウェア
+
+    - リクエスト全体・認証・DB・シリアライズの時間を計測する
+    - 計測結果をServer-Timingヘッダーに出力し、ルートごとに集計する
+    - 全体の時間は、リクエストの受信からレスポンスの送信開始までとする
+
+    Attributes:
+    - app: ASGIアプリケーション
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        インスタンスメソッド
+
+        Args:
+        - app: ASGIアプリケーション
+        """
+        self.app: ASGIApp = app
+
+    async def __call__(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        """
+        リクエストを処理
+
+        Args:
+        - scope: リクエストの情報
+        - receive: リクエストの受信関数
+        - send: レスポンスの送信関数
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings: RequestTimings = RequestTimings()
+        token = request_timings.set(timings)
+        status_code: int = 500
+        total_seconds: float | None = None
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code, total_seconds
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                total_seconds = timings.finish_response(time.perf_counter())
+                if settings.server_timing_enabled:
+                    MutableHeaders(scope=message).append(
+                        "Server-Timing",
+                        timings.server_timing(total_seconds),
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_timings.reset(token)
+            route: Any = scope.get("route")
+            request_metrics.observe(
+                scope["method"],
+                getattr(route, "path", UNMATCHED_ROUTE),
+                status_code,
+                (
+                    total_seconds
+                    if total_seconds is not None
+                    else time.perf_counter() - timings.started_at
+                ),
+                timings.stages,
+            )
+
+
+class RequestIdMiddleware:
+    """
+    リクエストIDを付与するASGIミドルウェア
+
+    - X-Request-IDヘッダーがあればその値を、なければ新しく生成した値をリクエストIDとする
+    - リクエストIDはログに出力され、レスポンスのX-Request-IDヘッダーにも付与される
+
+    Attributes:
+    - app: ASGIアプリケーション
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        インスタンスメソッド
+
+        Args:
+        - app: ASGIアプリケーション
+        """
+        self.app: ASGIApp = app
+
+    @staticmethod
+    def get_request_id(scope: Scope) -> str:
+        """
+        リクエストIDを取得
+
+        - 受け取った値が長すぎる場合や、表示できない文字を含む場合は新しく生成する
+
+        Args:
+        - scope: リクエストの情報
+
+        Returns:
+        - リクエストID
+        """
+        header: bytes = constant.REQUEST_ID_HEADER.lower().encode()
+        for name, value in scope["headers"]:
+            if name == header:
+                if (
+                    0 < len(value) <= constant.REQUEST_ID_MAX_LENGTH
+                    and value.isascii()
+                    and value.decode().isprintable()
+                ):
+                    return value.decode()
+                break
+        return uuid.uuid4().hex
+
+    async def __call__(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        """
+        リクエストを処理
+
+        Args:
+        - scope: リクエストの情報
+        - receive: リクエストの受信関数
+        - send: レスポンスの送信関数
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        current_request_id: str = self.get_request_id(scope)
+        token = request_id.set(current_request_id)
+
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(
+                    constant.REQUEST_ID_HEADER,
+                    current_request_id,
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id.reset(token)
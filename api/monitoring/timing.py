@@ -0,0 +1,172 @@
+"""リクエストごとの処理時間の内訳の計測ファイル"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+STAGES: tuple[str, ...] = ("auth", "db", "serialize")
+
+
+@dataclass
+class RequestTimings:
+    """
+    1リクエストの処理時間の内訳
+
+    Attributes:
+    - started_at: リクエストの受信時刻
+    - stages: 処理段階ごとの所要時間(秒)
+    - endpoint_finished_at: パスオペレーション関数の終了時刻
+    - after_endpoint_seconds: パスオペレーション関数の終了後に、他の処理段階に
+      加算した時間(秒)
+    """
+
+    started_at: float = field(default_factory=time.perf_counter)
+    stages: dict[str, float] = field(
+        default_factory=lambda: dict.fromkeys(STAGES, 0.0)
+    )
+    endpoint_finished_at: float | None = None
+    after_endpoint_seconds: float = 0.0
+
+    def add(self, stage: str, seconds: float) -> None:
+        """
+        処理段階の所要時間を加算
+
+        Args:
+        - stage: 処理段階の名前
+        - seconds: 所要時間(秒)
+        """
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+        if self.endpoint_finished_at is not None:
+            self.after_endpoint_seconds += seconds
+
+    def finish_response(self, response_started_at: float) -> float:
+        """
+        レスポンスの送信開始時に、シリアライズの所要時間を確定
+
+        - パスオペレーション関数の終了からレスポンスの送信開始までをシリアライズの時間とする
+        - この間には依存関数の後処理(get_dbのCOMMITなど)も含まれるため、
+          後処理のうちDBなど他の処理段階に加算した時間は除く
+
+        Args:
+        - response_started_at: レスポンスの送信開始時刻
+
+        Returns:
+        - リクエストの受信からレスポンスの送信開始までの時間(秒)
+        """
+        if self.endpoint_finished_at is not None:
+            self.add(
+                "serialize",
+                max(
+                    response_started_at
+                    - self.endpoint_finished_at
+                    - self.after_endpoint_seconds,
+                    0.0,
+                ),
+            )
+        return response_started_at - self.started_at
+
+    def server_timing(self, total_seconds: float) -> str:
+        """
+        Server-Timingヘッダーの値を取得
+
+        Args:
+        - total_seconds: リクエスト全体の所要時間(秒)
+
+        Returns:
+        - Server-Timingヘッダーの値(所要時間はミリ秒)
+        """
+        metrics: list[str] = [
+            f"{stage};dur={seconds * 1000:.3f}"
+            for stage, seconds in self.stages.items()
+        ]
+        metrics.append(f"total;dur={total_seconds * 1000:.3f}")
+        return ", ".join(metrics)
+
+
+request_timings: ContextVar[RequestTimings | None] = ContextVar(
+    "request_timings",
+    default=None,
+)
+
+
+@contextmanager
+def measure(stage: str) -> Iterator[None]:
+    """
+    処理段階の所要時間を計測
+
+    - リクエストの処理中でない場合は、計測しない
+
+    Args:
+    - stage: 処理段階の名前
+    """
+    timings: RequestTimings | None = request_timings.get()
+    if timings is None:
+        yield
+        return
+    started_at: float = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(stage, time.perf_counter() - started_at)
+
+
+def mark_endpoint_finished() -> None:
+    """
+    パスオペレーション関数の終了時刻を記録
+    """
+    timings: RequestTimings | None = request_timings.get()
+    if timings is not None:
+        timings.endpoint_finished_at = time.perf_counter()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(
+    conn: Any,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: Any,
+    executemany: bool,
+) -> None:
+    """
+    SQLの実行開始時刻を記録
+
+    - プライマリ・レプリカのすべてのエンジンが対象
+    """
+    conn.info.setdefault("cursor_started_at", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(
+    conn: Any,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: Any,
+    executemany: bool,
+) -> None:
+    """
+    SQLの実行時間をリクエストのDB時間に加算
+    """
+    started_at: float = conn.info["cursor_started_at"].pop()
+    timings: RequestTimings | None = request_timings.get()
+    if timings is not None:
+        timings.add("db", time.perf_counter() - started_at)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context: Any) -> None:
+    """
+    SQLの実行に失敗した場合に、記録した実行開始時刻を破棄
+    """
+    if exception_context.connection is None:
+        return
+    started: list[float] = exception_context.connection.info.get(
+        "cursor_started_at", []
+    )
+    if started:
+        started.pop()
@@ -0,0 +1,178 @@
+"""OpenAPIスキーマの生成と配信の定義ファイル
+
+使い方:
+    python -m api.openapi --output api/openapi.json
+"""
+import argparse
+import hashlib
+import json
+import logging
+from typing import Any
+
+from fastapi import FastAPI, Request, Response
+from fastapi.openapi.docs import (
+    get_redoc_html,
+    get_swagger_ui_html,
+    get_swagger_ui_oauth2_redirect_html,
+)
+from fastapi.openapi.utils import get_openapi
+from fastapi.responses import HTMLResponse
+
+from api.config import settings
+from api.responses import etag_matches
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+OPENAPI_URL: str = "/openapi.json"
+OAUTH2_REDIRECT_URL: str = "/docs/oauth2-redirect"
+
+
+def generate_schema(app: FastAPI) -> bytes:
+    """
+    OpenAPIスキーマを生成
+
+    - app.openapi()と異なり、生成したスキーマをアプリケーションに保持しない
+
+    Args:
+    - app: FastAPIアプリケーション
+
+    Returns:
+    - JSONにエンコードしたOpenAPIスキーマ
+    """
+    schema: dict[str, Any] = get_openapi(
+        title=app.title,
+        version=app.version,
+        openapi_version=app.openapi_version,
+        summary=app.summary,
+        description=app.description,
+        terms_of_service=app.terms_of_service,
+        contact=app.contact,
+        license_info=app.license_info,
+        routes=app.routes,
+        webhooks=app.webhooks.routes,
+        tags=app.openapi_tags,
+        servers=app.servers,
+        separate_input_output_schemas=app.separate_input_output_schemas,
+    )
+    return json.dumps(
+        schema,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode()
+
+
+class OpenAPIDocument:
+    """
+    エンコード済みのOpenAPIスキーマ
+
+    - 環境変数でファイルが指定されている場合は、ビルド時に生成したファイルを読み込む
+        - ファイルのスキーマの上限値(todo_list_max_limitなど)は、
+          ビルド時の既定の設定で生成されたもので、実行時の環境変数は反映されない
+    - 指定されていない場合や、ファイルが存在しない場合は、初回のリクエスト時に1度だけ生成する
+
+    Attributes:
+    - app: FastAPIアプリケーション
+    - path: ビルド時に生成したスキーマのファイルパス
+    """
+
+    def __init__(self, app: FastAPI, path: str | None) -> None:
+        """
+        インスタンスメソッド
+
+        Args:
+        - app: FastAPIアプリケーション
+        - path: ビルド時に生成したスキーマのファイルパス
+        """
+        self.app: FastAPI = app
+        self.path: str | None = path
+        self._body: bytes | None = None
+        self._etag: str = ""
+
+    def get(self) -> tuple[bytes, str]:
+        """
+        スキーマとETagを取得
+
+        Returns:
+        - JSONにエンコードしたスキーマとETag
+        """
+        if self._body is None:
+            if self.path is not None:
+                try:
+                    with open(self.path, "rb") as f:
+                        self._body = f.read()
+                except FileNotFoundError:
+                    logger.warning(
+                        f"OpenAPIスキーマのファイルが存在しないため、生成します: {self.path}"
+                    )
+            if self._body is None:
+                self._body = generate_schema(self.app)
+            self._etag = f'"{hashlib.sha256(self._body).hexdigest()[:32]}"'
+        return self._body, self._etag
+
+
+def setup_openapi(app: FastAPI) -> None:
+    """
+    OpenAPIスキーマとドキュメントのルートを登録
+
+    - FastAPIの既定のルートは無効にし(openapi_url=None)、代わりに登録する
+    - スキーマはエンコード済みのバイト列で返し、ETagが一致する場合は304を返す
+    - 環境変数でOpenAPIが無効にされている場合は、何も登録しない
+
+    Args:
+    - app: FastAPIアプリケーション
+    """
+    if not settings.openapi_enabled:
+        return
+
+    document: OpenAPIDocument = OpenAPIDocument(app, settings.openapi_file)
+
+    async def openapi(request: Request) -> Response:
+        body, etag = document.get()
+        headers: dict[str, str] = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("If-None-Match"), etag):
+            return Response(status_code=304, headers=headers)
+        return Response(body, media_type="application/json", headers=headers)
+
+    app.add_route(OPENAPI_URL, openapi, include_in_schema=False)
+
+    if settings.docs_url:
+
+        async def swagger_ui_html(request: Request) -> HTMLResponse:
+            return get_swagger_ui_html(
+                openapi_url=OPENAPI_URL,
+                title=f"{app.title} - Swagger UI",
+                oauth2_redirect_url=OAUTH2_REDIRECT_URL,
+            )
+
+        async def swagger_ui_redirect(request: Request) -> HTMLResponse:
+            return get_swagger_ui_oauth2_redirect_html()
+
+        app.add_route(
+            settings.docs_url, swagger_ui_html, include_in_schema=False
+        )
+        app.add_route(
+            OAUTH2_REDIRECT_URL,
+            swagger_ui_redirect,
+            include_in_schema=False,
+        )
+
+    if settings.redoc_url:
+
+        async def redoc_html(request: Request) -> HTMLResponse:
+            return get_redoc_html(
+                openapi_url=OPENAPI_URL,
+                title=f"{app.title} - ReDoc",
+            )
+
+        app.add_route(settings.redoc_url, redoc_html, include_in_schema=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OpenAPIスキーマを生成")
+    parser.add_argument("--output", default="api/openapi.json")
+    args = parser.parse_args()
+
+    from api.main import app
+
+    with open(args.output, "wb") as f:
+        f.write(generate_schema(app))
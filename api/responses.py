@@ -0,0 +1,110 @@
+"""高速なJSONレスポンスの定義ファイル"""
+import hashlib
+from typing import Any, Iterable
+
+import pydantic_core
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+
+class FastJSONResponse(Response):
+    """
+    pydantic_coreでエンコードするJSONレスポンス
+
+    - response_modelによる検証とjsonable_encoderを経由せず、1度だけバイト列に変換する
+    - DBから取得した値は、dump_row・dump_rowsで辞書に詰め替えて渡す
+    - パスオペレーション関数で直接返すため、response_modelはドキュメントの生成にのみ使用される
+    - バイト列を渡した場合は、そのまま返す
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        """
+        レスポンスボディを生成
+
+        Args:
+        - content: レスポンスの内容
+
+        Returns:
+        - JSONのバイト列
+        """
+        if isinstance(content, bytes):
+            return content
+        return pydantic_core.to_json(content)
+
+
+def dump_row(schema: type[BaseModel], row: Any) -> dict[str, Any]:
+    """
+    DBの行をスキーマのフィールドの辞書に変換
+
+    - 値の検証は行わない
+
+    Args:
+    - schema: レスポンスのスキーマ
+    - row: DBの行(ORMモデル)
+
+    Returns:
+    - フィールド名と値の辞書
+    """
+    return {name: getattr(row, name) for name in schema.model_fields}
+
+
+def dump_rows(
+    schema: type[BaseModel],
+    rows: Iterable[Any],
+) -> list[dict[str, Any]]:
+    """
+    DBの行の一覧をスキーマのフィールドの辞書の一覧に変換
+
+    - 値の検証は行わない
+
+    Args:
+    - schema: レスポンスのスキーマ
+    - rows: DBの行(ORMモデル)の一覧
+
+    Returns:
+    - フィールド名と値の辞書の一覧
+    """
+    names: list[str] = list(schema.model_fields)
+    return [{name: getattr(row, name) for name in names} for row in rows]
+
+
+def build_etag(*parts: Any) -> str:
+    """
+    強いETagを生成
+
+    - 値を連結したSHA-256ハッシュを、ダブルクォートで囲んだ文字列にする
+
+    Args:
+    - parts: ETagの元になる値
+
+    Returns:
+    - ETag
+    """
+    source: bytes = "\x1f".join(str(part) for part in parts).encode()
+    return f'"{hashlib.sha256(source).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    If-None-MatchヘッダーがETagと一致するか確認
+
+    - 弱い比較で判定する(W/の有無は区別しない)
+
+    Args:
+    - if_none_match: If-None-Matchヘッダーの値
+    - etag: レスポンスのETag
+
+    Returns:
+    - True/False
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque_tag: str = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque_tag
+        for candidate in if_none_match.split(",")
+    )
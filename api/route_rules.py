@@ -0,0 +1,55 @@
+"""「メソッド パス」ごとの設定の定義ファイル"""
+import re
+from typing import Generic, TypeVar
+
+from starlette.routing import compile_path
+
+T = TypeVar("T")
+
+
+class RouteRules(Generic[T]):
+    """
+    「メソッド パス」もしくはメソッドをキーにした設定
+
+    - ルーティング前のミドルウェアで、リクエストのパスから設定を引くために使う
+    - パスには「/todo/detail/{todo_id}」のようなパスパラメータを含められる
+    - 「メソッド パス」、パスパラメータを含む「メソッド パス」、メソッドの順に参照する
+
+    Attributes:
+    - rules: キーごとの設定
+    """
+
+    def __init__(self, rules: dict[str, T]) -> None:
+        """
+        インスタンスメソッド
+
+        Args:
+        - rules: キーごとの設定
+        """
+        self.rules: dict[str, T] = rules
+        self._templates: list[tuple[str, re.Pattern[str], T]] = []
+        for key, value in rules.items():
+            method, _, path = key.partition(" ")
+            if "{" in path:
+                regex, _, _ = compile_path(path)
+                self._templates.append((method, regex, value))
+
+    def get(self, method: str, path: str, default: T) -> T:
+        """
+        リクエストに該当する設定を取得
+
+        Args:
+        - method: メソッド
+        - path: リクエストのパス
+        - default: 該当する設定がない場合の値
+
+        Returns:
+        - 設定
+        """
+        key: str = f"{method} {path}"
+        if key in self.rules:
+            return self.rules[key]
+        for template_method, regex, value in self._templates:
+            if template_method == method and regex.match(path):
+                return value
+        return self.rules.get(method, default)
@@ -7,12 +7,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.database.db import get_db
 from api.models import user as user_models
+from api.monitoring.middleware import TimedRoute
 from api.schemas import auth as auth_schemas
 from api.services import auth as auth_services
 from api.settings import constant
 
 router: APIRouter = APIRouter(
     tags=["Auth"],
+    route_class=TimedRoute,
 )
 
 
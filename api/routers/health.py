@@ -0,0 +1,83 @@
+"""ヘルスチェック関連のパスオペレーション関数の定義ファイル"""
+from typing import Any
+
+from fastapi import APIRouter, Depends
+
+from api.exceptions import status_5xx
+from api.lifespan import warmup_state
+from api.monitoring.middleware import TimedRoute
+from api.services import health as health_services
+
+router: APIRouter = APIRouter(
+    tags=["Health"],
+    route_class=TimedRoute,
+)
+
+
+@router.get(
+    "/healthz",
+    summary="プロセスが動作しているか確認",
+)
+async def read_liveness():
+    """
+    プロセスが動作しているか確認
+
+    - DBなどへの問い合わせは行わない
+
+    Returns:
+    - 動作状態
+    """
+    return {"status": "ok"}
+
+
+@router.get(
+    "/readyz",
+    summary="リクエストを受け付けられるか確認",
+)
+async def read_readiness(
+    probe: health_services.DatabaseProbe = Depends(
+        health_services.get_database_probe
+    ),
+):
+    """
+    リクエストを受け付けられるか確認
+
+    - 以下の場合は503を返す
+        - 起動時のウォームアップが完了していない
+        - コネクションプールに空きがない
+        - DBに疎通できない(結果は一定時間キャッシュする)
+
+    Args:
+    - probe: DBの疎通確認
+
+    Returns:
+    - ウォームアップ・コネクションプール・DBの疎通の状態
+    """
+    readiness: dict[str, Any] = {
+        "status": "ready",
+        "warmup": {
+            "ready": warmup_state.ready,
+            "connections": warmup_state.connections,
+            "duration_seconds": round(warmup_state.duration_seconds, 3),
+            "error": warmup_state.error,
+        },
+        "pool": probe.get_pool_stats(),
+    }
+    if not warmup_state.ready:
+        readiness["status"] = "warming_up"
+        raise status_5xx.ServiceUnavailableException(readiness)
+    if health_services.is_pool_exhausted(readiness["pool"]):
+        readiness["status"] = "pool_exhausted"
+        raise status_5xx.ServiceUnavailableException(readiness)
+
+    result, cached = await probe.check()
+    readiness["database"] = {
+        "ok": result.ok,
+        "latency_ms": round(result.latency_seconds * 1000, 3),
+        "cached": cached,
+        "error": result.error,
+    }
+    if not result.ok:
+        readiness["status"] = "database_unavailable"
+        raise status_5xx.ServiceUnavailableException(readiness)
+    return readiness
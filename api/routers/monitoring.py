@@ -0,0 +1,31 @@
+"""監視関連のパスオペレーション関数の定義ファイル"""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from api.monitoring.metrics import render_metrics
+from api.monitoring.middleware import TimedRoute
+
+router: APIRouter = APIRouter(
+    tags=["Monitoring"],
+    route_class=TimedRoute,
+)
+
+
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    summary="メトリクスを取得",
+)
+async def read_metrics():
+    """
+    メトリクスを取得
+
+    - Prometheus形式のテキストで返す
+
+    Returns:
+    - ルートごとの処理時間、コネクションプール、パスワードハッシュ計算の状態
+    """
+    return PlainTextResponse(
+        render_metrics(),
+        media_type="text/plain; version=0.0.4",
+    )
@@ -1,22 +1,117 @@
 """Todo関連のパスオペレーション関数の定義ファイル"""
-from typing import Annotated
+import datetime
+from typing import Annotated, AsyncIterator, Literal, Sequence
 
-from fastapi import APIRouter, Depends
+import pydantic_core
+from fastapi import APIRouter, Body, Depends, Query, Request
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
 
-from api.database.db import get_db
+from api.config import settings
+from api.database.db import get_db, get_read_db, get_session_factory
 from api.models import todo as todo_models
+from api.monitoring.middleware import TimedRoute
+from api.responses import (
+    FastJSONResponse,
+    build_etag,
+    dump_row,
+    dump_rows,
+    etag_matches,
+)
 from api.schemas import todo as todo_schemas
 from api.schemas import user as user_schemas
 from api.services import todo as todo_services
 from api.services import user as user_services
+from api.settings import constant
 
 router: APIRouter = APIRouter(
     prefix="/todo",
     tags=["Todo"],
+    route_class=TimedRoute,
 )
 
 
+def get_todo_list_filter(
+    done: Annotated[bool | None, Query(description="完了フラグ")] = None,
+    due_date_from: Annotated[
+        datetime.date | None,
+        Query(description="期限の開始日"),
+    ] = None,
+    due_date_to: Annotated[
+        datetime.date | None,
+        Query(description="期限の終了日"),
+    ] = None,
+    order_by: Annotated[
+        Literal["id", "due_date"],
+        Query(description="並び替えの項目"),
+    ] = "id",
+    order: Annotated[
+        Literal["asc", "desc"],
+        Query(description="並び順"),
+    ] = "asc",
+) -> todo_schemas.TodoListFilter:
+    """
+    Todo一覧の絞り込み条件を取得
+
+    - クエリパラメータから絞り込み条件を生成する
+
+    Args:
+    - done: 完了フラグ
+    - due_date_from: 期限の開始日
+    - due_date_to: 期限の終了日
+    - order_by: 並び替えの項目
+    - order: 並び順
+
+    Returns:
+    - Todo一覧の絞り込み条件
+    """
+    return todo_schemas.TodoListFilter(
+        done=done,
+        due_date_from=due_date_from,
+        due_date_to=due_date_to,
+        order_by=order_by,
+        order=order,
+    )
+
+
+def build_todo_etag(request: Request, user_id: int, version: int) -> str:
+    """
+    TodoのレスポンスのETagを生成
+
+    - ユーザーのTodoのバージョンと、リクエストのパス・クエリパラメータから生成する
+    - Todoを変更するとバージョンが増えるため、Todoを読み込まずに判定できる
+
+    Args:
+    - request: リクエスト
+    - user_id: ユーザーID
+    - version: Todoのバージョン
+
+    Returns:
+    - ETag
+    """
+    return build_etag(user_id, version, request.url.path, request.url.query)
+
+
+def build_not_modified_response(etag: str) -> Response:
+    """
+    304のレスポンスを生成
+
+    Args:
+    - etag: ETag
+
+    Returns:
+    - ボディのないレスポンス
+    """
+    return Response(
+        status_code=304,
+        headers={
+            "ETag": etag,
+            "Cache-Control": constant.PRIVATE_CACHE_CONTROL,
+        },
+    )
+
+
 @router.post(
     "/create",
     response_model=todo_schemas.Todo,
@@ -44,24 +139,179 @@ async def create_todo(
 
 @router.get(
     "/list",
-    response_model=list[todo_schemas.Todo],
+    response_model=todo_schemas.TodoPage,
     summary="Todo一覧を取得",
 )
 async def read_todo_list(
-    user_me: Annotated[user_schemas.User, Depends(user_services.get_user_me)],
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    user_me: Annotated[
+        user_schemas.User,
+        Depends(user_services.get_read_user_me),
+    ],
+    list_filter: Annotated[
+        todo_schemas.TodoListFilter,
+        Depends(get_todo_list_filter),
+    ],
+    limit: Annotated[
+        int,
+        Query(
+            description="1ページあたりの件数",
+            ge=1,
+            le=settings.todo_list_max_limit,
+        ),
+    ] = settings.todo_list_default_limit,
+    cursor: Annotated[
+        str | None,
+        Query(description="前のページで取得したカーソル"),
+    ] = None,
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Todo一覧を取得
 
+    - キーセット方式でページごとに取得する
+    - 次のページはnext_cursorをcursorに指定して取得する
+    - If-None-MatchがETagと一致する場合は、Todoを読み込まずに304を返す
+    - 取得結果はキャッシュし、Todoのバージョンが変わるまで再利用する
+
+    Args:
+    - request: リクエスト
+    - user_me: ログインユーザー
+    - list_filter: Todo一覧の絞り込み条件
+    - limit: 1ページあたりの件数
+    - cursor: 前のページで取得したカーソル
+    - db: 非同期のDBセッション
+
+    Returns:
+    - Todo一覧のページ
+    """
+    # 読み込んだTodoがETagより古くならないよう、バージョンを先に取得する
+    version: int = await todo_services.read_todo_version(user_me.id, db)
+    etag: str = build_todo_etag(request, user_me.id, version)
+    if etag_matches(request.headers.get("If-None-Match"), etag):
+        return build_not_modified_response(etag)
+
+    return FastJSONResponse(
+        await todo_services.read_todo_page_json(
+            user_me.id,
+            version,
+            list_filter,
+            limit,
+            cursor,
+            db,
+        ),
+        headers={
+            "ETag": etag,
+            "Cache-Control": constant.PRIVATE_CACHE_CONTROL,
+        },
+    )
+
+
+@router.get(
+    "/search",
+    response_model=todo_schemas.TodoPage,
+    summary="Todoを全文検索",
+)
+async def search_todos(
+    user_me: Annotated[
+        user_schemas.User,
+        Depends(user_services.get_read_user_me),
+    ],
+    q: Annotated[
+        str,
+        Query(
+            description="検索キーワード",
+            min_length=1,
+            max_length=settings.todo_search_max_length,
+        ),
+    ],
+    limit: Annotated[
+        int,
+        Query(
+            description="1ページあたりの件数",
+            ge=1,
+            le=settings.todo_list_max_limit,
+        ),
+    ] = settings.todo_list_default_limit,
+    cursor: Annotated[
+        str | None,
+        Query(description="前のページで取得したカーソル"),
+    ] = None,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Todoを全文検索
+
+    - タイトル・詳細をキーワードで検索し、一致度の高い順に返す
+    - キーワードはWeb検索の形式(「"語句"」「or」「-除外」)で指定できる
+    - 次のページはnext_cursorをcursorに指定して取得する
+
     Args:
     - user_me: ログインユーザー
+    - q: 検索キーワード
+    - limit: 1ページあたりの件数
+    - cursor: 前のページで取得したカーソル
     - db: 非同期のDBセッション
 
     Returns:
-    - Todo一覧
+    - 検索結果のTodo一覧のページ
     """
-    return await todo_services.read_todo_list(user_me.id, db)
+    todos, next_cursor = await todo_services.search_todos(
+        user_me.id,
+        q,
+        limit,
+        cursor,
+        db,
+    )
+    return FastJSONResponse(
+        {
+            "items": dump_rows(todo_schemas.Todo, todos),
+            "next_cursor": next_cursor,
+        }
+    )
+
+
+@router.get(
+    "/list/stream",
+    response_class=StreamingResponse,
+    summary="Todo一覧をストリーミングで取得",
+)
+async def stream_todo_list(
+    user_me: Annotated[user_schemas.User, Depends(user_services.get_user_me)],
+    list_filter: Annotated[
+        todo_schemas.TodoListFilter,
+        Depends(get_todo_list_filter),
+    ],
+    session_factory: sessionmaker = Depends(get_session_factory),
+):
+    """
+    Todo一覧をストリーミングで取得
+
+    - 1行に1件のTodoを出力するNDJSON形式で返す
+
+    Args:
+    - user_me: ログインユーザー
+    - list_filter: Todo一覧の絞り込み条件
+    - session_factory: 非同期データベースセッションのファクトリ
+
+    Returns:
+    - Todo一覧のストリーミングレスポンス
+    """
+
+    async def generate_lines() -> AsyncIterator[bytes]:
+        async for todo in todo_services.stream_todo_list(
+            user_me.id,
+            list_filter,
+            session_factory,
+        ):
+            yield pydantic_core.to_json(
+                dump_row(todo_schemas.Todo, todo)
+            ) + b"\n"
+
+    return StreamingResponse(
+        generate_lines(),
+        media_type="application/x-ndjson",
+    )
 
 
 @router.get(
@@ -71,21 +321,45 @@ async def read_todo_list(
 )
 async def read_todo_detail(
     todo_id: int,
-    user_me: Annotated[user_schemas.User, Depends(user_services.get_user_me)],
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    user_me: Annotated[
+        user_schemas.User,
+        Depends(user_services.get_read_user_me),
+    ],
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Todo詳細を取得
 
+    - If-None-MatchがETagと一致する場合は、Todoを読み込まずに304を返す
+    - 取得結果はキャッシュし、Todoのバージョンが変わるまで再利用する
+
     Args:
     - todo_id: 詳細を取得したいTodoID
+    - request: リクエスト
     - user_me: ログインユーザー
     - db: 非同期のDBセッション
 
     Returns:
     - Todo詳細
     """
-    return await todo_services.read_todo_detail(todo_id, user_me.id, db)
+    version: int = await todo_services.read_todo_version(user_me.id, db)
+    etag: str = build_todo_etag(request, user_me.id, version)
+    if etag_matches(request.headers.get("If-None-Match"), etag):
+        return build_not_modified_response(etag)
+
+    return FastJSONResponse(
+        await todo_services.read_todo_detail_json(
+            todo_id,
+            user_me.id,
+            version,
+            db,
+        ),
+        headers={
+            "ETag": etag,
+            "Cache-Control": constant.PRIVATE_CACHE_CONTROL,
+        },
+    )
 
 
 @router.patch(
@@ -111,13 +385,9 @@ async def update_todo(
     Returns:
     - Todo詳細
     """
-    target_todo: todo_models.Todo = await todo_services.read_todo_detail(
+    return await todo_services.update_todo(
         todo_id,
         user_me.id,
-        db,
-    )
-    return await todo_services.update_todo(
-        target_todo,
         update_todo_data,
         db,
     )
@@ -142,4 +412,102 @@ async def delete_todo(
     - user_me: ログインユーザー
     - db: 非同期のDBセッション
     """
-    await todo_services.delete_todo(todo_id, db)
+    await todo_services.delete_todo(todo_id, user_me.id, db)
+
+
+@router.post(
+    "/bulk/create",
+    response_model=list[todo_schemas.Todo],
+    status_code=201,
+    summary="Todoを一括作成",
+)
+async def create_todos(
+    create_todo_data_list: Annotated[
+        list[todo_schemas.TodoCreate],
+        Body(min_length=1, max_length=settings.todo_bulk_max_size),
+    ],
+    user_me: Annotated[user_schemas.User, Depends(user_services.get_user_me)],
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Todoを一括作成
+
+    Args:
+    - create_todo_data_list: Todoを作成するための情報の一覧
+    - user_me: ログインユーザー
+    - db: 非同期のDBセッション
+
+    Returns:
+    - 作成したTodo一覧
+    """
+    todos: Sequence[todo_models.Todo] = await todo_services.create_todos(
+        create_todo_data_list,
+        user_me.id,
+        db,
+    )
+    return FastJSONResponse(
+        dump_rows(todo_schemas.Todo, todos),
+        status_code=201,
+    )
+
+
+@router.patch(
+    "/bulk/update",
+    response_model=list[todo_schemas.TodoBulkResult],
+    summary="Todoを一括更新",
+)
+async def update_todos(
+    update_todo_data_list: Annotated[
+        list[todo_schemas.TodoBulkUpdate],
+        Body(min_length=1, max_length=settings.todo_bulk_max_size),
+    ],
+    user_me: Annotated[user_schemas.User, Depends(user_services.get_user_me)],
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Todoを一括更新
+
+    - 存在しないTodoは、結果のstatusが404になる
+
+    Args:
+    - update_todo_data_list: Todoを更新するための情報の一覧
+    - user_me: ログインユーザー
+    - db: 非同期のDBセッション
+
+    Returns:
+    - 1件ごとの処理結果
+    """
+    return await todo_services.update_todos(
+        update_todo_data_list,
+        user_me.id,
+        db,
+    )
+
+
+@router.post(
+    "/bulk/delete",
+    response_model=list[todo_schemas.TodoBulkResult],
+    summary="Todoを一括削除",
+)
+async def delete_todos(
+    todo_ids: Annotated[
+        list[int],
+        Body(min_length=1, max_length=settings.todo_bulk_max_size),
+    ],
+    user_me: Annotated[user_schemas.User, Depends(user_services.get_user_me)],
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Todoを一括削除
+
+    - 存在しないTodoは、結果のstatusが404になる
+
+    Args:
+    - todo_ids: 削除したいTodoのIDの一覧
+    - user_me: ログインユーザー
+    - db: 非同期のDBセッション
+
+    Returns:
+    - 1件ごとの処理結果
+    """
+    return await todo_services.delete_todos(todo_ids, user_me.id, db)
@@ -6,7 +6,7 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.database.db import get_db
-from api.models import user as user_models
+from api.monitoring.middleware import TimedRoute
 from api.schemas import user as user_schemas
 from api.services import user as user_services
 
@@ -15,6 +15,7 @@ logger: logging.Logger = logging.getLogger(__name__)
 router: APIRouter = APIRouter(
     prefix="/user",
     tags=["User"],
+    route_class=TimedRoute,
 )
 
 
@@ -47,7 +48,10 @@ async def create_user(
     summary="ログインユーザーを取得",
 )
 async def read_user_me(
-    user_me: Annotated[user_models.User, Depends(user_services.get_user_me)],
+    user_me: Annotated[
+        user_schemas.User,
+        Depends(user_services.get_read_user_me),
+    ],
 ):
     """
     ログインユーザーを取得
@@ -69,7 +73,7 @@ async def read_user_me(
     summary="ログインユーザーを更新",
 )
 async def update_user(
-    user_me: Annotated[user_models.User, Depends(user_services.get_user_me)],
+    user_me: Annotated[user_schemas.User, Depends(user_services.get_user_me)],
     update_user_data: user_schemas.UserUpdate,
     db: AsyncSession = Depends(get_db),
 ):
@@ -98,7 +102,7 @@ async def update_user(
     summary="ログインユーザーを削除",
 )
 async def delete_user(
-    user_me: Annotated[user_models.User, Depends(user_services.get_user_me)],
+    user_me: Annotated[user_schemas.User, Depends(user_services.get_user_me)],
     db: AsyncSession = Depends(get_db),
 ):
     """
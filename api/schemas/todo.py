@@ -1,5 +1,6 @@
 """Todo関連のスキーマ(構造や型)定義ファイル"""
 import datetime
+from typing import Literal
 
 from pydantic import Field
 
@@ -76,3 +77,88 @@ class Todo(TodoBase):
     id: int = Field(description="ID", ge=1)
     done: bool = Field(description="完了フラグ")
     user_id: int = Field(description="ユーザーID", ge=1)
+
+
+class TodoListFilter(base.BaseSchema):
+    """
+    Todo一覧の絞り込みスキーマ
+
+    - Todo一覧の取得時に指定する絞り込み・並び替え条件のスキーマ
+
+    Attributes:
+    - done: 完了フラグのフィールド
+    - due_date_from: 期限の開始日のフィールド
+    - due_date_to: 期限の終了日のフィールド
+    - order_by: 並び替えの項目のフィールド
+    - order: 並び順のフィールド
+    """
+
+    done: bool | None = Field(default=None, description="完了フラグ")
+    due_date_from: datetime.date | None = Field(
+        default=None,
+        description="期限の開始日",
+    )
+    due_date_to: datetime.date | None = Field(
+        default=None,
+        description="期限の終了日",
+    )
+    order_by: Literal["id", "due_date"] = Field(
+        default="id",
+        description="並び替えの項目",
+    )
+    order: Literal["asc", "desc"] = Field(
+        default="asc",
+        description="並び順",
+    )
+
+
+class TodoPage(base.BaseSchema):
+    """
+    Todo一覧のページスキーマ
+
+    - Todo一覧の1ページ分を定義するスキーマ
+
+    Attributes:
+    - items: Todo一覧のフィールド
+    - next_cursor: 次のページを取得するためのカーソルのフィールド
+    """
+
+    items: list[Todo] = Field(description="Todo一覧")
+    next_cursor: str | None = Field(
+        default=None,
+        description="次のページを取得するためのカーソル",
+    )
+
+
+class TodoBulkUpdate(TodoUpdate):
+    """
+    Todo一括更新スキーマ
+
+    - Todoの一括更新時に、1件ごとに定義するスキーマ
+    - 値を省略したフィールド、もしくはnullのフィールドは更新しない
+
+    Attributes:
+    - id: IDのフィールド
+
+    Note:
+    - TodoUpdateクラスを継承
+    """
+
+    id: int = Field(description="ID", ge=1)
+
+
+class TodoBulkResult(base.BaseSchema):
+    """
+    Todo一括操作の結果スキーマ
+
+    - Todoの一括更新・一括削除時に、1件ごとの結果を定義するスキーマ
+
+    Attributes:
+    - id: IDのフィールド
+    - status: 処理結果のステータスコードのフィールド
+    - todo: 更新したTodoのフィールド
+    """
+
+    id: int = Field(description="ID")
+    status: int = Field(description="処理結果のステータスコード")
+    todo: Todo | None = Field(default=None, description="更新したTodo")
@@ -0,0 +1,113 @@
+"""本番用のサーバーの起動ファイル
+
+使い方:
+    python -m api.server
+    python -m api.server --workers 4 --port 8000
+"""
+import argparse
+import importlib.util
+import math
+import os
+from typing import Any
+
+import uvicorn
+
+from api.config import settings
+
+APP: str = "api.main:app"
+CGROUP_CPU_MAX: str = "/sys/fs/cgroup/cpu.max"
+
+
+def get_cpu_count() -> int:
+    """
+    利用できるCPUのコア数を取得
+
+    - プロセスに割り当てられたコア数と、cgroup(v2)のCPU制限の小さい方を返す
+    - コンテナでCPUが制限されている場合も、制限に合わせたコア数になる
+
+    Returns:
+    - 利用できるCPUのコア数
+    """
+    cpu_count: int = (
+        len(os.sched_getaffinity(0))
+        if hasattr(os, "sched_getaffinity")
+        else os.cpu_count() or 1
+    )
+    try:
+        with open(CGROUP_CPU_MAX) as f:
+            quota, period = f.read().split()
+    except (OSError, ValueError):
+        return cpu_count
+    if quota == "max":
+        return cpu_count
+    return max(min(cpu_count, math.ceil(int(quota) / int(period))), 1)
+
+
+def get_workers() -> int:
+    """
+    ワーカープロセス数を取得
+
+    - 環境変数で指定されていない(0の場合)は、利用できるCPUのコア数とする
+    - DBの接続数は、ワーカーごとにコネクションプールのサイズ分必要になる
+
+    Returns:
+    - ワーカープロセス数
+    """
+    if settings.server_workers > 0:
+        return settings.server_workers
+    return get_cpu_count()
+
+
+def get_server_options() -> dict[str, Any]:
+    """
+    uvicornの設定を取得
+
+    - uvloop・httptoolsがインストールされている場合は使用する
+
+    Returns:
+    - uvicorn.runに渡すキーワード引数
+    """
+    return {
+        "host": settings.server_host,
+        "port": settings.server_port,
+        "workers": get_workers(),
+        "loop": (
+            "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+        ),
+        "http": (
+            "httptools" if importlib.util.find_spec("httptools") else "h11"
+        ),
+        "backlog": settings.server_backlog,
+        "timeout_keep_alive": settings.server_keep_alive_seconds,
+        "limit_concurrency": settings.server_limit_concurrency or None,
+        "timeout_graceful_shutdown": (
+            settings.server_graceful_shutdown_seconds
+        ),
+        "access_log": settings.server_access_log,
+        "proxy_headers": True,
+        "forwarded_allow_ips": settings.server_forwarded_allow_ips,
+        "server_header": False,
+    }
+
+
+def main() -> None:
+    """
+    サーバーを起動
+
+    - コマンドライン引数で、ホスト・ポート・ワーカー数を上書きできる
+    """
+    parser = argparse.ArgumentParser(description="Todo APIのサーバーを起動")
+    parser.add_argument("--host", default=None)
+    parser.add_argument("--port", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    options: dict[str, Any] = get_server_options()
+    for name in ("host", "port", "workers"):
+        if getattr(args, name) is not None:
+            options[name] = getattr(args, name)
+    uvicorn.run(APP, **options)
+
+
+if __name__ == "__main__":
+    main()
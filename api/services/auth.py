@@ -6,12 +6,15 @@ from typing import Any
 from fastapi.security import OAuth2PasswordRequestForm
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from sqlalchemy import select
+from sqlalchemy import Select, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.cache.cache import cache
 from api.config import settings
 from api.exceptions import status_4xx
 from api.models import user as user_models
+from api.schemas import user as user_schemas
+from api.services import hasher
 from api.settings import constant
 
 logger: logging.Logger = logging.getLogger(__name__)
@@ -22,11 +25,12 @@ pwd_context: CryptContext = CryptContext(
 )
 
 
-def get_hashed_password(plain_password: str) -> str:
+async def get_hashed_password(plain_password: str) -> str:
     """
     ハッシュ化パスワードを取得
 
     - プレーンパスワードをハッシュ化する
+    - イベントループを塞がないよう、ワーカープールで計算する
 
     Args:
     - plain_password: プレーンパスワード
@@ -34,14 +38,15 @@ def get_hashed_password(plain_password: str) -> str:
     Returns:
     - ハッシュ化パスワード
     """
-    return pwd_context.hash(plain_password)
+    return await hasher.run(pwd_context.hash, plain_password)
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     パスワードを認証
 
     - プレーンパスワードとハッシュ化パスワードが一致するか確認
+    - イベントループを塞がないよう、ワーカープールで計算する
 
     Args:
     - plain_password: プレーンパスワード
@@ -50,7 +55,11 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
     - True/False
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return await hasher.run(
+        pwd_context.verify,
+        plain_password,
+        hashed_password,
+    )
 
 
 def get_encode_jwt(payload: dict[str, str | datetime]) -> str:
@@ -113,6 +122,21 @@ def get_decode_jwt(token: str) -> dict[str, Any]:
     return payload
 
 
+def build_user_by_user_name_stmt(username: str) -> Select:
+    """
+    ユーザーをユーザー名で検索するSQLを生成
+
+    Args:
+    - username: ユーザー名
+
+    Returns:
+    - SELECT文
+    """
+    return select(user_models.User).where(
+        user_models.User.username == username
+    )
+
+
 async def get_user_by_user_name(
     username: str,
     db: AsyncSession,
@@ -130,9 +154,7 @@ async def get_user_by_user_name(
     Returns:
     - ユーザーモデル
     """
-    stmt = select(user_models.User).where(
-        user_models.User.username == username
-    )
+    stmt = build_user_by_user_name_stmt(username)
     user: user_models.User | None = await db.scalar(stmt)
     if user is None:
         logger.error("ユーザーの取得に失敗しました")
@@ -143,6 +165,42 @@ async def get_user_by_user_name(
     return user
 
 
+async def get_cached_user_by_user_name(
+    username: str,
+    db: AsyncSession,
+) -> user_schemas.User:
+    """
+    ユーザーをユーザー名で取得(キャッシュあり)
+
+    - キャッシュに存在しない場合は、DBから取得してキャッシュに保存する
+    - ユーザーの更新・削除時は、コミット後にキャッシュから削除される
+    - 存在しないユーザーはキャッシュしない
+    - 同じユーザーの同時の取得は、キャッシュで1回の読み込みにまとめて結果を共有する
+
+    Args:
+    - username: ユーザー名
+    - db: 非同期のDBセッション
+
+    Returns:
+    - ユーザー
+    """
+
+    async def load() -> bytes:
+        user: user_models.User = await get_user_by_user_name(username, db)
+        return (
+            user_schemas.User.model_validate(user).model_dump_json().encode()
+        )
+
+    return user_schemas.User.model_validate_json(
+        await cache.get_or_set(
+            constant.CACHE_NAMESPACE_USER,
+            username,
+            load,
+            settings.cache_user_ttl_seconds,
+        )
+    )
+
+
 async def authenticate_user(
     form_data: OAuth2PasswordRequestForm,
     db: AsyncSession,
@@ -167,7 +225,7 @@ async def authenticate_user(
         db,
     )
 
-    is_verify_password = verify_password(
+    is_verify_password = await verify_password(
         form_data.password,
         authenticated_user.hashed_password,
     )
@@ -0,0 +1,171 @@
+"""パスワードハッシュ計算用のワーカープールの定義ファイル"""
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, TypeVar
+
+from api.config import settings
+from api.exceptions import status_5xx
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class HasherMetrics:
+    """
+    パスワードハッシュ計算の計測値
+
+    Attributes:
+    - completed: 計算が完了した件数
+    - rejected: 過負荷により拒否した件数
+    - wait_seconds_total: ワーカーの空きを待った時間の合計(秒)
+    - wait_seconds_max: ワーカーの空きを待った時間の最大値(秒)
+    - compute_seconds_total: ハッシュ計算に要した時間の合計(秒)
+    """
+
+    completed: int = 0
+    rejected: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+    compute_seconds_total: float = 0.0
+
+    def observe(self, wait_seconds: float, compute_seconds: float) -> None:
+        """
+        計算1件分の計測値を記録
+
+        Args:
+        - wait_seconds: ワーカーの空きを待った時間(秒)
+        - compute_seconds: ハッシュ計算に要した時間(秒)
+        """
+        self.completed += 1
+        self.wait_seconds_total += wait_seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, wait_seconds)
+        self.compute_seconds_total += compute_seconds
+
+
+metrics: HasherMetrics = HasherMetrics()
+
+_executor: ThreadPoolExecutor | None = None
+_lock: threading.Lock = threading.Lock()
+_in_flight: int = 0
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """
+    ワーカープールを取得
+
+    - 未作成もしくは停止済みの場合は作成する(アプリケーションの再起動に対応する)
+
+    Returns:
+    - ワーカープール
+    """
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.password_hash_workers,
+                thread_name_prefix="password-hasher",
+            )
+        return _executor
+
+
+def get_in_flight() -> int:
+    """
+    実行中および待機中の計算件数を取得
+
+    Returns:
+    - 実行中および待機中の件数
+    """
+    return _in_flight
+
+
+def _acquire_slot() -> bool:
+    """
+    計算枠を確保
+
+    Returns:
+    - 確保できた場合はTrue、上限に達している場合はFalse
+    """
+    global _in_flight
+    limit: int = (
+        settings.password_hash_workers + settings.password_hash_max_queue
+    )
+    with _lock:
+        if _in_flight >= limit:
+            return False
+        _in_flight += 1
+        return True
+
+
+def _release_slot(*_: Any) -> None:
+    """計算枠を解放"""
+    global _in_flight
+    with _lock:
+        _in_flight -= 1
+
+
+async def run(func: Callable[..., T], *args: Any) -> T:
+    """
+    ワーカープールで関数を実行
+
+    - bcryptはGILを解放するため、スレッドプールでイベントループを塞がずに計算できる
+    - 実行中と待機中の合計が上限に達している場合は、待たずに503を返す
+    - 待ち時間と計算時間をmetricsに記録する
+
+    Args:
+    - func: ワーカーで実行する関数
+    - args: 関数に渡す引数
+
+    Returns:
+    - 関数の戻り値
+    """
+    if not _acquire_slot():
+        metrics.rejected += 1
+        logger.warning("パスワードハッシュ計算の待ち数が上限に達しました")
+        raise status_5xx.ServiceUnavailableException(
+            None,
+            {"Retry-After": str(settings.password_hash_retry_after)},
+        )
+
+    submitted_at: float = time.perf_counter()
+
+    def task() -> tuple[T, float, float]:
+        started_at: float = time.perf_counter()
+        result: T = func(*args)
+        return (
+            result,
+            started_at - submitted_at,
+            time.perf_counter() - started_at,
+        )
+
+    try:
+        future: Future = _get_executor().submit(task)
+    except BaseException:
+        _release_slot()
+        raise
+    # 呼び出し元がキャンセルされても、計算が終わるまで枠を解放しない
+    future.add_done_callback(_release_slot)
+
+    result, wait_seconds, compute_seconds = await asyncio.wrap_future(future)
+    metrics.observe(wait_seconds, compute_seconds)
+    return result
+
+
+def shutdown() -> None:
+    """
+    ワーカープールを停止
+
+    - 実行中の計算の完了を待ってから停止する
+    - 停止後に計算する場合は、ワーカープールを作り直す
+    """
+    global _executor
+    with _lock:
+        executor: ThreadPoolExecutor | None = _executor
+        _executor = None
+    if executor is not None:
+        executor.shutdown(wait=True)
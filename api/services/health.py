@@ -0,0 +1,171 @@
+"""ヘルスチェック関連の関数定義ファイル"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from api.config import settings
+from api.database import db
+from api.database.pool import get_pool_stats
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ProbeResult:
+    """
+    DBの疎通確認の結果
+
+    Attributes:
+    - ok: 疎通できたか
+    - checked_at: 確認した時刻
+    - latency_seconds: 確認に要した時間(秒)
+    - error: 疎通できなかった理由
+    """
+
+    ok: bool
+    checked_at: float
+    latency_seconds: float
+    error: str | None = None
+
+
+class DatabaseProbe:
+    """
+    DBの疎通確認
+
+    - 結果を一定時間キャッシュし、多数のプローブが来てもDBへの問い合わせを増やさない
+    - 同時に確認する場合は、実行中の確認の結果を共有する
+
+    Attributes:
+    - engine: 疎通確認に使用するエンジン
+    - ttl_seconds: 結果をキャッシュする秒数
+    - timeout_seconds: 疎通確認の待ち時間(秒)
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        ttl_seconds: float,
+        timeout_seconds: float,
+    ) -> None:
+        """
+        インスタンスメソッド
+
+        Args:
+        - engine: 疎通確認に使用するエンジン
+        - ttl_seconds: 結果をキャッシュする秒数
+        - timeout_seconds: 疎通確認の待ち時間(秒)
+        """
+        self.engine: AsyncEngine = engine
+        self.ttl_seconds: float = ttl_seconds
+        self.timeout_seconds: float = timeout_seconds
+        self._result: ProbeResult | None = None
+        self._pending: asyncio.Task | None = None
+
+    async def check(self) -> tuple[ProbeResult, bool]:
+        """
+        DBの疎通を確認
+
+        Returns:
+        - 確認の結果と、キャッシュした結果か
+        """
+        result: ProbeResult | None = self._result
+        if (
+            result is not None
+            and time.monotonic() - result.checked_at < self.ttl_seconds
+        ):
+            return result, True
+        if self._pending is None:
+            self._pending = asyncio.create_task(self._ping())
+            self._pending.add_done_callback(self._clear_pending)
+        # 待っている呼び出し元がキャンセルされても、確認自体は中断しない
+        return await asyncio.shield(self._pending), False
+
+    def _clear_pending(self, task: asyncio.Task) -> None:
+        """
+        実行中の確認を完了にする
+
+        Args:
+        - task: 完了した確認のタスク
+        """
+        if not task.cancelled() and task.exception() is None:
+            self._result = task.result()
+        self._pending = None
+
+    async def _ping(self) -> ProbeResult:
+        """
+        DBにSELECT 1を発行
+
+        Returns:
+        - 確認の結果
+        """
+        started_at: float = time.monotonic()
+        try:
+            async with asyncio.timeout(self.timeout_seconds):
+                async with self.engine.connect() as conn:
+                    await conn.exec_driver_sql("SELECT 1")
+        except Exception as e:
+            logger.warning(f"DBの疎通確認に失敗しました: {e!r}")
+            return ProbeResult(
+                ok=False,
+                checked_at=time.monotonic(),
+                latency_seconds=time.monotonic() - started_at,
+                error=repr(e),
+            )
+        return ProbeResult(
+            ok=True,
+            checked_at=time.monotonic(),
+            latency_seconds=time.monotonic() - started_at,
+        )
+
+    def get_pool_stats(self) -> dict[str, Any]:
+        """
+        疎通確認に使用するエンジンのコネクションプールの状態を取得
+
+        Returns:
+        - プールの状態と計測値
+        """
+        return get_pool_stats(self.engine.pool)
+
+    def clear(self) -> None:
+        """
+        キャッシュした結果を削除
+        """
+        self._result = None
+
+
+def is_pool_exhausted(stats: dict[str, Any]) -> bool:
+    """
+    コネクションプールに空きがないか確認
+
+    - 取得中の接続数が、プールのサイズと超過分の上限の合計に達している場合
+
+    Args:
+    - stats: コネクションプールの状態
+
+    Returns:
+    - True/False
+    """
+    if settings.db_max_overflow < 0 or "checked_out" not in stats:
+        return False
+    return stats["checked_out"] >= stats["size"] + settings.db_max_overflow
+
+
+database_probe: DatabaseProbe = DatabaseProbe(
+    db.async_read_primary_engine,
+    settings.health_db_ping_ttl_seconds,
+    settings.health_db_ping_timeout_seconds,
+)
+
+
+def get_database_probe() -> DatabaseProbe:
+    """
+    DBの疎通確認を取得
+
+    Returns:
+    - DBの疎通確認
+    """
+    return database_probe
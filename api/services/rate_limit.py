@@ -0,0 +1,412 @@
+"""トークンバケット方式のレート制限の定義ファイル"""
+import logging
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any
+
+from fastapi import Request
+
+from api.cache.backend import CacheError
+from api.cache.redis import RedisBackend
+from api.config import settings
+from api.exceptions import status_4xx
+from api.services.token_cache import get_token_subject
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# KEYS[1]: バケットのキー、ARGV[1]: 容量、ARGV[2]: 1ミリ秒あたりの補充数
+# 戻り値: 次のリクエストを受け付けられるまでのミリ秒数(受け付けた場合は0)
+REDIS_TOKEN_BUCKET_SCRIPT: str = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local time = redis.call("TIME")
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local state = redis.call("HMGET", KEYS[1], "tokens", "updated_at")
+local tokens = tonumber(state[1]) or capacity
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(now - updated_at, 0) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = math.ceil((1 - tokens) / rate)
+end
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "updated_at", now)
+redis.call("PEXPIRE", KEYS[1], math.ceil(capacity / rate))
+return wait
+"""
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """
+    レート制限の設定
+
+    - period_secondsの間にcapacity件まで受け付ける
+    - バケットは空の状態からperiod_secondsで満杯まで補充される
+
+    Attributes:
+    - capacity: バケットの容量(連続で受け付けられる件数)
+    - period_seconds: バケットが満杯まで補充される秒数
+    """
+
+    capacity: int
+    period_seconds: float
+
+    @classmethod
+    def parse(cls, value: str) -> "RateLimit":
+        """
+        「件数/秒数」形式の文字列から生成
+
+        Args:
+        - value: 「件数/秒数」形式の文字列(例: 10/60)
+
+        Returns:
+        - レート制限の設定
+        """
+        capacity, _, period_seconds = value.partition("/")
+        limit: RateLimit = cls(int(capacity), float(period_seconds or 1))
+        if limit.capacity <= 0 or limit.period_seconds <= 0:
+            raise ValueError(f"Invalid rate limit: {value}")
+        return limit
+
+    @property
+    def refill_per_second(self) -> float:
+        """
+        1秒あたりの補充数
+
+        Returns:
+        - 1秒あたりの補充数
+        """
+        return self.capacity / self.period_seconds
+
+
+class RateLimitStore(ABC):
+    """
+    トークンバケットの保存先
+    """
+
+    @abstractmethod
+    async def acquire(self, key: str, limit: RateLimit) -> float:
+        """
+        バケットから1件分のトークンを取得
+
+        Args:
+        - key: バケットのキー
+        - limit: レート制限の設定
+
+        Returns:
+        - 次のリクエストを受け付けられるまでの秒数(受け付けた場合は0)
+        """
+
+    def clear(self) -> None:
+        """全バケットを削除"""
+
+    async def close(self) -> None:
+        """
+        保存先の接続を閉じる
+        """
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    """
+    プロセス内のトークンバケット
+
+    - バケットは最終更新の古い順に保持し、取得のたびに末尾へ移動する(O(1))
+    - 一定間隔で、満杯まで補充された(削除しても結果の変わらない)バケットを先頭から削除する
+    - 上限件数を超えた場合は、最も古いバケットから削除する
+    - ワーカーごとに保持するため、実際の上限はワーカー数倍になる
+    """
+
+    def __init__(self, max_keys: int, sweep_seconds: float) -> None:
+        """
+        インスタンスメソッド
+
+        Args:
+        - max_keys: 保持するバケットの最大件数
+        - sweep_seconds: 満杯のバケットを削除する間隔(秒)
+        """
+        self.max_keys: int = max_keys
+        self.sweep_seconds: float = sweep_seconds
+        self._buckets: OrderedDict[
+            str, tuple[float, float, float]
+        ] = OrderedDict()
+        self._swept_at: float = time.monotonic()
+
+    def __len__(self) -> int:
+        """
+        保持しているバケットの件数
+
+        Returns:
+        - バケットの件数
+        """
+        return len(self._buckets)
+
+    def _sweep(self, now: float) -> None:
+        """
+        満杯まで補充されたバケットを削除
+
+        - 最終更新の古い順に確認し、満杯でないバケットに達した時点で終了する
+
+        Args:
+        - now: 現在時刻(単調増加時計)
+        """
+        self._swept_at = now
+        while self._buckets:
+            _, updated_at, period_seconds = next(iter(self._buckets.values()))
+            if now - updated_at < period_seconds:
+                break
+            self._buckets.popitem(last=False)
+
+    async def acquire(self, key: str, limit: RateLimit) -> float:
+        """
+        バケットから1件分のトークンを取得
+
+        Args:
+        - key: バケットのキー
+        - limit: レート制限の設定
+
+        Returns:
+        - 次のリクエストを受け付けられるまでの秒数(受け付けた場合は0)
+        """
+        now: float = time.monotonic()
+        if now - self._swept_at >= self.sweep_seconds:
+            self._sweep(now)
+
+        tokens: float = limit.capacity
+        bucket: tuple[float, float, float] | None = self._buckets.pop(
+            key, None
+        )
+        if bucket is not None:
+            tokens = min(
+                tokens,
+                bucket[0] + (now - bucket[1]) * limit.refill_per_second,
+            )
+
+        wait_seconds: float = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait_seconds = (1 - tokens) / limit.refill_per_second
+        self._buckets[key] = (tokens, now, limit.period_seconds)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait_seconds
+
+    def clear(self) -> None:
+        """全バケットを削除"""
+        self._buckets.clear()
+
+
+class RedisRateLimitStore(RateLimitStore):
+    """
+    Redisのトークンバケット
+
+    - 全ワーカーで共有するため、設定どおりの上限で制限できる
+    - バケットの更新はLuaスクリプトで1往復・アトミックに行い、時刻はRedisの時計を使う
+    - バケットは満杯まで補充される時間で失効させ、Redis側で削除する
+    """
+
+    def __init__(self, backend: RedisBackend) -> None:
+        """
+        インスタンスメソッド
+
+        Args:
+        - backend: Redisの接続プール
+        """
+        self.backend: RedisBackend = backend
+
+    async def acquire(self, key: str, limit: RateLimit) -> float:
+        """
+        バケットから1件分のトークンを取得
+
+        Args:
+        - key: バケットのキー
+        - limit: レート制限の設定
+
+        Returns:
+        - 次のリクエストを受け付けられるまでの秒数(受け付けた場合は0)
+        """
+        wait_ms: int = await self.backend.execute(
+            "EVAL",
+            REDIS_TOKEN_BUCKET_SCRIPT,
+            1,
+            f"{settings.cache_key_prefix}:rate_limit:{key}",
+            limit.capacity,
+            repr(limit.refill_per_second / 1000),
+        )
+        return wait_ms / 1000
+
+    async def close(self) -> None:
+        """
+        Redisの接続を閉じる
+        """
+        await self.backend.close()
+
+
+@dataclass
+class RateLimitMetrics:
+    """
+    レート制限の計測値
+
+    Attributes:
+    - allowed: ルールごとの受け付けた件数
+    - limited: ルールごとの制限した件数
+    - errors: 保存先の操作に失敗した件数
+    """
+
+    allowed: dict[str, int] = field(default_factory=dict)
+    limited: dict[str, int] = field(default_factory=dict)
+    errors: int = 0
+
+
+class RateLimiter:
+    """
+    ルートごとのレート制限
+
+    - 「メソッド パス」(例: POST /token)ごとに設定したルールで制限する
+    - 設定のないルートは、既定のルールが設定されている場合はそのルールで制限する
+    - 有効なアクセストークンがある場合はユーザーごと、ない場合はIPアドレスごとに制限する
+    - 保存先の操作に失敗した場合は、制限せずに受け付ける
+
+    Attributes:
+    - store: トークンバケットの保存先
+    - rules: ルールごとのレート制限の設定
+    - default: 既定のレート制限の設定
+    - metrics: レート制限の計測値
+    """
+
+    def __init__(
+        self,
+        store: RateLimitStore,
+        rules: dict[str, RateLimit],
+        default: RateLimit | None,
+    ) -> None:
+        """
+        インスタンスメソッド
+
+        Args:
+        - store: トークンバケットの保存先
+        - rules: ルールごとのレート制限の設定
+        - default: 既定のレート制限の設定
+        """
+        self.store: RateLimitStore = store
+        self.rules: dict[str, RateLimit] = rules
+        self.default: RateLimit | None = default
+        self.metrics: RateLimitMetrics = RateLimitMetrics()
+
+    @staticmethod
+    def get_client_key(request: Request) -> str:
+        """
+        制限の単位となるクライアントのキーを取得
+
+        - 検証済みトークンのキャッシュにある場合は、署名の検証を省略する
+        - トークンが無効な場合は、IPアドレスを使う
+
+        Args:
+        - request: リクエスト
+
+        Returns:
+        - クライアントのキー
+        """
+        subject: str | None = get_token_subject(
+            request.headers.get("Authorization")
+        )
+        if subject is not None:
+            return f"user:{subject}"
+        host: str = request.client.host if request.client else "unknown"
+        return f"ip:{host}"
+
+    async def check(self, request: Request) -> None:
+        """
+        リクエストが制限を超えていないか確認
+
+        Args:
+        - request: リクエスト
+        """
+        route: Any = request.scope.get("route")
+        rule: str = f"{request.method} {getattr(route, 'path', '')}"
+        limit: RateLimit | None = self.rules.get(rule)
+        if limit is None:
+            if self.default is None:
+                return
+            rule, limit = "default", self.default
+
+        key: str = f"{rule}:{self.get_client_key(request)}"
+        try:
+            wait_seconds: float = await self.store.acquire(key, limit)
+        except CacheError as e:
+            self.metrics.errors += 1
+            logger.warning(f"レート制限を確認できませんでした: {e!r}")
+            return
+
+        counts: dict[str, int] = (
+            self.metrics.limited if wait_seconds > 0 else self.metrics.allowed
+        )
+        counts[rule] = counts.get(rule, 0) + 1
+        if wait_seconds > 0:
+            raise status_4xx.TooManyRequestsException(
+                None,
+                {"Retry-After": str(max(math.ceil(wait_seconds), 1))},
+            )
+
+    async def close(self) -> None:
+        """
+        保存先の接続を閉じる
+        """
+        await self.store.close()
+
+
+def create_store() -> RateLimitStore:
+    """
+    環境変数で指定したレート制限の保存先を生成
+
+    Returns:
+    - トークンバケットの保存先
+    """
+    if settings.rate_limit_backend == "memory":
+        return MemoryRateLimitStore(
+            settings.rate_limit_max_keys,
+            settings.rate_limit_sweep_seconds,
+        )
+    if settings.rate_limit_backend == "redis":
+        return RedisRateLimitStore(
+            RedisBackend(
+                settings.cache_redis_url,
+                settings.cache_redis_pool_size,
+                settings.cache_redis_timeout_seconds,
+            )
+        )
+    raise ValueError(
+        f"Unknown rate limit backend: {settings.rate_limit_backend}"
+    )
+
+
+rate_limiter: RateLimiter = RateLimiter(
+    create_store(),
+    {
+        rule: RateLimit.parse(value)
+        for rule, value in settings.rate_limit_routes.items()
+    },
+    (
+        RateLimit.parse(settings.rate_limit_default)
+        if settings.rate_limit_default
+        else None
+    ),
+)
+
+
+async def enforce_rate_limit(request: Request) -> None:
+    """
+    レート制限を適用する依存関数
+
+    - アプリケーション全体の依存関数として登録し、パスオペレーション関数の前に実行する
+    - 制限を超えた場合は、429とRetry-Afterを返す
+
+    Args:
+    - request: リクエスト
+    """
+    await rate_limiter.check(request)
@@ -1,17 +1,95 @@
 """Todo関連の関数定義ファイル"""
+import base64
+import binascii
+import datetime
+import hashlib
+import json
 import logging
-from typing import Sequence
+from typing import Any, AsyncIterator, Sequence
 
-from sqlalchemy import delete, insert, select, update
+import pydantic_core
+from fastapi import status
+from sqlalchemy import (
+    Boolean,
+    Date,
+    Integer,
+    Select,
+    String,
+    and_,
+    any_,
+    bindparam,
+    cast,
+    column,
+    delete,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import (
+    ARRAY,
+    REAL,
+    REGCONFIG,
+    websearch_to_tsquery,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
 
+from api.cache.cache import cache
+from api.config import settings
 from api.exceptions import status_4xx
 from api.models import todo as todo_models
+from api.models import user as user_models
+from api.responses import dump_row, dump_rows
 from api.schemas import todo as todo_schemas
+from api.settings import constant
 
 logger: logging.Logger = logging.getLogger(__name__)
 
 
+async def bump_todo_version(user_id: int, db: AsyncSession) -> None:
+    """
+    Todoのバージョンを増やす
+
+    - Todoを変更した場合に、変更と同じトランザクションで実行する
+    - 変更がロールバックされた場合は、バージョンも戻る
+
+    Args:
+    - user_id: ユーザーID
+    - db: 非同期のDBセッション
+    """
+    stmt = (
+        update(user_models.User)
+        .where(user_models.User.id == user_id)
+        .values(todo_version=user_models.User.todo_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(stmt)
+
+
+async def read_todo_version(user_id: int, db: AsyncSession) -> int:
+    """
+    Todoのバージョンを取得
+
+    - Todoを変更するたびに増えるため、Todoを読み込まずに変更の有無を判定できる
+
+    Args:
+    - user_id: ユーザーID
+    - db: 非同期のDBセッション
+
+    Returns:
+    - Todoのバージョン
+    """
+    stmt = select(user_models.User.todo_version).where(
+        user_models.User.id == user_id
+    )
+    return await db.scalar(stmt) or 0
+
+
 async def create_todo(
     create_todo_data: todo_schemas.TodoCreate,
     user_id: int,
@@ -20,7 +98,7 @@ async def create_todo(
     """
     Todoを作成
 
-    - ログインユーザーのTodoを作成する
+    - ログインユーザーのTodoを作成し、Todoのバージョンを増やす
 
     Args:
     - create_todo_data: Todoを作成するための情報
@@ -38,28 +116,383 @@ async def create_todo(
         )
         .returning(todo_models.Todo)
     )
-    return await db.scalar(stmt)
+    todo: todo_models.Todo | None = await db.scalar(stmt)
+    await bump_todo_version(user_id, db)
+    return todo
 
 
-async def read_todo_list(
+def encode_cursor(
+    todo: todo_models.Todo,
+    list_filter: todo_schemas.TodoListFilter,
+) -> str:
+    """
+    カーソルを生成
+
+    - 並び替えの項目の値とIDを、URLセーフなBase64の文字列にする
+
+    Args:
+    - todo: ページの最後のTodo
+    - list_filter: Todo一覧の絞り込み条件
+
+    Returns:
+    - カーソル
+    """
+    position: dict[str, Any] = {"id": todo.id}
+    if list_filter.order_by == "due_date":
+        position["due_date"] = todo.due_date.isoformat()
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def decode_cursor(
+    cursor: str,
+    list_filter: todo_schemas.TodoListFilter,
+) -> tuple[Any, ...]:
+    """
+    カーソルを復号
+
+    - 並び替えの項目に応じたキーの値を取り出す
+
+    Args:
+    - cursor: カーソル
+    - list_filter: Todo一覧の絞り込み条件
+
+    Returns:
+    - キーの値のタプル
+    """
+    try:
+        position: dict[str, Any] = json.loads(
+            base64.urlsafe_b64decode(cursor.encode())
+        )
+        if list_filter.order_by == "due_date":
+            return (
+                datetime.date.fromisoformat(position["due_date"]),
+                int(position["id"]),
+            )
+        return (int(position["id"]),)
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        logger.error("カーソルを復号できませんでした")
+        raise status_4xx.BadRequestException("Invalid cursor")
+
+
+def build_todo_list_stmt(
+    user_id: int,
+    list_filter: todo_schemas.TodoListFilter,
+) -> Select:
+    """
+    Todo一覧を取得するSQLを生成
+
+    - ログインユーザーのTodoを、絞り込み条件で絞り込んで並び替える
+    - 並び替えの項目が同じ値の場合は、IDで並び替える
+
+    Args:
+    - user_id: ユーザーID
+    - list_filter: Todo一覧の絞り込み条件
+
+    Returns:
+    - SELECT文
+    """
+    stmt = select(todo_models.Todo).where(todo_models.Todo.user_id == user_id)
+    if list_filter.done is not None:
+        stmt = stmt.where(todo_models.Todo.done == list_filter.done)
+    if list_filter.due_date_from is not None:
+        stmt = stmt.where(
+            todo_models.Todo.due_date >= list_filter.due_date_from
+        )
+    if list_filter.due_date_to is not None:
+        stmt = stmt.where(todo_models.Todo.due_date <= list_filter.due_date_to)
+
+    columns: list[Any] = [todo_models.Todo.id]
+    if list_filter.order_by == "due_date":
+        columns.insert(0, todo_models.Todo.due_date)
+    if list_filter.order == "desc":
+        return stmt.order_by(*[column.desc() for column in columns])
+    return stmt.order_by(*columns)
+
+
+async def create_todos(
+    create_todo_data_list: list[todo_schemas.TodoCreate],
     user_id: int,
     db: AsyncSession,
 ) -> Sequence[todo_models.Todo]:
+    """
+    Todoを一括作成
+
+    - ログインユーザーのTodoを、複数行のINSERT ... RETURNINGで一括作成する
+    - 作成したTodoは、指定した順に返す
+    - Todoのバージョンを増やす
+
+    Args:
+    - create_todo_data_list: Todoを作成するための情報の一覧
+    - user_id: ユーザーID
+    - db: 非同期のDBセッション
+
+    Returns:
+    - 作成したTodo一覧
+    """
+    stmt = insert(todo_models.Todo).returning(
+        todo_models.Todo, sort_by_parameter_order=True
+    )
+    result = await db.scalars(
+        stmt,
+        [
+            {**create_todo_data.model_dump(), "user_id": user_id}
+            for create_todo_data in create_todo_data_list
+        ],
+    )
+    todos: Sequence[todo_models.Todo] = result.all()
+    await bump_todo_version(user_id, db)
+    return todos
+
+
+async def read_todo_list(
+    user_id: int,
+    list_filter: todo_schemas.TodoListFilter,
+    limit: int,
+    cursor: str | None,
+    db: AsyncSession,
+) -> tuple[Sequence[todo_models.Todo], str | None]:
     """
     Todo一覧を取得
 
-    - ログインユーザーのTodo一覧を取得する
+    - ログインユーザーのTodo一覧を、キーセット方式でページごとに取得する
+    - 次のページの有無を判定するため、1件多く取得する
 
     Args:
     - user_id: ユーザーID
+    - list_filter: Todo一覧の絞り込み条件
+    - limit: 1ページあたりの件数
+    - cursor: 前のページで取得したカーソル
     - db: 非同期のDBセッション
 
     Returns:
-    - Todo一覧
+    - Todo一覧と、次のページを取得するためのカーソル
     """
-    stmt = select(todo_models.Todo).where(todo_models.Todo.user_id == user_id)
-    result = await db.scalars(stmt)
-    return result.all()
+    stmt = build_todo_list_stmt(user_id, list_filter)
+    if cursor is not None:
+        position: tuple[Any, ...] = decode_cursor(cursor, list_filter)
+        keys: Any = (
+            tuple_(todo_models.Todo.due_date, todo_models.Todo.id)
+            if list_filter.order_by == "due_date"
+            else todo_models.Todo.id
+        )
+        value: Any = position if len(position) > 1 else position[0]
+        stmt = stmt.where(
+            keys < value if list_filter.order == "desc" else keys > value
+        )
+
+    result = await db.scalars(stmt.limit(limit + 1))
+    todos: Sequence[todo_models.Todo] = result.all()
+    if len(todos) <= limit:
+        return todos, None
+    todos = todos[:limit]
+    return todos, encode_cursor(todos[-1], list_filter)
+
+
+async def read_todo_page_json(
+    user_id: int,
+    version: int,
+    list_filter: todo_schemas.TodoListFilter,
+    limit: int,
+    cursor: str | None,
+    db: AsyncSession,
+) -> bytes:
+    """
+    Todo一覧のページをJSONで取得(キャッシュあり)
+
+    - キーにTodoのバージョンを含めるため、Todoを変更すると変更前のキャッシュは参照されなくなる
+    - エンコード済みのJSONをキャッシュし、ヒットした場合はそのまま返す
+    - 同じページの同時の取得は、キャッシュで1回の読み込みにまとめて結果を共有する
+
+    Args:
+    - user_id: ユーザーID
+    - version: Todoのバージョン
+    - list_filter: Todo一覧の絞り込み条件
+    - limit: 1ページあたりの件数
+    - cursor: 前のページで取得したカーソル
+    - db: 非同期のDBセッション
+
+    Returns:
+    - Todo一覧のページのJSON
+    """
+
+    async def load() -> bytes:
+        todos, next_cursor = await read_todo_list(
+            user_id,
+            list_filter,
+            limit,
+            cursor,
+            db,
+        )
+        return pydantic_core.to_json(
+            {
+                "items": dump_rows(todo_schemas.Todo, todos),
+                "next_cursor": next_cursor,
+            }
+        )
+
+    params: str = f"{list_filter.model_dump_json()}:{limit}:{cursor}"
+    return await cache.get_or_set(
+        constant.CACHE_NAMESPACE_TODO_LIST,
+        f"{user_id}:{version}:{hashlib.sha256(params.encode()).hexdigest()}",
+        load,
+        settings.cache_todo_ttl_seconds,
+    )
+
+
+def build_todo_search_stmt(user_id: int, keyword: str) -> Select:
+    """
+    Todoを全文検索するSQLを生成
+
+    - ログインユーザーのTodoを、タイトル・詳細の全文検索用のカラムで検索する
+    - キーワードはWeb検索の形式(「"語句"」「or」「-除外」)で指定できる
+    - 一致度(rank列)の高い順に並び替え、一致度が同じ場合はIDで並び替える
+
+    Args:
+    - user_id: ユーザーID
+    - keyword: 検索キーワード
+
+    Returns:
+    - TodoとrankのSELECT文
+    """
+    config: Any = cast(literal(constant.TODO_SEARCH_CONFIG, String), REGCONFIG)
+    query: Any = websearch_to_tsquery(config, keyword)
+    rank: Any = func.ts_rank(
+        todo_models.Todo.search_vector,
+        query,
+        type_=REAL,
+    ).label("rank")
+    return (
+        select(todo_models.Todo, rank)
+        .where(
+            todo_models.Todo.user_id == user_id,
+            todo_models.Todo.search_vector.bool_op("@@")(query),
+        )
+        .order_by(rank.desc(), todo_models.Todo.id)
+    )
+
+
+def encode_search_cursor(todo: todo_models.Todo, rank: float) -> str:
+    """
+    全文検索のカーソルを生成
+
+    - 一致度とIDを、URLセーフなBase64の文字列にする
+
+    Args:
+    - todo: ページの最後のTodo
+    - rank: ページの最後のTodoの一致度
+
+    Returns:
+    - カーソル
+    """
+    position: dict[str, Any] = {"rank": rank, "id": todo.id}
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def decode_search_cursor(cursor: str) -> tuple[float, int]:
+    """
+    全文検索のカーソルを復号
+
+    Args:
+    - cursor: カーソル
+
+    Returns:
+    - 一致度とIDのタプル
+    """
+    try:
+        position: dict[str, Any] = json.loads(
+            base64.urlsafe_b64decode(cursor.encode())
+        )
+        return float(position["rank"]), int(position["id"])
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        logger.error("カーソルを復号できませんでした")
+        raise status_4xx.BadRequestException("Invalid cursor")
+
+
+async def search_todos(
+    user_id: int,
+    keyword: str,
+    limit: int,
+    cursor: str | None,
+    db: AsyncSession,
+) -> tuple[Sequence[todo_models.Todo], str | None]:
+    """
+    Todoを全文検索
+
+    - ログインユーザーのTodoを一致度の高い順に、キーセット方式でページごとに取得する
+    - 次のページの有無を判定するため、1件多く取得する
+
+    Args:
+    - user_id: ユーザーID
+    - keyword: 検索キーワード
+    - limit: 1ページあたりの件数
+    - cursor: 前のページで取得したカーソル
+    - db: 非同期のDBセッション
+
+    Returns:
+    - Todo一覧と、次のページを取得するためのカーソル
+    """
+    stmt = build_todo_search_stmt(user_id, keyword)
+    if cursor is not None:
+        position_rank, position_id = decode_search_cursor(cursor)
+        rank: Any = stmt.selected_columns.rank
+        stmt = stmt.where(
+            or_(
+                rank < position_rank,
+                and_(rank == position_rank, todo_models.Todo.id > position_id),
+            )
+        )
+
+    result = await db.execute(stmt.limit(limit + 1))
+    rows: Sequence[Any] = result.all()
+    todos: list[todo_models.Todo] = [row.Todo for row in rows[:limit]]
+    if len(rows) <= limit:
+        return todos, None
+    return todos, encode_search_cursor(todos[-1], rows[limit - 1].rank)
+
+
+async def stream_todo_list(
+    user_id: int,
+    list_filter: todo_schemas.TodoListFilter,
+    session_factory: sessionmaker,
+) -> AsyncIterator[todo_models.Todo]:
+    """
+    Todo一覧をストリーミングで取得
+
+    - サーバーサイドカーソルで一定件数ずつ取得するため、件数によらずメモリ使用量が一定になる
+    - レスポンスの送信中もセッションを利用するため、セッションは自身で生成する
+
+    Args:
+    - user_id: ユーザーID
+    - list_filter: Todo一覧の絞り込み条件
+    - session_factory: 非同期データベースセッションのファクトリ
+
+    Yields:
+    - Todo
+    """
+    stmt = build_todo_list_stmt(user_id, list_filter).execution_options(
+        yield_per=settings.todo_stream_batch_size
+    )
+    async with session_factory() as session:
+        result = await session.stream_scalars(stmt)
+        async for todo in result:
+            yield todo
+
+
+def build_todo_detail_stmt(todo_id: int, user_id: int) -> Select:
+    """
+    Todo詳細を取得するSQLを生成
+
+    Args:
+    - todo_id: TodoID
+    - user_id: ユーザーID
+
+    Returns:
+    - SELECT文
+    """
+    return select(todo_models.Todo).where(
+        todo_models.Todo.user_id == user_id,
+        todo_models.Todo.id == todo_id,
+    )
 
 
 async def read_todo_detail(
@@ -80,10 +513,7 @@ async def read_todo_detail(
     Returns:
     - Todo詳細
     """
-    stmt = select(todo_models.Todo).where(
-        todo_models.Todo.user_id == user_id,
-        todo_models.Todo.id == todo_id,
-    )
+    stmt = build_todo_detail_stmt(todo_id, user_id)
     todo: todo_models.Todo | None = await db.scalar(stmt)
     if todo is None:
         logger.error("Todoを取得できませんでした")
@@ -91,46 +521,247 @@ async def read_todo_detail(
     return todo
 
 
+async def read_todo_detail_json(
+    todo_id: int,
+    user_id: int,
+    version: int,
+    db: AsyncSession,
+) -> bytes:
+    """
+    Todo詳細をJSONで取得(キャッシュあり)
+
+    - キーにTodoのバージョンを含めるため、Todoを変更すると変更前のキャッシュは参照されなくなる
+    - 存在しないTodoはキャッシュしない
+    - 同じTodoの同時の取得は、キャッシュで1回の読み込みにまとめて結果(例外を含む)を共有する
+
+    Args:
+    - todo_id: TodoID
+    - user_id: ユーザーID
+    - version: Todoのバージョン
+    - db: 非同期のDBセッション
+
+    Returns:
+    - Todo詳細のJSON
+    """
+
+    async def load() -> bytes:
+        todo: todo_models.Todo = await read_todo_detail(todo_id, user_id, db)
+        return pydantic_core.to_json(dump_row(todo_schemas.Todo, todo))
+
+    return await cache.get_or_set(
+        constant.CACHE_NAMESPACE_TODO_DETAIL,
+        f"{user_id}:{version}:{todo_id}",
+        load,
+        settings.cache_todo_ttl_seconds,
+    )
+
+
 async def update_todo(
-    target_todo: todo_models.Todo,
+    todo_id: int,
+    user_id: int,
     update_todo_data: todo_schemas.TodoUpdate,
     db: AsyncSession,
-) -> todo_models.Todo | None:
+) -> todo_models.Todo:
     """
     Todoを更新
 
     - ログインユーザーのTodoを更新する
     - 部分更新が可能
+    - IDとユーザーIDで対象を絞り込んだ1つのUPDATE文で更新する
+    - 更新するフィールドがない場合は、Todo詳細を取得する
+    - 更新した場合は、Todoのバージョンを増やす
 
     Args:
-    - target_todo: 更新したいTodoモデル
+    - todo_id: 更新したいTodoID
+    - user_id: ユーザーID
     - update_todo_data: Todoを更新するための情報
     - db: 非同期のDBセッション
 
     Returns:
     - 更新したTodo
     """
+    update_data: dict = update_todo_data.model_dump(exclude_unset=True)
+    if not update_data:
+        return await read_todo_detail(todo_id, user_id, db)
+
     stmt = (
         update(todo_models.Todo)
-        .where(todo_models.Todo.id == target_todo.id)
-        .values(**update_todo_data.model_dump(exclude_unset=True))
+        .where(
+            todo_models.Todo.user_id == user_id,
+            todo_models.Todo.id == todo_id,
+        )
+        .values(**update_data)
         .returning(todo_models.Todo)
     )
-    return await db.scalar(stmt)
+    todo: todo_models.Todo | None = await db.scalar(stmt)
+    if todo is None:
+        logger.error("更新するTodoを取得できませんでした")
+        raise status_4xx.NotFoundException
+    await bump_todo_version(user_id, db)
+    return todo
 
 
 async def delete_todo(
     todo_id: int,
+    user_id: int,
     db: AsyncSession,
 ) -> None:
     """
     Todoを削除
 
     - ログインユーザーのTodoを削除する
+    - IDとユーザーIDで対象を絞り込んだ1つのDELETE文で削除する
+    - 削除した場合は、Todoのバージョンを増やす
 
     Args:
     - todo_id: 削除したいTodoのID
+    - user_id: ユーザーID
     - db: 非同期のDBセッション
     """
-    stmt = delete(todo_models.Todo).where(todo_models.Todo.id == todo_id)
-    await db.execute(stmt)
+    stmt = (
+        delete(todo_models.Todo)
+        .where(
+            todo_models.Todo.user_id == user_id,
+            todo_models.Todo.id == todo_id,
+        )
+        .returning(todo_models.Todo.id)
+    )
+    deleted_id: int | None = await db.scalar(stmt)
+    if deleted_id is None:
+        logger.error("削除するTodoを取得できませんでした")
+        raise status_4xx.NotFoundException
+    await bump_todo_version(user_id, db)
+
+
+async def update_todos(
+    update_todo_data_list: list[todo_schemas.TodoBulkUpdate],
+    user_id: int,
+    db: AsyncSession,
+) -> list[todo_schemas.TodoBulkResult]:
+    """
+    Todoを一括更新
+
+    - ログインユーザーのTodoを、UPDATE ... FROM (VALUES ...)で一括更新する
+    - nullのフィールドは更新しない
+    - 対象のTodoが存在しない場合は、その行の結果を404とする
+    - 1件以上更新した場合は、Todoのバージョンを増やす
+
+    Args:
+    - update_todo_data_list: Todoを更新するための情報の一覧
+    - user_id: ユーザーID
+    - db: 非同期のDBセッション
+
+    Returns:
+    - 1件ごとの処理結果
+    """
+    todo_ids: list[int] = [data.id for data in update_todo_data_list]
+    if len(set(todo_ids)) != len(todo_ids):
+        logger.error("一括更新するTodoIDが重複しています")
+        raise status_4xx.BadRequestException("Duplicate todo id")
+
+    rows = values(
+        column("id", Integer),
+        column("title", String),
+        column("detail", String),
+        column("due_date", Date),
+        column("done", Boolean),
+        name="rows",
+    ).data(
+        [
+            (data.id, data.title, data.detail, data.due_date, data.done)
+            for data in update_todo_data_list
+        ]
+    )
+    stmt = (
+        update(todo_models.Todo)
+        .where(
+            todo_models.Todo.id == rows.c.id,
+            todo_models.Todo.user_id == user_id,
+        )
+        .values(
+            # 全行がnullの列は型を推論できないため、明示的に型変換する
+            title=func.coalesce(
+                cast(rows.c.title, String),
+                todo_models.Todo.title,
+            ),
+            detail=func.coalesce(
+                cast(rows.c.detail, String),
+                todo_models.Todo.detail,
+            ),
+            due_date=func.coalesce(
+                cast(rows.c.due_date, Date),
+                todo_models.Todo.due_date,
+            ),
+            done=func.coalesce(
+                cast(rows.c.done, Boolean),
+                todo_models.Todo.done,
+            ),
+        )
+        .returning(todo_models.Todo)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.scalars(stmt)
+    updated_todos: dict[int, todo_models.Todo] = {
+        todo.id: todo for todo in result.all()
+    }
+    if updated_todos:
+        await bump_todo_version(user_id, db)
+    return [
+        todo_schemas.TodoBulkResult(
+            id=todo_id,
+            status=status.HTTP_200_OK,
+            todo=todo_schemas.Todo.model_validate(updated_todos[todo_id]),
+        )
+        if todo_id in updated_todos
+        else todo_schemas.TodoBulkResult(
+            id=todo_id,
+            status=status.HTTP_404_NOT_FOUND,
+        )
+        for todo_id in todo_ids
+    ]
+
+
+async def delete_todos(
+    todo_ids: list[int],
+    user_id: int,
+    db: AsyncSession,
+) -> list[todo_schemas.TodoBulkResult]:
+    """
+    Todoを一括削除
+
+    - ログインユーザーのTodoを、DELETE ... WHERE id = ANY(...)で一括削除する
+    - 対象のTodoが存在しない場合は、その行の結果を404とする
+    - 1件以上削除した場合は、Todoのバージョンを増やす
+
+    Args:
+    - todo_ids: 削除したいTodoのIDの一覧
+    - user_id: ユーザーID
+    - db: 非同期のDBセッション
+
+    Returns:
+    - 1件ごとの処理結果
+    """
+    stmt = (
+        delete(todo_models.Todo)
+        .where(
+            todo_models.Todo.user_id == user_id,
+            todo_models.Todo.id
+            == any_(bindparam("todo_ids", todo_ids, type_=ARRAY(Integer))),
+        )
+        .returning(todo_models.Todo.id)
+    )
+    result = await db.scalars(stmt)
+    deleted_ids: set[int] = set(result.all())
+    if deleted_ids:
+        await bump_todo_version(user_id, db)
+    return [
+        todo_schemas.TodoBulkResult(
+            id=todo_id,
+            status=(
+                status.HTTP_204_NO_CONTENT
+                if todo_id in deleted_ids
+                else status.HTTP_404_NOT_FOUND
+            ),
+        )
+        for todo_id in todo_ids
+    ]
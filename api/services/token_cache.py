@@ -0,0 +1,184 @@
+"""検証済みトークンのキャッシュの定義ファイル"""
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from jose import JWTError, jwt
+
+from api.config import settings
+from api.schemas import user as user_schemas
+
+
+@dataclass(frozen=True)
+class TokenCacheEntry:
+    """
+    トークンキャッシュのエントリ
+
+    Attributes:
+    - claims: デコード済みのペイロード
+    - user: ログインユーザーのスナップショット
+    - expires_at: エントリの有効期限(UNIX時間)
+    """
+
+    claims: dict[str, Any]
+    user: user_schemas.User
+    expires_at: float
+
+
+class TokenCache:
+    """
+    検証済みトークンのキャッシュ
+
+    - トークンのダイジェストをキーに、ペイロードとユーザーを保持する
+    - 上限件数を超えた場合は、最も参照されていないエントリから削除する(LRU)
+    - エントリはトークンのexpと保持時間の早い方で失効する
+    - プロセス内のキャッシュのため、他のワーカーでの更新は保持時間まで反映されない
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float) -> None:
+        """
+        インスタンスメソッド
+
+        Args:
+        - max_size: 保持する最大件数
+        - ttl_seconds: エントリの最大保持時間(秒)
+        """
+        self.max_size: int = max_size
+        self.ttl_seconds: float = ttl_seconds
+        self._entries: OrderedDict[str, TokenCacheEntry] = OrderedDict()
+        self._digests_by_user: dict[int, set[str]] = {}
+
+    @staticmethod
+    def _digest(token: str) -> str:
+        """
+        トークンのダイジェストを取得
+
+        - トークンそのものをメモリに保持しないよう、ハッシュ値をキーにする
+
+        Args:
+        - token: 認証用のトークン
+
+        Returns:
+        - トークンのダイジェスト
+        """
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> TokenCacheEntry | None:
+        """
+        エントリを取得
+
+        Args:
+        - token: 認証用のトークン
+
+        Returns:
+        - 有効なエントリ、存在しないか失効している場合はNone
+        """
+        digest: str = self._digest(token)
+        entry: TokenCacheEntry | None = self._entries.get(digest)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.time():
+            self._remove(digest)
+            return None
+        self._entries.move_to_end(digest)
+        return entry
+
+    def set(
+        self,
+        token: str,
+        claims: dict[str, Any],
+        user: user_schemas.User,
+    ) -> None:
+        """
+        エントリを保存
+
+        Args:
+        - token: 認証用のトークン
+        - claims: デコード済みのペイロード
+        - user: ログインユーザーのスナップショット
+        """
+        if self.max_size <= 0:
+            return
+        expires_at: float = time.time() + self.ttl_seconds
+        exp: Any = claims.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, float(exp))
+
+        digest: str = self._digest(token)
+        self._remove(digest)
+        self._entries[digest] = TokenCacheEntry(claims, user, expires_at)
+        self._digests_by_user.setdefault(user.id, set()).add(digest)
+        while len(self._entries) > self.max_size:
+            oldest: str = next(iter(self._entries))
+            self._remove(oldest)
+
+    def invalidate_user(self, user_id: int) -> None:
+        """
+        ユーザーに紐づくエントリをすべて削除
+
+        - ユーザーの更新・削除時に呼び出す
+
+        Args:
+        - user_id: ユーザーID
+        """
+        for digest in self._digests_by_user.pop(user_id, set()):
+            self._entries.pop(digest, None)
+
+    def clear(self) -> None:
+        """全エントリを削除"""
+        self._entries.clear()
+        self._digests_by_user.clear()
+
+    def _remove(self, digest: str) -> None:
+        """
+        エントリを削除
+
+        Args:
+        - digest: トークンのダイジェスト
+        """
+        entry: TokenCacheEntry | None = self._entries.pop(digest, None)
+        if entry is None:
+            return
+        digests: set[str] | None = self._digests_by_user.get(entry.user.id)
+        if digests is not None:
+            digests.discard(digest)
+            if not digests:
+                del self._digests_by_user[entry.user.id]
+
+
+token_cache: TokenCache = TokenCache(
+    max_size=settings.token_cache_max_size,
+    ttl_seconds=settings.token_cache_ttl_seconds,
+)
+
+
+def get_token_subject(authorization: str | None) -> str | None:
+    """
+    Authorizationヘッダーのトークンから、ユーザー名(sub)を取得
+
+    - 検証済みトークンのキャッシュにある場合は、署名の検証を省略する
+    - 同じユーザーであれば、トークンが異なっても同じ値になる
+
+    Args:
+    - authorization: Authorizationヘッダーの値
+
+    Returns:
+    - ユーザー名、トークンがないか無効な場合はNone
+    """
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    cached: TokenCacheEntry | None = token_cache.get(token)
+    if cached is not None:
+        return cached.claims["sub"]
+    try:
+        payload: dict[str, Any] = jwt.decode(
+            token,
+            settings.secret_key,
+            algorithms=settings.algorithm,
+        )
+    except JWTError:
+        return None
+    return payload.get("sub") or None
@@ -6,12 +6,16 @@ from fastapi import Depends
 from sqlalchemy import delete, insert, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.cache.cache import cache
 from api.config import settings
-from api.database.db import get_db
+from api.database.db import add_after_commit, get_db, get_read_db
 from api.exceptions import status_4xx
 from api.models import user as user_models
+from api.monitoring.timing import measure
 from api.schemas import user as user_schemas
 from api.services import auth as auth_services
+from api.services.token_cache import TokenCacheEntry, token_cache
+from api.settings import constant
 
 logger: logging.Logger = logging.getLogger(__name__)
 
@@ -32,7 +36,7 @@ async def create_user(
     Returns:
     - 作成したユーザー
     """
-    hashed_password: str = auth_services.get_hashed_password(
+    hashed_password: str = await auth_services.get_hashed_password(
         create_user_data.password
     )
     user_schema: user_schemas.UserStore = user_schemas.UserStore(
@@ -49,12 +53,15 @@ async def create_user(
     return await db.scalar(stmt)
 
 
-async def get_user_me(
-    token: Annotated[str, Depends(settings.get_oauth2_scheme())],
-    db: AsyncSession = Depends(get_db),
-) -> user_models.User:
+async def get_user_me_by_token(
+    token: str,
+    db: AsyncSession,
+) -> user_schemas.User:
     """
-    ログインユーザーを取得
+    トークンからログインユーザーを取得
+
+    - 検証済みトークンのキャッシュに存在する場合は、デコードとDB検索を省略する
+    - 存在しない場合は、トークンをデコードしてユーザーを検索し、キャッシュに保存する
 
     Args:
     - token: 認証用のトークン
@@ -63,6 +70,10 @@ async def get_user_me(
     Returns:
     - ログインユーザー
     """
+    cached: TokenCacheEntry | None = token_cache.get(token)
+    if cached is not None:
+        return cached.user
+
     payload: dict[str, Any] = auth_services.get_decode_jwt(token)
     username: Any | None = payload.get("sub")
     if username is None:
@@ -71,11 +82,73 @@ async def get_user_me(
             None,
             {"WWW-Authenticate": "Bearer"},
         )
-    return await auth_services.get_user_by_user_name(username, db)
+    user_me: user_schemas.User = (
+        await auth_services.get_cached_user_by_user_name(username, db)
+    )
+    token_cache.set(token, payload, user_me)
+    return user_me
+
+
+async def get_user_me(
+    token: Annotated[str, Depends(settings.get_oauth2_scheme())],
+    db: AsyncSession = Depends(get_db),
+) -> user_schemas.User:
+    """
+    ログインユーザーを取得
+
+    - 書き込みを行うパスオペレーション関数で使用する
+
+    Args:
+    - token: 認証用のトークン
+    - db: 非同期のDBセッション
+
+    Returns:
+    - ログインユーザー
+    """
+    with measure("auth"):
+        return await get_user_me_by_token(token, db)
+
+
+async def get_read_user_me(
+    token: Annotated[str, Depends(settings.get_oauth2_scheme())],
+    db: AsyncSession = Depends(get_read_db),
+) -> user_schemas.User:
+    """
+    読み取り用のセッションでログインユーザーを取得
+
+    - 読み取りのみを行うパスオペレーション関数で使用する
+    - パスオペレーション関数と同じ読み取り用のセッションを共有する
+
+    Args:
+    - token: 認証用のトークン
+    - db: 読み取り用の非同期のDBセッション
+
+    Returns:
+    - ログインユーザー
+    """
+    with measure("auth"):
+        return await get_user_me_by_token(token, db)
+
+
+async def invalidate_cached_user(user_id: int, username: str) -> None:
+    """
+    検証済みトークンのキャッシュと、ユーザーのキャッシュから対象ユーザーを削除
+
+    - コミット後に呼び出し、コミット前の行を読み込んだ同時のリクエストが
+      キャッシュし直したエントリも削除する
+    - 実行中の取得も切り離し、以降の取得では更新後のユーザーを読み込む
+
+    Args:
+    - user_id: ユーザーID
+    - username: ユーザー名
+    """
+    token_cache.invalidate_user(user_id)
+    cache.forget(constant.CACHE_NAMESPACE_USER, username)
+    await cache.delete(constant.CACHE_NAMESPACE_USER, username)
 
 
 async def update_user(
-    user_me: user_models.User,
+    user_me: user_schemas.User,
     update_user_data: user_schemas.UserUpdate,
     db: AsyncSession,
 ) -> user_models.User | None:
@@ -83,9 +156,11 @@ async def update_user(
     ログインユーザーを更新
 
     - 部分更新が可能
+    - コミット後に、検証済みトークンのキャッシュとユーザーのキャッシュから
+      対象ユーザーを削除する
 
     Args:
-    - user_me: 更新したいログインユーザーモデル
+    - user_me: 更新したいログインユーザー
     - update_user_data: ログインユーザーを更新するための情報
     - db: 非同期のDBセッション
 
@@ -95,9 +170,10 @@ async def update_user(
     update_data: dict = update_user_data.model_dump(exclude_unset=True)
 
     if "password" in update_data:
-        update_data["hashed_password"] = auth_services.get_hashed_password(
+        hashed_password: str = await auth_services.get_hashed_password(
             update_data["password"]
         )
+        update_data["hashed_password"] = hashed_password
         del update_data["password"]
 
     stmt = (
@@ -106,19 +182,31 @@ async def update_user(
         .values(**update_data)
         .returning(user_models.User)
     )
-    return await db.scalar(stmt)
+    updated_user: user_models.User | None = await db.scalar(stmt)
+    add_after_commit(
+        db,
+        lambda: invalidate_cached_user(user_me.id, user_me.username),
+    )
+    return updated_user
 
 
 async def delete_user(
-    user_me: user_models.User,
+    user_me: user_schemas.User,
     db: AsyncSession,
 ) -> None:
     """
     ログインユーザーを削除
 
+    - コミット後に、検証済みトークンのキャッシュとユーザーのキャッシュから
+      対象ユーザーを削除する
+
     Args:
-    - user_me: 削除したいログインユーザーモデル
+    - user_me: 削除したいログインユーザー
     - db: 非同期のDBセッション
     """
     stmt = delete(user_models.User).where(user_models.User.id == user_me.id)
     await db.execute(stmt)
+    add_after_commit(
+        db,
+        lambda: invalidate_cached_user(user_me.id, user_me.username),
+    )
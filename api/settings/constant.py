@@ -12,9 +12,55 @@ TAGS_METADATA: list[dict[str, str]] = [
         "name": "Todo",
         "description": "Todo関連のAPI",
     },
+    {
+        "name": "Health",
+        "description": "ヘルスチェック関連のAPI",
+    },
+    {
+        "name": "Monitoring",
+        "description": "監視関連のAPI",
+    },
 ]
 
 CRYPT_CONTEXT_SCHEMES: list[str] = ["bcrypt"]
 CRYPT_CONTEXT_DEPRECATED: str = "auto"
 
 TOKEN_TYPE: str = "bearer"
+
+REQUEST_ID_HEADER: str = "X-Request-ID"
+REQUEST_ID_MAX_LENGTH: int = 128
+
+CACHE_NAMESPACE_USER: str = "user"
+CACHE_NAMESPACE_TODO_LIST: str = "todo_list"
+CACHE_NAMESPACE_TODO_DETAIL: str = "todo_detail"
+CACHE_NAMESPACE_READ_YOUR_WRITES: str = "read_your_writes"
+
+TODO_SEARCH_CONFIG: str = "simple"
+
+PRIVATE_CACHE_CONTROL: str = "private, no-cache"
+
+COMPRESSIBLE_MEDIA_TYPES: frozenset[str] = frozenset(
+    {
+        "application/json",
+        "application/javascript",
+        "application/x-ndjson",
+        "application/xml",
+        "image/svg+xml",
+    }
+)
+
+METRICS_LATENCY_BUCKETS: tuple[float, ...] = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
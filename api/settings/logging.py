@@ -1,16 +1,392 @@
 """Loggingの設定ファイル"""
+import atexit
+import json
 import logging
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any
+
+from api.config import settings
+
+LOG_FILE: str = "api/logs/api.log"
+
+request_id: ContextVar[str | None] = ContextVar("request_id", default=None)
+
+
+@dataclass
+class LoggingMetrics:
+    """
+    ログ出力の計測値
+
+    Attributes:
+    - dropped: キューが満杯のため破棄したログの件数
+    - suppressed: 重複のため抑制したログの件数
+    """
+
+    dropped: int = 0
+    suppressed: int = 0
+
+
+metrics: LoggingMetrics = LoggingMetrics()
+
+
+class RequestIdFilter(logging.Filter):
+    """
+    ログにリクエストIDを付与するフィルター
+
+    - ログを出力したスレッド・タスクのリクエストIDを、キューに入れる前に付与する
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """
+        リクエストIDを付与
+
+        Args:
+        - record: ログレコード
+
+        Returns:
+        - 常にTrue
+        """
+        record.request_id = request_id.get()
+        return True
+
+
+class DuplicateFilter(logging.Filter):
+    """
+    同じ内容のログを一定時間抑制するフィルター
+
+    - ロガー名・レベル・メッセージが同じログは、期間内に1件のみ出力する
+    - 期間の経過後に出力するログに、抑制した件数を付与する
+    - 他のログまで抑制しないよう、クライアント起因のログを出力するロガーにのみ付与する
+
+    Attributes:
+    - window_seconds: 同じ内容のログを抑制する秒数(0以下の場合は抑制しない)
+    - max_size: 記録する最大件数(超えた場合は最も古い記録から削除する)
+    """
+
+    def __init__(self, window_seconds: float, max_size: int = 1000) -> None:
+        """
+        インスタンスメソッド
+
+        Args:
+        - window_seconds: 同じ内容のログを抑制する秒数
+        - max_size: 記録する最大件数
+        """
+        super().__init__()
+        self.window_seconds: float = window_seconds
+        self.max_size: int = max_size
+        self._lock: threading.Lock = threading.Lock()
+        self._seen: OrderedDict[
+            tuple[str, int, str], tuple[float, int]
+        ] = OrderedDict()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """
+        ログを出力するか判定
+
+        Args:
+        - record: ログレコード
+
+        Returns:
+        - 出力する場合はTrue、抑制する場合はFalse
+        """
+        if self.window_seconds <= 0:
+            return True
+        key: tuple[str, int, str] = (
+            record.name,
+            record.levelno,
+            record.getMessage(),
+        )
+        now: float = time.monotonic()
+        with self._lock:
+            emitted_at, suppressed = self._seen.get(key, (0.0, 0))
+            if emitted_at and now - emitted_at < self.window_seconds:
+                self._seen[key] = (emitted_at, suppressed + 1)
+                metrics.suppressed += 1
+                return False
+            self._seen.pop(key, None)
+            self._seen[key] = (now, 0)
+            while len(self._seen) > self.max_size:
+                self._seen.popitem(last=False)
+        record.suppressed = suppressed
+        return True
+
+
+class DropCountingQueueHandler(QueueHandler):
+    """
+    キューが満杯の場合にログを破棄するQueueHandler
+
+    - ログの出力でリクエストの処理を待たせないため、キューに空きがなければ破棄して件数を数える
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        キューに入れるログを準備
+
+        - メッセージの引数と例外情報を文字列に変換し、別スレッドで安全に扱えるようにする
+
+        Args:
+        - record: ログレコード
+
+        Returns:
+        - 準備したログレコード
+        """
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(
+                record.exc_info
+            )
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """
+        ログをキューに入れる
+
+        Args:
+        - record: ログレコード
+        """
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.dropped += 1
+
+
+class BatchingFileHandler(logging.FileHandler):
+    """
+    書き込みのたびにフラッシュしないFileHandler
+
+    - ログはメモリに溜め、フラッシュ時に1回の書き込みでファイルに追記する
+        - 複数のワーカーが同じファイルに追記しても、行の途中で他のワーカーの
+          ログが混ざらないよう、ログの区切りでのみ書き込む
+    - フラッシュは、BatchingQueueListenerがまとめて行う
+    """
+
+    def __init__(self, filename: str, encoding: str) -> None:
+        """
+        インスタンスメソッド
+
+        Args:
+        - filename: ログファイルのパス
+        - encoding: ログファイルの文字コード
+        """
+        super().__init__(filename, encoding=encoding, delay=True)
+        self._buffer: list[str] = []
+        self._fd: int | None = None
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """
+        ログをバッファに書き込む
+
+        Args:
+        - record: ログレコード
+        """
+        try:
+            self._buffer.append(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        """
+        バッファのログを、O_APPENDで開いたファイルにまとめて追記
+        """
+        with self.lock:  # type: ignore
+            if not self._buffer:
+                return
+            data: bytes = "".join(self._buffer).encode(
+                self.encoding or "utf-8"
+            )
+            self._buffer.clear()
+            if self._fd is None:
+                self._fd = os.open(
+                    self.baseFilename,
+                    os.O_WRONLY | os.O_APPEND | os.O_CREAT,
+                    0o644,
+                )
+            while data:
+                written: int = os.write(self._fd, data)
+                data = data[written:]
+
+    def close(self) -> None:
+        """
+        バッファのログを書き込んでファイルを閉じる
+        """
+        self.flush()
+        with self.lock:  # type: ignore
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+        super().close()
+
+
+class BatchingQueueListener(QueueListener):
+    """
+    まとめてフラッシュするQueueListener
+
+    - キューが空になった時、もしくは一定件数を書き込んだ時にフラッシュする
+
+    Attributes:
+    - batch_size: フラッシュせずに書き込む最大件数
+    """
+
+    def __init__(
+        self,
+        log_queue: queue.Queue,
+        *handlers: logging.Handler,
+        batch_size: int,
+    ) -> None:
+        """
+        インスタンスメソッド
+
+        Args:
+        - log_queue: ログのキュー
+        - handlers: ログを書き込むハンドラー
+        - batch_size: フラッシュせずに書き込む最大件数
+        """
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.batch_size: int = batch_size
+        self._log_queue: queue.Queue = log_queue
+        self._pending: int = 0
+
+    def dequeue(self, block: bool) -> Any:
+        """
+        キューからログを取り出す
+
+        - キューが空の場合は、書き込み済みのログをフラッシュしてから待つ
+
+        Args:
+        - block: キューが空の場合に待つか
+
+        Returns:
+        - ログレコード
+        """
+        if self._pending >= self.batch_size:
+            self.flush()
+        try:
+            record: Any = self._log_queue.get_nowait()
+        except queue.Empty:
+            self.flush()
+            record = self._log_queue.get(block)
+        self._pending += 1
+        return record
+
+    def enqueue_sentinel(self) -> None:
+        """
+        終了を通知する値をキューに入れる
+
+        - キューが満杯でも確実に終了させるため、空きを待って入れる
+        - QueueListenerは、Noneを受け取ると終了する
+        """
+        self._log_queue.put(None)
+
+    def flush(self) -> None:
+        """
+        ハンドラーをフラッシュ
+        """
+        for handler in self.handlers:
+            handler.flush()
+        self._pending = 0
+
+    def stop(self) -> None:
+        """
+        キューのログをすべて書き込んで停止
+        """
+        super().stop()
+        self.flush()
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    1行1件のJSON形式で出力するFormatter
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        """
+        ログをJSONに変換
+
+        Args:
+        - record: ログレコード
+
+        Returns:
+        - JSON文字列
+        """
+        log: dict[str, Any] = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "line": record.lineno,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        suppressed: int = getattr(record, "suppressed", 0)
+        if suppressed:
+            log["suppressed"] = suppressed
+        if record.exc_info:
+            log["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            log["exc_info"] = record.exc_text
+        return json.dumps(log, ensure_ascii=False)
+
+
+_listener: BatchingQueueListener | None = None
 
 
 def setup_logging() -> None:
     """
     ロギングの設定
 
-    - 出力するログの設定を行う
+    - ログはキューに入れ、別スレッドでファイルにJSON形式で書き込む
+    - キューが満杯の場合は破棄し、リクエストの処理を待たせない
+    - 指定したロガーの同じ内容のログは、一定時間抑制する
     """
-    logging.basicConfig(
-        filename="api/logs/api.log",
-        format="[%(levelname)s] %(asctime)s | "
-        "%(name)s:%(lineno)d | %(message)s",
-        level=logging.INFO,
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.log_queue_size)
+    file_handler: BatchingFileHandler = BatchingFileHandler(
+        LOG_FILE,
+        encoding="utf-8",
     )
+    file_handler.setFormatter(JsonFormatter())
+
+    queue_handler: DropCountingQueueHandler = DropCountingQueueHandler(
+        log_queue
+    )
+    queue_handler.addFilter(RequestIdFilter())
+
+    duplicate_filter: DuplicateFilter = DuplicateFilter(
+        settings.log_duplicate_window_seconds
+    )
+    for name in settings.log_duplicate_loggers:
+        logging.getLogger(name).addFilter(duplicate_filter)
+
+    root: logging.Logger = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(queue_handler)
+
+    _listener = BatchingQueueListener(
+        log_queue,
+        file_handler,
+        batch_size=settings.log_flush_batch_size,
+    )
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """
+    キューのログをすべて書き込んで、書き込み用のスレッドを停止
+    """
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    _listener = None
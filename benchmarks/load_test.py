@@ -0,0 +1,457 @@
+"""APIの負荷試験とレイテンシの計測を行うファイル
+
+- N人のユーザーと、ユーザーごとにM件のTodoを投入する
+- /token・/todo/list・/todo/create・/todo/updateに、指定した並列数でリクエストする
+- エンドポイントごとのスループットとp50/p95/p99をJSONで出力する
+- 基準のJSONを指定した場合は、p95が許容値を超えて悪化したエンドポイントがあれば
+  終了コード1で終了する
+
+- --base-urlを指定しない場合は、プロセス内でアプリケーションを起動して計測する
+  (DBは環境変数の接続先を使用する)
+
+使い方:
+    python -m benchmarks.load_test --users 10 --todos 1000 --concurrency 32
+    python -m benchmarks.load_test --base-url http://localhost:8000 \\
+        --output result.json
+    python -m benchmarks.load_test --baseline result.json --max-regression 0.2
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+import httpx
+
+from api.config import settings
+
+ENDPOINTS: tuple[str, ...] = ("token", "list", "create", "update")
+
+
+@dataclass
+class BenchUser:
+    """
+    計測に使用するユーザー
+
+    Attributes:
+    - username: ユーザー名
+    - password: パスワード
+    - headers: 認証ヘッダー
+    - todo_ids: 投入したTodoIDの一覧
+    """
+
+    username: str
+    password: str
+    headers: dict[str, str] = field(default_factory=dict)
+    todo_ids: list[int] = field(default_factory=list)
+
+
+@dataclass
+class EndpointResult:
+    """
+    エンドポイントごとの計測結果
+
+    Attributes:
+    - latencies: 成功したリクエストのレイテンシ一覧(秒)
+    - errors: 失敗したリクエストの件数
+    - elapsed_seconds: 計測にかかった時間(秒)
+    """
+
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    elapsed_seconds: float = 0.0
+
+    def summary(self) -> dict[str, Any]:
+        """
+        計測結果を集計
+
+        Returns:
+        - リクエスト数・エラー数・スループット・レイテンシ(ミリ秒)
+        """
+        requests: int = len(self.latencies) + self.errors
+        latencies: list[float] = sorted(self.latencies)
+        return {
+            "requests": requests,
+            "errors": self.errors,
+            "throughput_rps": (
+                round(requests / self.elapsed_seconds, 2)
+                if self.elapsed_seconds > 0
+                else 0.0
+            ),
+            "latency_ms": {
+                "p50": percentile_ms(latencies, 50),
+                "p95": percentile_ms(latencies, 95),
+                "p99": percentile_ms(latencies, 99),
+                "mean": (
+                    round(sum(latencies) / len(latencies) * 1000, 3)
+                    if latencies
+                    else 0.0
+                ),
+                "max": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+            },
+        }
+
+
+def percentile_ms(sorted_latencies: list[float], percent: float) -> float:
+    """
+    パーセンタイル値を取得(最近接順位法)
+
+    Args:
+    - sorted_latencies: 昇順に並べたレイテンシ一覧(秒)
+    - percent: パーセンタイル(0〜100)
+
+    Returns:
+    - パーセンタイル値(ミリ秒)
+    """
+    if not sorted_latencies:
+        return 0.0
+    rank: int = max(math.ceil(len(sorted_latencies) * percent / 100), 1)
+    return round(sorted_latencies[rank - 1] * 1000, 3)
+
+
+def build_client(base_url: str | None, concurrency: int) -> httpx.AsyncClient:
+    """
+    計測に使用するHTTPクライアントを生成
+
+    Args:
+    - base_url: 計測対象のURL、Noneの場合はプロセス内のアプリケーション
+    - concurrency: 並列数
+
+    Returns:
+    - 非同期HTTPクライアント
+    """
+    limits: httpx.Limits = httpx.Limits(
+        max_connections=concurrency,
+        max_keepalive_connections=concurrency,
+    )
+    if base_url is not None:
+        return httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60)
+
+    from api.main import app
+
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),  # type: ignore[arg-type]
+        base_url="http://bench",
+        timeout=60,
+    )
+
+
+async def login(client: httpx.AsyncClient, user: BenchUser) -> httpx.Response:
+    """
+    ログインしてアクセストークンを取得
+
+    Args:
+    - client: 非同期HTTPクライアント
+    - user: 計測に使用するユーザー
+
+    Returns:
+    - レスポンス
+    """
+    return await client.post(
+        "/token",
+        data={"username": user.username, "password": user.password},
+    )
+
+
+async def seed(
+    client: httpx.AsyncClient,
+    users: int,
+    todos: int,
+) -> list[BenchUser]:
+    """
+    計測に使用するユーザーとTodoを投入
+
+    - 実行ごとに異なるユーザー名を使用するため、既存のデータとは重複しない
+    - Todoは一括作成のエンドポイントで投入する
+
+    Args:
+    - client: 非同期HTTPクライアント
+    - users: 投入するユーザーの件数
+    - todos: ユーザーごとに投入するTodoの件数
+
+    Returns:
+    - 投入したユーザーの一覧
+    """
+    run_id: str = uuid.uuid4().hex[:8]
+    bench_users: list[BenchUser] = []
+    for index in range(users):
+        user: BenchUser = BenchUser(
+            username=f"bench_{run_id}_{index}",
+            password=f"bench_password_{run_id}",
+        )
+        res: httpx.Response = await client.post(
+            "/user/create",
+            json={
+                "username": user.username,
+                "email": f"{user.username}@example.com",
+                "password": user.password,
+            },
+        )
+        res.raise_for_status()
+        res = await login(client, user)
+        res.raise_for_status()
+        user.headers = {
+            "Authorization": f"Bearer {res.json()['access_token']}",
+        }
+        for start in range(0, todos, settings.todo_bulk_max_size):
+            size: int = min(settings.todo_bulk_max_size, todos - start)
+            res = await client.post(
+                "/todo/bulk/create",
+                json=[
+                    {
+                        "title": f"bench todo {start + offset}",
+                        "detail": "bench",
+                        "due_date": f"2030-01-{1 + (start + offset) % 28:02}",
+                    }
+                    for offset in range(size)
+                ],
+                headers=user.headers,
+            )
+            res.raise_for_status()
+            user.todo_ids.extend(todo["id"] for todo in res.json())
+        bench_users.append(user)
+    return bench_users
+
+
+async def cleanup(client: httpx.AsyncClient, users: list[BenchUser]) -> None:
+    """
+    投入したユーザーとTodoを削除
+
+    - ユーザーの削除前に、計測中に作成したものを含むTodoをすべて削除する
+
+    Args:
+    - client: 非同期HTTPクライアント
+    - users: 投入したユーザーの一覧
+    """
+    for user in users:
+        while True:
+            res: httpx.Response = await client.get(
+                "/todo/list",
+                params={
+                    "limit": min(
+                        settings.todo_bulk_max_size,
+                        settings.todo_list_max_limit,
+                    )
+                },
+                headers=user.headers,
+            )
+            todo_ids: list[int] = [todo["id"] for todo in res.json()["items"]]
+            if not todo_ids:
+                break
+            await client.post(
+                "/todo/bulk/delete",
+                json=todo_ids,
+                headers=user.headers,
+            )
+        await client.delete("/user/delete", headers=user.headers)
+
+
+def build_request(
+    client: httpx.AsyncClient,
+    endpoint: str,
+) -> Callable[[BenchUser, int], Awaitable[httpx.Response]]:
+    """
+    エンドポイントへのリクエストを生成する関数を取得
+
+    Args:
+    - client: 非同期HTTPクライアント
+    - endpoint: エンドポイント名
+
+    Returns:
+    - ユーザーとリクエスト番号を受け取り、リクエストを送信する関数
+    """
+
+    async def request(user: BenchUser, index: int) -> httpx.Response:
+        if endpoint == "token":
+            return await login(client, user)
+        if endpoint == "list":
+            return await client.get("/todo/list", headers=user.headers)
+        if endpoint == "create":
+            return await client.post(
+                "/todo/create",
+                json={
+                    "title": f"bench create {index}",
+                    "detail": "bench",
+                    "due_date": "2030-01-01",
+                },
+                headers=user.headers,
+            )
+        return await client.patch(
+            f"/todo/update/{random.choice(user.todo_ids)}",
+            json={"title": f"bench update {index}", "done": index % 2 == 0},
+            headers=user.headers,
+        )
+
+    return request
+
+
+async def run_endpoint(
+    client: httpx.AsyncClient,
+    endpoint: str,
+    users: list[BenchUser],
+    requests: int,
+    concurrency: int,
+) -> EndpointResult:
+    """
+    1つのエンドポイントに指定した並列数でリクエストを送信
+
+    Args:
+    - client: 非同期HTTPクライアント
+    - endpoint: エンドポイント名
+    - users: 計測に使用するユーザーの一覧
+    - requests: 送信するリクエストの件数
+    - concurrency: 並列数
+
+    Returns:
+    - 計測結果
+    """
+    result: EndpointResult = EndpointResult()
+    request: Callable[
+        [BenchUser, int], Awaitable[httpx.Response]
+    ] = build_request(client, endpoint)
+    counter: int = 0
+
+    async def worker() -> None:
+        nonlocal counter
+        while counter < requests:
+            index: int = counter
+            counter += 1
+            user: BenchUser = users[index % len(users)]
+            started_at: float = time.perf_counter()
+            try:
+                res: httpx.Response = await request(user, index)
+            except httpx.HTTPError:
+                result.errors += 1
+                continue
+            if res.is_success:
+                result.latencies.append(time.perf_counter() - started_at)
+            else:
+                result.errors += 1
+
+    started_at: float = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result.elapsed_seconds = time.perf_counter() - started_at
+    return result
+
+
+def find_regressions(
+    report: dict[str, Any],
+    baseline: dict[str, Any],
+    max_regression: float,
+) -> list[str]:
+    """
+    基準の計測結果と比較して、p95が悪化したエンドポイントを取得
+
+    Args:
+    - report: 今回の計測結果
+    - baseline: 基準の計測結果
+    - max_regression: 許容するp95の悪化率(0.2の場合は20%まで)
+
+    Returns:
+    - 悪化したエンドポイントの説明の一覧
+    """
+    regressions: list[str] = []
+    for endpoint, summary in report["endpoints"].items():
+        base: dict[str, Any] | None = baseline["endpoints"].get(endpoint)
+        if base is None or base["latency_ms"]["p95"] <= 0:
+            continue
+        before: float = base["latency_ms"]["p95"]
+        after: float = summary["latency_ms"]["p95"]
+        if after > before * (1 + max_regression):
+            regressions.append(
+                f"{endpoint}: p95 {before:.3f}ms -> {after:.3f}ms"
+            )
+    return regressions
+
+
+async def main(args: argparse.Namespace) -> dict[str, Any]:
+    """
+    データを投入して各エンドポイントを計測
+
+    Args:
+    - args: コマンドライン引数
+
+    Returns:
+    - 計測条件と、エンドポイントごとの計測結果
+    """
+    async with build_client(args.base_url, args.concurrency) as client:
+        users: list[BenchUser] = await seed(client, args.users, args.todos)
+        try:
+            for _ in range(args.warmup):
+                for endpoint in args.endpoints:
+                    await build_request(client, endpoint)(users[0], 0)
+            endpoints: dict[str, Any] = {}
+            for endpoint in args.endpoints:
+                result: EndpointResult = await run_endpoint(
+                    client,
+                    endpoint,
+                    users,
+                    args.requests,
+                    args.concurrency,
+                )
+                endpoints[endpoint] = result.summary()
+        finally:
+            if not args.keep:
+                await cleanup(client, users)
+    return {
+        "config": {
+            "target": args.base_url or "in-process",
+            "users": args.users,
+            "todos_per_user": args.todos,
+            "requests_per_endpoint": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "endpoints": endpoints,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--base-url", default=None)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--todos", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument(
+        "--endpoints",
+        nargs="+",
+        choices=ENDPOINTS,
+        default=list(ENDPOINTS),
+    )
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--baseline", default=None)
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    parser.add_argument("--keep", action="store_true")
+    args = parser.parse_args()
+    if args.users < 1 or args.todos < 1:
+        parser.error("--users and --todos must be at least 1")
+
+    report: dict[str, Any] = asyncio.run(main(args))
+    output: str = json.dumps(report, indent=2)
+    if args.output is None:
+        print(output)
+    else:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            baseline: dict[str, Any] = json.load(f)
+        regressions: list[str] = find_regressions(
+            report,
+            baseline,
+            args.max_regression,
+        )
+        for regression in regressions:
+            print(f"regression {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
@@ -0,0 +1,202 @@
+"""todosテーブルのインデックスによる実行計画の変化を計測するファイル
+
+- 検証用のスキーマにusers・todosテーブルをインデックスなしで作成する
+- generate_seriesで大量のTodoを投入する
+- サービスが発行するSQLの実行計画を、インデックス作成の前後で比較する
+
+使い方:
+    python -m benchmarks.todo_index_plan --rows 10000000 --users 10000
+"""
+import argparse
+import asyncio
+import time
+from typing import Any
+
+from sqlalchemy import Select, text
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncEngine,
+    create_async_engine,
+)
+from sqlalchemy.schema import CreateSchema, CreateTable, DropSchema
+
+from api.config import settings
+from api.database.db import Base
+from api.models import todo as todo_models
+from api.schemas import todo as todo_schemas
+from api.services import todo as todo_services
+
+BENCH_SCHEMA: str = "todo_index_bench"
+
+
+def get_target_statements(user_id: int, todo_id: int) -> dict[str, Select]:
+    """
+    計測対象のSQLを取得
+
+    Args:
+    - user_id: 検索対象のユーザーID
+    - todo_id: 詳細を検索するTodoID
+
+    Returns:
+    - 名前とSELECT文の辞書
+    """
+    limit: int = settings.todo_list_default_limit + 1
+    return {
+        "list": todo_services.build_todo_list_stmt(
+            user_id,
+            todo_schemas.TodoListFilter(),
+        ).limit(limit),
+        "list_undone_by_due_date": todo_services.build_todo_list_stmt(
+            user_id,
+            todo_schemas.TodoListFilter(done=False, order_by="due_date"),
+        ).limit(limit),
+        "detail": todo_services.build_todo_detail_stmt(todo_id, user_id),
+        "search": todo_services.build_todo_search_stmt(
+            user_id,
+            str(todo_id),
+        ).limit(limit),
+    }
+
+
+async def explain(conn: AsyncConnection, stmt: Select) -> dict[str, Any]:
+    """
+    SQLの実行計画を取得
+
+    Args:
+    - conn: 非同期のDB接続
+    - stmt: SELECT文
+
+    Returns:
+    - 実行計画と実行時間
+    """
+    compiled: str = str(
+        stmt.compile(
+            dialect=conn.dialect,
+            schema_translate_map={None: BENCH_SCHEMA},
+            compile_kwargs={"literal_binds": True},
+        )
+    )
+    result = await conn.execute(
+        text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {compiled}")
+    )
+    plan: dict[str, Any] = result.scalar_one()[0]
+    node: dict[str, Any] = plan["Plan"]
+    # LIMITの下にある、実際にテーブルを読むノードを取り出す
+    while node["Node Type"] == "Limit" and node.get("Plans"):
+        node = node["Plans"][0]
+    return {
+        "node": node["Node Type"],
+        "index": node.get("Index Name", "-"),
+        "execution_ms": plan["Execution Time"],
+    }
+
+
+async def seed(conn: AsyncConnection, rows: int, users: int) -> None:
+    """
+    検証用のテーブルを作成してデータを投入
+
+    Args:
+    - conn: 非同期のDB接続
+    - rows: 投入するTodoの件数
+    - users: 投入するユーザーの件数
+    """
+    await conn.execute(DropSchema(BENCH_SCHEMA, cascade=True, if_exists=True))
+    await conn.execute(CreateSchema(BENCH_SCHEMA))
+    translated: AsyncConnection = await conn.execution_options(
+        schema_translate_map={None: BENCH_SCHEMA}
+    )
+    for table_name in ("users", "todos"):
+        await translated.execute(CreateTable(Base.metadata.tables[table_name]))
+
+    await conn.execute(
+        text(
+            f"INSERT INTO {BENCH_SCHEMA}.users "
+            "(username, email, hashed_password) "
+            "SELECT 'user' || g, 'user' || g || '@example.com', '' "
+            "FROM generate_series(1, :users) AS g"
+        ),
+        {"users": users},
+    )
+    await conn.execute(
+        text(
+            f"INSERT INTO {BENCH_SCHEMA}.todos "
+            "(title, detail, due_date, done, user_id) "
+            "SELECT 'title ' || g, 'detail', "
+            "DATE '2030-01-01' + (g % 365), g % 3 = 0, 1 + g % :users "
+            "FROM generate_series(1, :rows) AS g"
+        ),
+        {"rows": rows, "users": users},
+    )
+    await conn.execute(text(f"ANALYZE {BENCH_SCHEMA}.todos"))
+
+
+async def create_indexes(conn: AsyncConnection) -> None:
+    """
+    Todoモデルに定義したインデックスを作成
+
+    Args:
+    - conn: 非同期のDB接続
+    """
+    translated: AsyncConnection = await conn.execution_options(
+        schema_translate_map={None: BENCH_SCHEMA}
+    )
+    for index in todo_models.Todo.__table__.indexes:
+        await translated.run_sync(index.create)
+    await conn.execute(text(f"ANALYZE {BENCH_SCHEMA}.todos"))
+
+
+async def main(rows: int, users: int, keep: bool) -> None:
+    """
+    インデックス作成前後の実行計画を出力
+
+    Args:
+    - rows: 投入するTodoの件数
+    - users: 投入するユーザーの件数
+    - keep: 計測後に検証用のスキーマを残すか
+    """
+    engine: AsyncEngine = create_async_engine(
+        settings.get_async_url().set(
+            host=settings.postgres_alembic_host,
+            port=settings.db_port,
+        ),
+        isolation_level="AUTOCOMMIT",
+    )
+    user_id: int = max(users // 2, 1)
+    # 投入データは、n件目のTodoが 1 + n % users のユーザーに属する
+    todo_id: int = user_id - 1 + users
+    try:
+        async with engine.connect() as conn:
+            started_at: float = time.perf_counter()
+            await seed(conn, rows, users)
+            print(
+                f"seeded {rows} todos for {users} users "
+                f"in {time.perf_counter() - started_at:.1f}s"
+            )
+
+            for phase in ("without indexes", "with indexes"):
+                if phase == "with indexes":
+                    await create_indexes(conn)
+                print(f"--- {phase}")
+                for name, stmt in get_target_statements(
+                    user_id, todo_id
+                ).items():
+                    result: dict[str, Any] = await explain(conn, stmt)
+                    print(
+                        f"{name:<24} {result['node']:<18} "
+                        f"{result['index']:<34} "
+                        f"{result['execution_ms']:>10.3f} ms"
+                    )
+
+            if not keep:
+                await conn.execute(DropSchema(BENCH_SCHEMA, cascade=True))
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--keep", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.users, args.keep))
@@ -12,9 +12,15 @@ from sqlalchemy.ext.asyncio import (
 )
 from sqlalchemy.orm import sessionmaker
 
+from api.cache.memory import MemoryBackend
 from api.config import settings
-from api.database.db import Base, get_db
+from api.database import db
+from api.database.db import Base
+from api.database.replica import ReadYourWritesTracker
 from api.main import app
+from api.services.health import DatabaseProbe, get_database_probe
+from api.services.rate_limit import rate_limiter
+from api.services.token_cache import token_cache
 from tests.constant import (
     ASYNC_TEST_DB_URL,
     TEST_TODO_DETAIL,
@@ -29,6 +35,19 @@ async_test_engine: AsyncEngine = create_async_engine(
     ASYNC_TEST_DB_URL,
     echo=settings.test_db_echo,
 )
+async_test_session: sessionmaker = sessionmaker(  # type: ignore
+    bind=async_test_engine,
+    class_=AsyncSession,
+)
+async_test_read_session: sessionmaker = sessionmaker(  # type: ignore
+    bind=async_test_engine.execution_options(isolation_level="AUTOCOMMIT"),
+    class_=AsyncSession,
+)
+test_database_probe: DatabaseProbe = DatabaseProbe(
+    async_test_engine,
+    settings.health_db_ping_ttl_seconds,
+    settings.health_db_ping_timeout_seconds,
+)
 
 
 @pytest.fixture(scope="session")
@@ -53,12 +72,16 @@ async def setup_database() -> AsyncGenerator:
 
     - テーブルを削除
     - テーブルを作成
+    - 検証済みトークンのキャッシュを削除
+    - レート制限のバケットを削除
     - テストを実行
     - テーブルを削除
     """
     async with async_test_engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
         await conn.run_sync(Base.metadata.create_all)
+    token_cache.clear()
+    rate_limiter.store.clear()
 
     yield
 
@@ -67,37 +90,46 @@ async def setup_database() -> AsyncGenerator:
 
 
 @pytest_asyncio.fixture
-async def async_client() -> AsyncGenerator:
+async def async_client(monkeypatch: pytest.MonkeyPatch) -> AsyncGenerator:
     """
     テスト用の非同期HTTPクライアントを提供するフィクスチャ
 
-    - テスト用の非同期データベースセッションでオーバーライド
+    - セッションのファクトリのみテスト用のDBに差し替え、get_db・get_read_dbは
+      本番と同じ処理で実行する
+    - 書き込みの記録はテストごとに空にする
     - テスト用の非同期HTTPクライアントを提供
 
+    Args:
+    - monkeypatch: モジュールの属性を差し替えるフィクスチャ
+
     Yields:
     - 非同期HTTPクライアント
     """
-    app.dependency_overrides[get_db] = _get_test_db  # type:ignore
+    monkeypatch.setattr(db, "async_session", async_test_session)
+    monkeypatch.setattr(db, "async_read_session", async_test_read_session)
+    monkeypatch.setattr(
+        db,
+        "read_your_writes",
+        ReadYourWritesTracker(
+            MemoryBackend(settings.db_read_your_writes_max_size),
+            db.read_your_writes.prefix,
+            settings.db_read_your_writes_seconds,
+        ),
+    )
+    app.dependency_overrides[get_database_probe] = _get_test_database_probe
 
     async with AsyncClient(app=app, base_url="http://test") as client:
         yield client
 
 
-async def _get_test_db() -> AsyncGenerator:
+def _get_test_database_probe() -> DatabaseProbe:
     """
-    テスト用の非同期データベースセッションを取得
+    テスト用のDBの疎通確認を取得
 
-    Yields:
-    - 非同期データベースセッション
+    Returns:
+    - テスト用のDBの疎通確認
     """
-    async_test_session: sessionmaker = sessionmaker(  # type: ignore
-        bind=async_test_engine,
-        class_=AsyncSession,
-    )
-
-    async with async_test_session() as session:
-        yield session
-        await session.commit()
+    return test_database_probe
 
 
 @pytest_asyncio.fixture
@@ -0,0 +1,178 @@
+"""同時実行数の制限のテスト定義ファイル"""
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from starlette import status
+from starlette.types import Receive, Scope, Send
+
+from api import admission
+from api.admission import (
+    SHED_EVICTED,
+    SHED_QUEUE_FULL,
+    SHED_TIMEOUT,
+    AdaptiveLimiter,
+    AdmissionMiddleware,
+    get_priority,
+)
+from api.config import settings
+from api.deadline import DeadlineMiddleware
+from api.responses import FastJSONResponse
+from api.route_rules import RouteRules
+
+
+@pytest.mark.asyncio
+async def test_limiter_dispatches_by_priority() -> None:
+    """上限に達している場合に、優先度の高い待ちから実行されるかテスト"""
+    limiter = AdaptiveLimiter(1, 1, 1, 10, 1.0, 0.9)
+    assert await limiter.acquire(0, 1.0) is None
+
+    order: list[int] = []
+
+    async def wait(priority: int) -> None:
+        assert await limiter.acquire(priority, 1.0) is None
+        order.append(priority)
+        limiter.release(0.0)
+
+    tasks = [asyncio.create_task(wait(priority)) for priority in (2, 0, 1)]
+    await asyncio.sleep(0)
+    assert limiter.queued == 3
+
+    limiter.release(0.0)
+    await asyncio.gather(*tasks)
+
+    assert order == [0, 1, 2]
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_limiter_sheds_when_overloaded() -> None:
+    """待ち行列が満杯の場合と、待ち時間が上限を超えた場合に破棄するかテスト"""
+    limiter = AdaptiveLimiter(1, 1, 1, 1, 1.0, 0.9)
+    assert await limiter.acquire(1, 1.0) is None
+
+    low = asyncio.create_task(limiter.acquire(1, 1.0))
+    await asyncio.sleep(0)
+
+    assert await limiter.acquire(1, 1.0) == SHED_QUEUE_FULL
+
+    high = asyncio.create_task(limiter.acquire(0, 0.01))
+
+    assert await low == SHED_EVICTED
+    assert await high == SHED_TIMEOUT
+    assert limiter.queued == 0
+    assert limiter.metrics.shed == {
+        SHED_QUEUE_FULL: 1,
+        SHED_EVICTED: 1,
+        SHED_TIMEOUT: 1,
+    }
+
+
+@pytest.mark.asyncio
+async def test_limiter_removes_timed_out_waiters() -> None:
+    """待ち時間の上限を超えた待ちや破棄した待ちが、待ち行列に残らないかテスト"""
+    limiter = AdaptiveLimiter(1, 1, 1, 2, 1.0, 0.9)
+    assert await limiter.acquire(0, 1.0) is None
+
+    for _ in range(10):
+        results = await asyncio.gather(
+            limiter.acquire(1, 0.001),
+            limiter.acquire(1, 0.001),
+            limiter.acquire(0, 0.001),
+        )
+
+        assert results == [SHED_TIMEOUT, SHED_EVICTED, SHED_TIMEOUT]
+        assert len(limiter._queue) <= limiter.max_queue
+    assert limiter.queued == 0
+    assert len(limiter._queue) == 0
+
+    waiter = asyncio.create_task(limiter.acquire(0, 1.0))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert len(limiter._queue) == 0
+
+
+@pytest.mark.asyncio
+async def test_limiter_adjusts_limit() -> None:
+    """応答時間が目標を超えた場合に上限を減らし、目標以内の場合に増やすかテスト"""
+    limiter = AdaptiveLimiter(10, 2, 20, 10, 0.1, 0.5)
+    await limiter.acquire(0, 1.0)
+    limiter.release(0.2)
+
+    assert limiter.limit == 5
+
+    for _ in range(5):
+        await limiter.acquire(0, 1.0)
+    limiter.release(0.01)
+
+    assert limiter.limit == pytest.approx(5.2)
+
+
+@pytest.mark.asyncio
+async def test_middleware_returns_503() -> None:
+    """破棄したリクエストに、処理を行わずに503とRetry-Afterを返すかテスト"""
+    limiter = AdaptiveLimiter(1, 1, 1, 0, 1.0, 0.9)
+    started = asyncio.Event()
+    finished = asyncio.Event()
+
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        started.set()
+        await finished.wait()
+        await FastJSONResponse({})(scope, receive, send)
+
+    async with AsyncClient(
+        app=AdmissionMiddleware(app, limiter),
+        base_url="http://test",
+    ) as client:
+        first = asyncio.create_task(client.get("/todo/list"))
+        await started.wait()
+        res = await client.get("/todo/list")
+        health = asyncio.create_task(client.get("/healthz"))
+        finished.set()
+
+        assert res.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert res.headers["Retry-After"] == "1"
+        assert (await first).status_code == status.HTTP_200_OK
+        assert (await health).status_code == status.HTTP_200_OK
+    assert limiter.in_flight == 0
+
+
+def test_get_priority(monkeypatch: pytest.MonkeyPatch) -> None:
+    """パスパラメータを含むルート、メソッド、既定値の順に優先度を取得するかテスト"""
+    monkeypatch.setattr(
+        admission,
+        "priority_rules",
+        RouteRules({"GET": 0, "PATCH /todo/update/{todo_id}": 3}),
+    )
+
+    assert get_priority({"method": "PATCH", "path": "/todo/update/1"}) == 3
+    assert get_priority({"method": "GET", "path": "/todo/detail/1"}) == 0
+    assert (
+        get_priority({"method": "POST", "path": "/todo/create"})
+        == settings.admission_default_priority
+    )
+
+
+@pytest.mark.asyncio
+async def test_middleware_decreases_limit_on_timeout() -> None:
+    """期限切れでキャンセルされたリクエストで、上限を減らすかテスト"""
+    limiter = AdaptiveLimiter(10, 1, 20, 10, 1.0, 0.5)
+
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        await asyncio.sleep(1.0)
+
+    async with AsyncClient(
+        app=DeadlineMiddleware(AdmissionMiddleware(app, limiter)),
+        base_url="http://test",
+    ) as client:
+        res = await client.get(
+            "/todo/list",
+            headers={settings.request_timeout_header: "0.01"},
+        )
+
+    assert res.status_code == status.HTTP_504_GATEWAY_TIMEOUT
+    assert limiter.limit == 5
+    assert limiter.in_flight == 0
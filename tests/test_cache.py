@@ -0,0 +1,230 @@
+"""キャッシュのテスト定義ファイル"""
+import asyncio
+from typing import AsyncGenerator, Generator
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from starlette import status
+
+from api.cache.backend import NullBackend
+from api.cache.cache import Cache, CacheMetrics, cache
+from api.cache.memory import MemoryBackend
+from api.cache.redis import RedisBackend, read_reply
+from tests.constant import TEST_UPDATE_USER_EMAIL
+
+
+@pytest.fixture
+def memory_cache() -> Generator:
+    """
+    アプリケーションのキャッシュをプロセス内のキャッシュに差し替えるフィクスチャ
+
+    Yields:
+    - 差し替えたキャッシュ
+    """
+    backend, metrics = cache.backend, cache.metrics
+    cache.backend, cache.metrics = MemoryBackend(100), CacheMetrics()
+    yield cache
+    cache.backend, cache.metrics = backend, metrics
+
+
+@pytest_asyncio.fixture
+async def fake_redis_url() -> AsyncGenerator:
+    """
+    GET・SET・DEL・PINGに応答する、Redisプロトコルの偽のサーバーを起動するフィクスチャ
+
+    Yields:
+    - 偽のサーバーのURL
+    """
+    store: dict[bytes, bytes] = {}
+
+    async def handle(
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        while not reader.at_eof():
+            try:
+                command, *args = await read_reply(reader)
+            except Exception:
+                break
+            if command == b"PING":
+                writer.write(b"+PONG\r\n")
+            elif command == b"GET":
+                value = store.get(args[0])
+                writer.write(
+                    b"$-1\r\n"
+                    if value is None
+                    else b"$%d\r\n%s\r\n" % (len(value), value)
+                )
+            elif command == b"SET":
+                store[args[0]] = args[1]
+                writer.write(b"+OK\r\n")
+            elif command == b"DEL":
+                deleted = [store.pop(key, None) for key in args]
+                writer.write(b":%d\r\n" % sum(v is not None for v in deleted))
+            else:
+                writer.write(b"-ERR unknown command\r\n")
+            await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    yield f"redis://127.0.0.1:{port}/0"
+    server.close()
+    await server.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_evicts_least_recently_used() -> None:
+    """上限件数を超えた場合に、最も参照されていないエントリを削除するかテスト"""
+    backend = MemoryBackend(2)
+    await backend.set("a", b"1", 60)
+    await backend.set("b", b"2", 60)
+    await backend.get("a")
+    await backend.set("c", b"3", 60)
+
+    assert await backend.get("a") == b"1"
+    assert await backend.get("b") is None
+
+    await backend.set("expired", b"4", 0)
+
+    assert await backend.get("expired") is None
+
+
+@pytest.mark.asyncio
+async def test_get_or_set_coalesces_concurrent_loads() -> None:
+    """同じキーの同時の取得が、1回の読み込みにまとめられるかテスト"""
+    test_cache = Cache(MemoryBackend(100), "test")
+    calls = 0
+
+    async def load() -> bytes:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return b"value"
+
+    values = await asyncio.gather(
+        *(test_cache.get_or_set("ns", "key", load, 60) for _ in range(10))
+    )
+    value = await test_cache.get_or_set("ns", "key", load, 60)
+
+    assert values == [b"value"] * 10
+    assert value == b"value"
+    assert calls == 1
+    assert test_cache.metrics.misses == {"ns": 1}
+    assert test_cache.metrics.coalesced == {"ns": 9}
+    assert test_cache.metrics.hits == {"ns": 1}
+
+
+@pytest.mark.asyncio
+async def test_get_or_set_coalesces_without_backend() -> None:
+    """キャッシュが無効の場合も、同じキーの同時の取得がまとめられるかテスト"""
+    test_cache = Cache(NullBackend(), "test")
+    calls = 0
+
+    async def load() -> bytes:
+        nonlocal calls
+        calls += 1
+        value = str(calls).encode()
+        await asyncio.sleep(0.01)
+        return value
+
+    values = await asyncio.gather(
+        *(test_cache.get_or_set("ns", "key", load, 60) for _ in range(5))
+    )
+
+    assert values == [b"1"] * 5
+    assert test_cache.metrics.coalesced == {"ns": 4}
+    assert await test_cache.get_or_set("ns", "key", load, 60) == b"2"
+
+
+@pytest.mark.asyncio
+async def test_forget_detaches_in_flight_load() -> None:
+    """切り離した後の取得が、実行中の読み込みを待たずに新しく読み込むかテスト"""
+    test_cache = Cache(NullBackend(), "test")
+    calls = 0
+
+    async def load() -> bytes:
+        nonlocal calls
+        calls += 1
+        value = str(calls).encode()
+        await asyncio.sleep(0.01)
+        return value
+
+    before = asyncio.create_task(test_cache.get_or_set("ns", "key", load, 60))
+    await asyncio.sleep(0)
+    test_cache.forget("ns", "key")
+    after = await test_cache.get_or_set("ns", "key", load, 60)
+
+    assert await before == b"1"
+    assert after == b"2"
+
+
+@pytest.mark.asyncio
+async def test_redis_backend(fake_redis_url: str) -> None:
+    """Redisプロトコルで値の保存・取得・削除ができるかテスト"""
+    backend = RedisBackend(fake_redis_url, 2, 1.0)
+    await backend.set("key", b"value\r\n", 60)
+
+    assert await backend.ping()
+    assert await backend.get("key") == b"value\r\n"
+    await backend.delete("key")
+    assert await backend.get("key") is None
+    await backend.close()
+
+
+@pytest.mark.asyncio
+async def test_redis_backend_unavailable() -> None:
+    """Redisに接続できない場合に、キャッシュなしとして処理を続けるかテスト"""
+    test_cache = Cache(RedisBackend("redis://127.0.0.1:1/0", 2, 1.0), "test")
+
+    async def load() -> bytes:
+        return b"value"
+
+    assert await test_cache.get_or_set("ns", "key", load, 60) == b"value"
+    assert test_cache.metrics.errors == {"ns": 2}
+
+
+@pytest.mark.asyncio
+async def test_todo_list_cache(
+    async_client: AsyncClient,
+    access_token: str,
+    factory_todo: None,
+    memory_cache: Cache,
+) -> None:
+    """Todo一覧がキャッシュされ、Todoを変更すると再度読み込まれるかテスト"""
+    headers = {"Authorization": f"Bearer {access_token}"}
+    await async_client.get("/todo/list", headers=headers)
+    await async_client.get("/todo/list", headers=headers)
+    await async_client.patch(
+        "/todo/update/1",
+        json={"done": True},
+        headers=headers,
+    )
+    res = await async_client.get("/todo/list", headers=headers)
+
+    assert res.status_code == status.HTTP_200_OK
+    assert res.json()["items"][0]["done"] is True
+    assert memory_cache.metrics.hits["todo_list"] == 1
+    assert memory_cache.metrics.misses["todo_list"] == 2
+
+
+@pytest.mark.asyncio
+async def test_user_cache_invalidated_on_update(
+    async_client: AsyncClient,
+    access_token: str,
+    memory_cache: Cache,
+) -> None:
+    """ユーザーを更新すると、キャッシュしたユーザーが削除されるかテスト"""
+    headers = {"Authorization": f"Bearer {access_token}"}
+    await async_client.get("/user/me", headers=headers)
+    await async_client.patch(
+        "/user/update",
+        json={"email": TEST_UPDATE_USER_EMAIL},
+        headers=headers,
+    )
+    res = await async_client.get("/user/me", headers=headers)
+
+    assert res.status_code == status.HTTP_200_OK
+    assert res.json()["email"] == TEST_UPDATE_USER_EMAIL
+    assert memory_cache.metrics.misses["user"] == 2
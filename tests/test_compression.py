@@ -0,0 +1,171 @@
+"""レスポンスの圧縮のテスト定義ファイル"""
+import gzip
+import json
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from starlette import status
+from starlette.types import Message, Receive, Scope, Send
+
+from api.compression import (
+    CompressionMiddleware,
+    compressed_body_cache,
+    metrics,
+    select_encoding,
+)
+from api.config import settings
+from tests.constant import TEST_TODO_DETAIL, TEST_TODO_DUE_DATE
+
+
+@pytest_asyncio.fixture
+async def factory_todos(async_client: AsyncClient, access_token: str) -> None:
+    """
+    圧縮の対象となるサイズのTodoデータを作成するフィクスチャ
+
+    Args:
+    - async_client: 非同期HTTPクライアント
+    - access_token: アクセストークン
+    """
+    await async_client.post(
+        "/todo/bulk/create",
+        json=[
+            {
+                "title": f"todo {index}",
+                "detail": TEST_TODO_DETAIL,
+                "due_date": TEST_TODO_DUE_DATE,
+            }
+            for index in range(50)
+        ],
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+
+
+def test_compress_body_cache_by_digest() -> None:
+    """ETagが同じでもボディが異なる場合に、別のボディとして圧縮するかテスト"""
+    compressed_body_cache.clear()
+    hits = metrics.cache_hits
+    first = CompressionMiddleware.compress_body("gzip", b"a" * 2048, True)
+    second = CompressionMiddleware.compress_body("gzip", b"b" * 2048, True)
+
+    assert gzip.decompress(second) == b"b" * 2048
+    assert metrics.cache_hits == hits
+    assert CompressionMiddleware.compress_body("gzip", b"a" * 2048, True) == (
+        first
+    )
+    assert metrics.cache_hits == hits + 1
+
+
+@pytest.mark.asyncio
+async def test_compress_stream_flushes_by_size(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """ストリーミングのチャンクを一定サイズごとにまとめて圧縮するかテスト"""
+    monkeypatch.setattr(settings, "compression_stream_flush_bytes", 1024)
+    rows = [
+        f'{{"id": {index}, "title": "todo"}}\n'.encode()
+        for index in range(200)
+    ]
+    messages: list[Message] = []
+
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"application/x-ndjson")],
+            }
+        )
+        for row in rows:
+            await send(
+                {"type": "http.response.body", "body": row, "more_body": True}
+            )
+        await send({"type": "http.response.body", "body": b""})
+
+    async def receive() -> Message:
+        return {"type": "http.request"}
+
+    async def send(message: Message) -> None:
+        messages.append(message)
+
+    await CompressionMiddleware(app)(
+        {
+            "type": "http",
+            "method": "GET",
+            "headers": [(b"accept-encoding", b"gzip")],
+        },
+        receive,
+        send,
+    )
+    chunks = [message["body"] for message in messages[1:]]
+
+    assert len(chunks) < len(rows) // 10
+    assert not messages[-1].get("more_body", False)
+    assert gzip.decompress(b"".join(chunks)) == b"".join(rows)
+    assert len(b"".join(chunks)) < len(b"".join(rows)) // 4
+
+
+def test_select_encoding() -> None:
+    """Accept-Encodingの重みと優先順で圧縮方式を選択できるかテスト"""
+    assert select_encoding("gzip, br", ["br", "gzip"]) == "br"
+    assert select_encoding("gzip;q=1.0, br;q=0.5", ["br", "gzip"]) == "gzip"
+    assert select_encoding("*;q=0.1, gzip;q=0", ["br", "gzip"]) == "br"
+    assert select_encoding("identity", ["br", "gzip"]) is None
+
+
+@pytest.mark.asyncio
+async def test_compress_todo_list(
+    async_client: AsyncClient,
+    access_token: str,
+    factory_todos: None,
+) -> None:
+    """一定サイズ以上のレスポンスが圧縮され、304の判定ができるかテスト"""
+    headers = {
+        "Authorization": f"Bearer {access_token}",
+        "Accept-Encoding": "gzip",
+    }
+    res = await async_client.get("/todo/list", headers=headers)
+    assert res.status_code == status.HTTP_200_OK
+    assert res.headers["Content-Encoding"] == "gzip"
+    assert res.headers["Vary"] == "Accept-Encoding"
+    assert res.headers["ETag"].startswith("W/")
+    assert len(res.json()["items"]) == 50
+
+    res = await async_client.get(
+        "/todo/list",
+        headers={**headers, "If-None-Match": res.headers["ETag"]},
+    )
+    assert res.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+@pytest.mark.asyncio
+async def test_skip_small_response(async_client: AsyncClient) -> None:
+    """最小サイズ未満のレスポンスが圧縮されないかテスト"""
+    res = await async_client.get(
+        "/healthz",
+        headers={"Accept-Encoding": "gzip"},
+    )
+    assert res.status_code == status.HTTP_200_OK
+    assert "Content-Encoding" not in res.headers
+    assert res.headers["Vary"] == "Accept-Encoding"
+
+
+@pytest.mark.asyncio
+async def test_compress_todo_stream(
+    async_client: AsyncClient,
+    access_token: str,
+    factory_todos: None,
+) -> None:
+    """ストリーミングのレスポンスが圧縮されるかテスト"""
+    res = await async_client.get(
+        "/todo/list/stream",
+        headers={
+            "Authorization": f"Bearer {access_token}",
+            "Accept-Encoding": "gzip",
+        },
+    )
+    todos = [json.loads(line) for line in res.text.splitlines()]
+    assert res.status_code == status.HTTP_200_OK
+    assert res.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in res.headers
+    assert len(todos) == 50
@@ -0,0 +1,158 @@
+"""リクエストの処理期限のテスト定義ファイル"""
+import asyncio
+import time
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import exc, text
+from starlette import status
+from starlette.types import Receive, Scope, Send
+
+from api import deadline
+from api.config import settings
+from api.deadline import (
+    QUERY_CANCELED_PGCODE,
+    DeadlineMiddleware,
+    get_timeout_seconds,
+    request_deadline,
+)
+from api.responses import FastJSONResponse
+from api.route_rules import RouteRules
+from tests.conftest import async_test_session
+
+
+def build_scope(
+    path: str,
+    headers: dict[str, str],
+    method: str = "POST",
+) -> Scope:
+    """
+    テスト用のリクエストの情報を生成
+
+    Args:
+    - path: パス
+    - headers: リクエストヘッダー
+    - method: メソッド
+
+    Returns:
+    - リクエストの情報
+    """
+    return {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "headers": [
+            (key.lower().encode(), value.encode())
+            for key, value in headers.items()
+        ],
+    }
+
+
+def test_get_timeout_seconds() -> None:
+    """ルートごとの設定・既定値の順に処理時間の上限を取得し、ヘッダーでは短くのみできるかテスト"""
+    header = settings.request_timeout_header
+    default = settings.request_timeout_default_seconds
+
+    assert (
+        get_timeout_seconds(build_scope("/todo/create", {header: "2.5"}))
+        == 2.5
+    )
+    assert (
+        get_timeout_seconds(build_scope("/todo/create", {header: "1e9"}))
+        == default
+    )
+    assert (
+        get_timeout_seconds(build_scope("/todo/create", {header: "x"}))
+        == default
+    )
+    assert (
+        get_timeout_seconds(build_scope("/todo/bulk/create", {}))
+        == settings.request_timeout_routes["POST /todo/bulk/create"]
+    )
+    assert get_timeout_seconds(build_scope("/todo/list/stream", {})) is None
+
+
+def test_get_timeout_seconds_route_template(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """パスパラメータを含むルートの設定と、上限なしのルートを参照できるかテスト"""
+    monkeypatch.setattr(
+        deadline,
+        "timeout_rules",
+        RouteRules(
+            {
+                "GET /todo/detail/{todo_id}": 5.0,
+                "PATCH /todo/update/{todo_id}": 0.0,
+            }
+        ),
+    )
+    header = settings.request_timeout_header
+
+    assert get_timeout_seconds(build_scope("/todo/detail/1", {}, "GET")) == 5.0
+    assert (
+        get_timeout_seconds(
+            build_scope("/todo/update/1", {header: "1"}, "PATCH")
+        )
+        is None
+    )
+
+
+@pytest.mark.asyncio
+async def test_middleware_returns_504() -> None:
+    """期限を過ぎた場合に、処理を打ち切って504を返すかテスト"""
+    cancelled = asyncio.Event()
+
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        await FastJSONResponse({})(scope, receive, send)
+
+    async with AsyncClient(
+        app=DeadlineMiddleware(app),
+        base_url="http://test",
+    ) as client:
+        res = await client.get(
+            "/todo/list",
+            headers={settings.request_timeout_header: "0.01"},
+        )
+
+    assert res.status_code == status.HTTP_504_GATEWAY_TIMEOUT
+    assert cancelled.is_set()
+
+
+@pytest.mark.asyncio
+async def test_statement_timeout_from_deadline() -> None:
+    """期限までの残り時間がstatement_timeoutに設定され、サーバー側でSQLがキャンセルされるかテスト"""
+    token = request_deadline.set(time.monotonic() + 0.2)
+    try:
+        async with async_test_session(
+            info={"statement_deadline": True}
+        ) as session:
+            timeout = await session.scalar(text("SHOW statement_timeout"))
+            with pytest.raises(exc.DBAPIError) as e:
+                await session.execute(text("SELECT pg_sleep(1)"))
+    finally:
+        request_deadline.reset(token)
+
+    assert timeout.endswith("ms") and 0 < int(timeout[:-2]) <= 200
+    assert getattr(e.value.orig, "pgcode", None) == QUERY_CANCELED_PGCODE
+
+
+@pytest.mark.asyncio
+async def test_request_timeout_header(
+    async_client: AsyncClient,
+    access_token: str,
+) -> None:
+    """ヘッダーで指定した期限を過ぎた場合に、504を返すかテスト"""
+    res = await async_client.get(
+        "/todo/list",
+        headers={
+            "Authorization": f"Bearer {access_token}",
+            settings.request_timeout_header: "0.000001",
+        },
+    )
+
+    assert res.status_code == status.HTTP_504_GATEWAY_TIMEOUT
@@ -0,0 +1,60 @@
+"""パスワードハッシュ計算用のワーカープールのテスト定義ファイル"""
+import pytest
+from httpx import AsyncClient
+from starlette import status
+
+from api.config import settings
+from api.exceptions import status_5xx
+from api.services import hasher
+from tests.constant import TEST_USER_EMAIL, TEST_USER_NAME, TEST_USER_PASSWORD
+
+
+@pytest.mark.asyncio
+async def test_run_after_shutdown() -> None:
+    """ワーカープールの停止後も、作り直して計算できるかテスト"""
+    assert await hasher.run(sum, [1, 2]) == 3
+
+    hasher.shutdown()
+
+    assert await hasher.run(sum, [3, 4]) == 7
+    assert hasher.get_in_flight() == 0
+
+
+@pytest.mark.asyncio
+async def test_run_overloaded(monkeypatch: pytest.MonkeyPatch) -> None:
+    """実行中と待機中の合計が上限に達している場合に、503を送出するかテスト"""
+    monkeypatch.setattr(
+        hasher,
+        "_in_flight",
+        settings.password_hash_workers + settings.password_hash_max_queue,
+    )
+    rejected = hasher.metrics.rejected
+
+    with pytest.raises(status_5xx.ServiceUnavailableException):
+        await hasher.run(sum, [1, 2])
+
+    assert hasher.metrics.rejected == rejected + 1
+
+
+@pytest.mark.asyncio
+async def test_create_user_overloaded(
+    async_client: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """ハッシュ計算が過負荷の場合に、503とRetry-Afterを返すかテスト"""
+    monkeypatch.setattr(settings, "password_hash_max_queue", 0)
+    monkeypatch.setattr(hasher, "_in_flight", settings.password_hash_workers)
+
+    res = await async_client.post(
+        "/user/create",
+        json={
+            "username": TEST_USER_NAME,
+            "email": TEST_USER_EMAIL,
+            "password": TEST_USER_PASSWORD,
+        },
+    )
+
+    assert res.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert res.headers["Retry-After"] == str(
+        settings.password_hash_retry_after
+    )
@@ -0,0 +1,31 @@
+"""ヘルスチェック関連のテスト定義ファイル"""
+import pytest
+from httpx import AsyncClient
+from starlette import status
+
+from api.lifespan import warmup_state
+
+
+@pytest.mark.asyncio
+async def test_read_liveness(async_client: AsyncClient) -> None:
+    """プロセスが動作しているか確認できるかテスト"""
+    res = await async_client.get("/healthz")
+    assert res.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.asyncio
+async def test_read_readiness(async_client: AsyncClient) -> None:
+    """ウォームアップの完了後にリクエストを受け付けられるかテスト"""
+    res = await async_client.get("/readyz")
+    assert res.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+    warmup_state.ready = True
+    try:
+        res = await async_client.get("/readyz")
+        assert res.status_code == status.HTTP_200_OK
+        assert res.json()["database"]["ok"]
+
+        res = await async_client.get("/readyz")
+        assert res.json()["database"]["cached"]
+    finally:
+        warmup_state.ready = False
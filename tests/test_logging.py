@@ -0,0 +1,81 @@
+"""ロギングの設定のテスト定義ファイル"""
+import json
+import logging
+import time
+from pathlib import Path
+
+from api.config import settings
+from api.settings.logging import (
+    BatchingFileHandler,
+    DuplicateFilter,
+    JsonFormatter,
+    setup_logging,
+)
+
+
+def build_record(message: str, name: str = "test") -> logging.LogRecord:
+    """
+    テスト用のログレコードを生成
+
+    Args:
+    - message: メッセージ
+    - name: ロガー名
+
+    Returns:
+    - ログレコード
+    """
+    return logging.LogRecord(
+        name, logging.ERROR, __file__, 1, message, None, None
+    )
+
+
+def test_batching_file_handler(tmp_path: Path) -> None:
+    """フラッシュするまで書き込まず、フラッシュ時に1行1件で追記するかテスト"""
+    path = tmp_path / "api.log"
+    handler = BatchingFileHandler(str(path), encoding="utf-8")
+    handler.setFormatter(JsonFormatter())
+    for i in range(3):
+        handler.handle(build_record(f"ログ{i}"))
+
+    assert not path.exists()
+
+    handler.flush()
+    handler.handle(build_record("ログ3"))
+    handler.close()
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["message"] for line in lines] == [
+        "ログ0",
+        "ログ1",
+        "ログ2",
+        "ログ3",
+    ]
+
+
+def test_duplicate_filter() -> None:
+    """期間内の同じ内容のログを抑制し、期間後のログに抑制した件数を付与するかテスト"""
+    duplicate_filter = DuplicateFilter(0.05)
+
+    assert duplicate_filter.filter(build_record("a"))
+    assert not duplicate_filter.filter(build_record("a"))
+    assert duplicate_filter.filter(build_record("a", name="other"))
+    assert duplicate_filter.filter(build_record("b"))
+
+    time.sleep(0.06)
+    record = build_record("a")
+
+    assert duplicate_filter.filter(record)
+    assert getattr(record, "suppressed") == 1
+
+
+def test_duplicate_filter_scope() -> None:
+    """指定したロガーにのみ、重複の抑制を設定するかテスト"""
+    setup_logging()
+
+    for name in settings.log_duplicate_loggers:
+        assert any(
+            isinstance(f, DuplicateFilter)
+            for f in logging.getLogger(name).filters
+        )
+    for handler in logging.getLogger().handlers:
+        assert not any(isinstance(f, DuplicateFilter) for f in handler.filters)
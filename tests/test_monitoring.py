@@ -0,0 +1,70 @@
+"""監視関連のテスト定義ファイル"""
+import pytest
+from httpx import AsyncClient
+from starlette import status
+
+from api.monitoring.timing import RequestTimings
+
+
+@pytest.mark.asyncio
+async def test_server_timing(
+    async_client: AsyncClient,
+    access_token: str,
+) -> None:
+    """レスポンスに処理時間の内訳が付与されるかテスト"""
+    res = await async_client.get(
+        "/todo/list",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert res.status_code == status.HTTP_200_OK
+    stages = {
+        metric.split(";")[0]
+        for metric in res.headers["Server-Timing"].split(", ")
+    }
+    assert stages == {"auth", "db", "serialize", "total"}
+
+
+def test_serialize_excludes_teardown_db() -> None:
+    """依存関数の後処理のDBの時間を、シリアライズの時間から除くかテスト"""
+    timings = RequestTimings(started_at=0.0)
+    timings.add("db", 0.1)
+    timings.endpoint_finished_at = 1.0
+    timings.add("db", 0.3)
+
+    total_seconds = timings.finish_response(1.5)
+
+    assert total_seconds == 1.5
+    assert timings.stages["db"] == pytest.approx(0.4)
+    assert timings.stages["serialize"] == pytest.approx(0.2)
+
+
+@pytest.mark.asyncio
+async def test_read_metrics(
+    async_client: AsyncClient,
+    access_token: str,
+) -> None:
+    """ルートごとの処理時間をPrometheus形式で取得できるかテスト"""
+    await async_client.get(
+        "/todo/detail/1",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    res = await async_client.get("/metrics")
+    assert res.status_code == status.HTTP_200_OK
+    assert res.headers["content-type"].startswith("text/plain")
+    assert (
+        'http_requests_total{method="GET",'
+        'route="/todo/detail/{todo_id}",status="404"}' in res.text
+    )
+
+
+@pytest.mark.asyncio
+async def test_request_id(async_client: AsyncClient) -> None:
+    """リクエストIDがレスポンスに付与されるかテスト"""
+    res = await async_client.get("/metrics")
+    assert len(res.headers["X-Request-ID"]) == 32
+
+    res = await async_client.get(
+        "/metrics",
+        headers={"X-Request-ID": "test-request-id"},
+    )
+    assert res.headers["X-Request-ID"] == "test-request-id"
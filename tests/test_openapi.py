@@ -0,0 +1,41 @@
+"""OpenAPI関連のテスト定義ファイル"""
+import json
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient
+from starlette import status
+
+from api.main import app
+from api.openapi import OpenAPIDocument
+
+
+@pytest.mark.asyncio
+async def test_read_openapi(async_client: AsyncClient) -> None:
+    """OpenAPIスキーマを取得できるかテスト"""
+    res = await async_client.get("/openapi.json")
+    assert res.status_code == status.HTTP_200_OK
+    assert "/todo/list" in res.json()["paths"]
+
+    res = await async_client.get(
+        "/openapi.json",
+        headers={"If-None-Match": res.headers["ETag"]},
+    )
+    assert res.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+@pytest.mark.asyncio
+async def test_read_docs(async_client: AsyncClient) -> None:
+    """ドキュメントを表示できるかテスト"""
+    res = await async_client.get("/docs")
+    assert res.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.asyncio
+async def test_read_openapi_missing_file(tmp_path: Path) -> None:
+    """スキーマのファイルが存在しない場合に、アプリケーションから生成するかテスト"""
+    document = OpenAPIDocument(app, str(tmp_path / "openapi.json"))
+    body, etag = document.get()
+
+    assert "/todo/list" in json.loads(body)["paths"]
+    assert etag
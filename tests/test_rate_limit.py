@@ -0,0 +1,97 @@
+"""レート制限のテスト定義ファイル"""
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from starlette import status
+
+from api.services.rate_limit import (
+    MemoryRateLimitStore,
+    RateLimit,
+    rate_limiter,
+)
+from tests.constant import TEST_USER_EMAIL, TEST_USER_PASSWORD
+
+
+@pytest.mark.asyncio
+async def test_memory_store_token_bucket() -> None:
+    """容量を超えた場合に、補充されるまでの秒数を返すかテスト"""
+    store = MemoryRateLimitStore(100, 60.0)
+    limit = RateLimit.parse("2/1")
+
+    assert await store.acquire("key", limit) == 0
+    assert await store.acquire("key", limit) == 0
+    assert 0 < await store.acquire("key", limit) <= 0.5
+    assert await store.acquire("other", limit) == 0
+
+
+@pytest.mark.asyncio
+async def test_memory_store_eviction() -> None:
+    """満杯まで補充されたバケットと、上限件数を超えたバケットが削除されるかテスト"""
+    store = MemoryRateLimitStore(2, 0.0)
+    await store.acquire("a", RateLimit(1, 0.01))
+    await store.acquire("b", RateLimit(1, 60))
+    await asyncio.sleep(0.02)
+    await store.acquire("c", RateLimit(1, 60))
+
+    assert len(store) == 2
+
+    await store.acquire("d", RateLimit(1, 60))
+
+    assert len(store) == 2
+    assert await store.acquire("b", RateLimit(1, 60)) == 0
+
+
+@pytest.mark.asyncio
+async def test_create_user_rate_limited(async_client: AsyncClient) -> None:
+    """ユーザー作成が制限を超えた場合に、429とRetry-Afterを返すかテスト"""
+    limit = rate_limiter.rules["POST /user/create"]
+    for i in range(limit.capacity):
+        res = await async_client.post(
+            "/user/create",
+            json={
+                "username": f"user{i}",
+                "email": f"{i}{TEST_USER_EMAIL}",
+                "password": TEST_USER_PASSWORD,
+            },
+        )
+        assert res.status_code != status.HTTP_429_TOO_MANY_REQUESTS
+
+    res = await async_client.post(
+        "/user/create",
+        json={
+            "username": "limited",
+            "email": TEST_USER_EMAIL,
+            "password": TEST_USER_PASSWORD,
+        },
+    )
+
+    assert res.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert int(res.headers["Retry-After"]) >= 1
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_per_user(
+    async_client: AsyncClient,
+    access_token: str,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """トークンがある場合はユーザーごと、ない場合はIPアドレスごとに制限するかテスト"""
+    monkeypatch.setitem(
+        rate_limiter.rules,
+        "GET /todo/list",
+        RateLimit(2, 60),
+    )
+    headers = {"Authorization": f"Bearer {access_token}"}
+    statuses = [
+        (await async_client.get("/todo/list", headers=headers)).status_code
+        for _ in range(3)
+    ]
+    res = await async_client.get("/todo/list")
+
+    assert statuses == [
+        status.HTTP_200_OK,
+        status.HTTP_200_OK,
+        status.HTTP_429_TOO_MANY_REQUESTS,
+    ]
+    assert res.status_code == status.HTTP_401_UNAUTHORIZED
@@ -0,0 +1,205 @@
+"""読み取り専用レプリカの振り分けのテスト定義ファイル"""
+import asyncio
+from typing import AsyncGenerator
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from starlette import status
+from starlette.requests import Request
+
+from api.cache.backend import CacheError
+from api.cache.memory import MemoryBackend
+from api.database import db
+from api.database.db import get_read_db
+from api.database.replica import ReadYourWritesTracker, ReplicaRouter
+from api.services.auth import create_access_token
+from api.services.token_cache import get_token_subject
+from tests.conftest import async_test_engine, async_test_read_session
+from tests.constant import ASYNC_TEST_DB_URL, TEST_USER_NAME
+
+# 接続できないレプリカ(接続を拒否されるポート)
+UNREACHABLE_DB_URL: str = ASYNC_TEST_DB_URL.replace(":5432/", ":1/")
+
+
+class FailingBackend(MemoryBackend):
+    """操作に失敗するキャッシュのバックエンド"""
+
+    async def get(self, key: str) -> bytes | None:
+        raise CacheError("unavailable")
+
+    async def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        raise CacheError("unavailable")
+
+
+@pytest_asyncio.fixture
+async def replica_engines() -> AsyncGenerator:
+    """
+    接続できないレプリカと、接続できるレプリカのエンジンを提供するフィクスチャ
+
+    Yields:
+    - レプリカのエンジン一覧
+    """
+    unreachable: AsyncEngine = create_async_engine(UNREACHABLE_DB_URL)
+    reachable: AsyncEngine = async_test_engine.execution_options(
+        isolation_level="AUTOCOMMIT",
+    )
+    yield [unreachable, reachable]
+    await unreachable.dispose()
+
+
+def build_request(authorization: str | None = None) -> Request:
+    """
+    テスト用のリクエストを生成
+
+    Args:
+    - authorization: Authorizationヘッダーの値
+
+    Returns:
+    - リクエスト
+    """
+    headers: list[tuple[bytes, bytes]] = []
+    if authorization is not None:
+        headers.append((b"authorization", authorization.encode()))
+    return Request({"type": "http", "headers": headers})
+
+
+def test_replica_router_round_robin(
+    replica_engines: list[AsyncEngine],
+) -> None:
+    """前回の次のレプリカから順に、正常なレプリカを返すかテスト"""
+    router = ReplicaRouter(replica_engines + replica_engines[:1], 60.0)
+
+    assert [index for index, _ in router.candidates()] == [0, 1, 2]
+    assert [index for index, _ in router.candidates()] == [1, 2, 0]
+
+    router.mark_unhealthy(2)
+
+    assert [index for index, _ in router.candidates()] == [0, 1]
+    assert not router.is_healthy(2)
+
+    router.mark_healthy(2)
+
+    assert [index for index, _ in router.candidates()] == [0, 1, 2]
+    assert list(ReplicaRouter([], 60.0).candidates()) == []
+
+
+@pytest.mark.asyncio
+async def test_replica_router_retry(
+    replica_engines: list[AsyncEngine],
+) -> None:
+    """接続に失敗したレプリカを、一定時間後に再度返すかテスト"""
+    router = ReplicaRouter(replica_engines, 0.05)
+    router.mark_unhealthy(0)
+
+    assert [index for index, _ in router.candidates()] == [1]
+
+    await asyncio.sleep(0.06)
+
+    assert router.is_healthy(0)
+    assert [index for index, _ in router.candidates()] == [1, 0]
+
+
+@pytest.mark.asyncio
+async def test_get_read_db_failover(
+    replica_engines: list[AsyncEngine],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """接続できないレプリカを飛ばし、直近に書き込んだユーザーはプライマリから読み取るかテスト"""
+    router = ReplicaRouter(replica_engines, 60.0)
+    tracker = ReadYourWritesTracker(MemoryBackend(10), "test", 60.0)
+    monkeypatch.setattr(db, "replica_router", router)
+    monkeypatch.setattr(db, "read_your_writes", tracker)
+    monkeypatch.setattr(db, "async_read_session", async_test_read_session)
+    authorization = f"Bearer {create_access_token(TEST_USER_NAME)}"
+
+    sessions = get_read_db(build_request(authorization))
+    session = await sessions.__anext__()
+    assert session.bind is replica_engines[1]
+    assert not router.is_healthy(0)
+    await sessions.aclose()
+
+    await tracker.mark_write(TEST_USER_NAME)
+    fresh_authorization = f"Bearer {create_access_token(TEST_USER_NAME)}"
+
+    sessions = get_read_db(build_request(fresh_authorization))
+    session = await sessions.__anext__()
+    assert session.bind is not replica_engines[1]
+    assert await session.scalar(text("SELECT 1")) == 1
+    await sessions.aclose()
+
+    sessions = get_read_db(build_request())
+    session = await sessions.__anext__()
+    assert session.bind is replica_engines[1]
+    await sessions.aclose()
+
+
+@pytest.mark.asyncio
+async def test_read_todo_list_from_replica(
+    async_client: AsyncClient,
+    access_token: str,
+    replica_engines: list[AsyncEngine],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """レプリカに接続できない場合に、次のレプリカから一覧を取得できるかテスト"""
+    router = ReplicaRouter(replica_engines, 60.0)
+    monkeypatch.setattr(db, "replica_router", router)
+
+    res = await async_client.get(
+        "/todo/list",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+
+    assert res.status_code == status.HTTP_200_OK
+    assert not router.is_healthy(0)
+
+
+@pytest.mark.asyncio
+async def test_read_your_writes_tracker() -> None:
+    """書き込みの記録が、保持時間の間だけ残るかテスト"""
+    tracker = ReadYourWritesTracker(MemoryBackend(10), "test", 0.05)
+    await tracker.mark_write("user")
+    await tracker.mark_write(None)
+
+    assert await tracker.has_recent_write("user")
+    assert not await tracker.has_recent_write("other")
+    assert not await tracker.has_recent_write(None)
+
+    await asyncio.sleep(0.06)
+
+    assert not await tracker.has_recent_write("user")
+
+
+@pytest.mark.asyncio
+async def test_read_your_writes_tracker_max_size() -> None:
+    """上限件数を超えた場合に、古い記録から削除されるかテスト"""
+    backend = MemoryBackend(2)
+    tracker = ReadYourWritesTracker(backend, "test", 60.0)
+    for user_key in ("a", "b", "c"):
+        await tracker.mark_write(user_key)
+
+    assert len(backend._entries) == 2
+    assert not await tracker.has_recent_write("a")
+    assert await tracker.has_recent_write("c")
+
+
+@pytest.mark.asyncio
+async def test_read_your_writes_tracker_backend_error() -> None:
+    """バックエンドの操作に失敗した場合に、プライマリから読み取らせるかテスト"""
+    tracker = ReadYourWritesTracker(FailingBackend(10), "test", 60.0)
+    await tracker.mark_write("user")
+
+    assert await tracker.has_recent_write("user")
+
+
+def test_get_token_subject() -> None:
+    """トークンが異なっても、同じユーザーであれば同じ識別子になるかテスト"""
+    first = create_access_token("user")
+    second = create_access_token("user")
+
+    assert get_token_subject(f"Bearer {first}") == "user"
+    assert get_token_subject(f"Bearer {second}") == "user"
+    assert get_token_subject("Bearer invalid") is None
+    assert get_token_subject(None) is None
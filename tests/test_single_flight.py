@@ -0,0 +1,109 @@
+"""同時実行をまとめる処理のテスト定義ファイル"""
+import asyncio
+import json
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.cache.cache import cache
+from api.cache.single_flight import SingleFlight
+from api.exceptions import status_4xx
+from api.schemas import todo as todo_schemas
+from api.services import todo as todo_services
+from api.settings import constant
+from tests.conftest import async_test_read_session
+from tests.constant import TEST_TODO_TITLE
+
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_result_and_exception() -> None:
+    """同じキーの同時実行が1回にまとめられ、結果と例外が共有されるかテスト"""
+    flight = SingleFlight()
+    calls = 0
+
+    async def load() -> int:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    async def fail() -> int:
+        await asyncio.sleep(0.01)
+        raise ValueError
+
+    results = await asyncio.gather(*(flight.do("key", load) for _ in range(5)))
+    errors = await asyncio.gather(
+        *(flight.do("key", fail) for _ in range(3)),
+        return_exceptions=True,
+    )
+
+    assert results == [(1, False)] + [(1, True)] * 4
+    assert all(isinstance(e, ValueError) for e in errors)
+    assert len(flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_single_flight_retries_after_leader_cancelled() -> None:
+    """先に実行した呼び出し元がキャンセルされた場合に、待っていた呼び出し元が改めて実行するかテスト"""
+    flight = SingleFlight()
+
+    async def load() -> str:
+        await asyncio.sleep(0.01)
+        return "value"
+
+    leader = asyncio.create_task(flight.do("key", load))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flight.do("key", load))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == ("value", False)
+    assert leader.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_read_todo_page_json_coalesced(factory_todo: None) -> None:
+    """同じページの同時の取得が、1回のDBへの問い合わせにまとめられるかテスト"""
+    namespace = constant.CACHE_NAMESPACE_TODO_LIST
+    coalesced = cache.metrics.coalesced.get(namespace, 0)
+    list_filter = todo_schemas.TodoListFilter()
+
+    async def read() -> bytes:
+        session: AsyncSession
+        async with async_test_read_session() as session:
+            return await todo_services.read_todo_page_json(
+                1,
+                1,
+                list_filter,
+                10,
+                None,
+                session,
+            )
+
+    pages = await asyncio.gather(*(read() for _ in range(5)))
+
+    assert len(set(pages)) == 1
+    assert json.loads(pages[0])["items"][0]["title"] == TEST_TODO_TITLE
+    assert cache.metrics.coalesced[namespace] - coalesced == 4
+
+
+@pytest.mark.asyncio
+async def test_read_todo_detail_json_shares_not_found() -> None:
+    """存在しないTodoの同時の取得で、全ての呼び出し元に例外が共有されるかテスト"""
+
+    async def read() -> bytes:
+        session: AsyncSession
+        async with async_test_read_session() as session:
+            return await todo_services.read_todo_detail_json(
+                1,
+                1,
+                0,
+                session,
+            )
+
+    errors = await asyncio.gather(
+        *(read() for _ in range(3)),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(e, status_4xx.NotFoundException) for e in errors)
@@ -1,4 +1,6 @@
 """Todo関連のテスト定義ファイル"""
+import json
+
 import pytest
 from httpx import AsyncClient
 from starlette import status
@@ -45,6 +47,102 @@ async def test_read_todo_list(
     assert res.status_code == status.HTTP_200_OK
 
 
+@pytest.mark.asyncio
+async def test_read_todo_list_with_cursor(
+    async_client: AsyncClient,
+    access_token: str,
+) -> None:
+    """Todo一覧をカーソルでページごとに取得できるかテスト"""
+    headers = {"Authorization": f"Bearer {access_token}"}
+    for due_date in ["2030-01-03", "2030-01-01", "2030-01-02"]:
+        await async_client.post(
+            "/todo/create",
+            json={
+                "title": TEST_TODO_TITLE,
+                "detail": TEST_TODO_DETAIL,
+                "due_date": due_date,
+            },
+            headers=headers,
+        )
+
+    params: dict[str, str | int] = {"limit": 2, "order_by": "due_date"}
+    res = await async_client.get("/todo/list", params=params, headers=headers)
+    first_page = res.json()
+    res = await async_client.get(
+        "/todo/list",
+        params={**params, "cursor": first_page["next_cursor"]},
+        headers=headers,
+    )
+    second_page = res.json()
+
+    assert res.status_code == status.HTTP_200_OK
+    assert [todo["due_date"] for todo in first_page["items"]] == [
+        "2030-01-01",
+        "2030-01-02",
+    ]
+    assert [todo["due_date"] for todo in second_page["items"]] == [
+        "2030-01-03"
+    ]
+    assert second_page["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_search_todos(
+    async_client: AsyncClient,
+    access_token: str,
+) -> None:
+    """Todoを一致度の高い順に、カーソルでページごとに検索できるかテスト"""
+    headers = {"Authorization": f"Bearer {access_token}"}
+    await async_client.post(
+        "/todo/bulk/create",
+        json=[
+            {"title": "buy milk", "detail": "at the store", "due_date": date}
+            for date in ["2030-01-01", "2030-01-02"]
+        ]
+        + [
+            {"title": "shopping", "detail": "milk", "due_date": "2030-01-03"},
+            {"title": "laundry", "detail": "towels", "due_date": "2030-01-04"},
+        ],
+        headers=headers,
+    )
+
+    params: dict[str, str | int] = {"q": "milk", "limit": 2}
+    res = await async_client.get(
+        "/todo/search", params=params, headers=headers
+    )
+    first_page = res.json()
+    res = await async_client.get(
+        "/todo/search",
+        params={**params, "cursor": first_page["next_cursor"]},
+        headers=headers,
+    )
+    second_page = res.json()
+
+    assert res.status_code == status.HTTP_200_OK
+    assert [todo["due_date"] for todo in first_page["items"]] == [
+        "2030-01-01",
+        "2030-01-02",
+    ]
+    assert [todo["title"] for todo in second_page["items"]] == ["shopping"]
+    assert second_page["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_stream_todo_list(
+    async_client: AsyncClient,
+    access_token: str,
+    factory_todo: None,
+) -> None:
+    """Todo一覧をストリーミングで取得できるかテスト"""
+    res = await async_client.get(
+        "/todo/list/stream",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    todos = [json.loads(line) for line in res.text.splitlines()]
+    assert res.status_code == status.HTTP_200_OK
+    assert [todo["title"] for todo in todos] == [TEST_TODO_TITLE]
+
+
 @pytest.mark.asyncio
 async def test_read_todo_detail(
     async_client: AsyncClient,
@@ -59,6 +157,51 @@ async def test_read_todo_detail(
     assert res.status_code == status.HTTP_200_OK
 
 
+@pytest.mark.asyncio
+async def test_read_todo_detail_not_modified(
+    async_client: AsyncClient,
+    access_token: str,
+    factory_todo: None,
+) -> None:
+    """ETagが一致する場合に304を返すかテスト"""
+    headers = {"Authorization": f"Bearer {access_token}"}
+    res = await async_client.get("/todo/detail/1", headers=headers)
+    etag = res.headers["ETag"]
+
+    res = await async_client.get(
+        "/todo/detail/1",
+        headers={**headers, "If-None-Match": etag},
+    )
+    assert res.status_code == status.HTTP_304_NOT_MODIFIED
+    assert res.headers["ETag"] == etag
+    assert res.content == b""
+
+
+@pytest.mark.asyncio
+async def test_read_todo_list_etag_changes_on_write(
+    async_client: AsyncClient,
+    access_token: str,
+    factory_todo: None,
+) -> None:
+    """Todoを変更するとETagが変わるかテスト"""
+    headers = {"Authorization": f"Bearer {access_token}"}
+    res = await async_client.get("/todo/list", headers=headers)
+    etag = res.headers["ETag"]
+
+    await async_client.patch(
+        "/todo/update/1",
+        json={"done": True},
+        headers=headers,
+    )
+    res = await async_client.get(
+        "/todo/list",
+        headers={**headers, "If-None-Match": etag},
+    )
+    assert res.status_code == status.HTTP_200_OK
+    assert res.headers["ETag"] != etag
+    assert res.json()["items"][0]["done"] is True
+
+
 @pytest.mark.asyncio
 async def test_update_todo(
     async_client: AsyncClient,
@@ -79,6 +222,20 @@ async def test_update_todo(
     assert res.status_code == status.HTTP_200_OK
 
 
+@pytest.mark.asyncio
+async def test_update_todo_not_found(
+    async_client: AsyncClient,
+    access_token: str,
+) -> None:
+    """存在しないTodoを更新すると404になるかテスト"""
+    res = await async_client.patch(
+        "/todo/update/1",
+        json={"title": TEST_UPDATE_TODO_TITLE},
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert res.status_code == status.HTTP_404_NOT_FOUND
+
+
 @pytest.mark.asyncio
 async def test_delete_todo(
     async_client: AsyncClient,
@@ -91,3 +248,83 @@ async def test_delete_todo(
         headers={"Authorization": f"Bearer {access_token}"},
     )
     assert res.status_code == status.HTTP_204_NO_CONTENT
+
+
+@pytest.mark.asyncio
+async def test_delete_todo_not_found(
+    async_client: AsyncClient,
+    access_token: str,
+) -> None:
+    """存在しないTodoを削除すると404になるかテスト"""
+    res = await async_client.delete(
+        "/todo/delete/1",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert res.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_create_todos(
+    async_client: AsyncClient,
+    access_token: str,
+) -> None:
+    """Todoを一括作成できるかテスト"""
+    res = await async_client.post(
+        "/todo/bulk/create",
+        json=[
+            {
+                "title": TEST_TODO_TITLE,
+                "detail": TEST_TODO_DETAIL,
+                "due_date": due_date,
+            }
+            for due_date in [TEST_TODO_DUE_DATE, TEST_UPDATE_TODO_DUE_DATE]
+        ],
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert res.status_code == status.HTTP_201_CREATED
+    assert [todo["due_date"] for todo in res.json()] == [
+        TEST_TODO_DUE_DATE,
+        TEST_UPDATE_TODO_DUE_DATE,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_update_todos(
+    async_client: AsyncClient,
+    access_token: str,
+    factory_todo: None,
+) -> None:
+    """Todoを一括更新できるかテスト"""
+    res = await async_client.patch(
+        "/todo/bulk/update",
+        json=[
+            {"id": 1, "title": TEST_UPDATE_TODO_TITLE},
+            {"id": 2, "done": TEST_UPDATE_DONE},
+        ],
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    results = res.json()
+    assert res.status_code == status.HTTP_200_OK
+    assert results[0]["status"] == status.HTTP_200_OK
+    assert results[0]["todo"]["title"] == TEST_UPDATE_TODO_TITLE
+    assert results[0]["todo"]["detail"] == TEST_TODO_DETAIL
+    assert results[1]["status"] == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_delete_todos(
+    async_client: AsyncClient,
+    access_token: str,
+    factory_todo: None,
+) -> None:
+    """Todoを一括削除できるかテスト"""
+    res = await async_client.post(
+        "/todo/bulk/delete",
+        json=[1, 2],
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert res.status_code == status.HTTP_200_OK
+    assert [result["status"] for result in res.json()] == [
+        status.HTTP_204_NO_CONTENT,
+        status.HTTP_404_NOT_FOUND,
+    ]
@@ -1,8 +1,17 @@
 """ユーザー関連のテスト定義ファイル"""
+from typing import Any
+
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import event
 from starlette import status
 
+from api.database import db
+from api.database.db import run_after_commit
+from api.schemas import user as user_schemas
+from api.services import user as user_services
+from api.services.token_cache import token_cache
+from tests.conftest import async_test_engine, async_test_session
 from tests.constant import (
     TEST_UPDATE_USER_EMAIL,
     TEST_UPDATE_USER_NAME,
@@ -58,6 +67,24 @@ async def test_update_user(
     assert res.status_code == status.HTTP_200_OK
 
 
+@pytest.mark.asyncio
+async def test_read_user_me_after_update(
+    async_client: AsyncClient,
+    access_token: str,
+) -> None:
+    """更新後のログインユーザーを取得できるかテスト"""
+    headers = {"Authorization": f"Bearer {access_token}"}
+    await async_client.get("/user/me", headers=headers)
+    await async_client.patch(
+        "/user/update",
+        json={"email": TEST_UPDATE_USER_EMAIL},
+        headers=headers,
+    )
+    res = await async_client.get("/user/me", headers=headers)
+    assert res.status_code == status.HTTP_200_OK
+    assert res.json()["email"] == TEST_UPDATE_USER_EMAIL
+
+
 @pytest.mark.asyncio
 async def test_delete_user(
     async_client: AsyncClient,
@@ -69,3 +96,72 @@ async def test_delete_user(
         headers={"Authorization": f"Bearer {access_token}"},
     )
     assert res.status_code == status.HTTP_204_NO_CONTENT
+
+
+@pytest.mark.asyncio
+async def test_token_cache_invalidated_after_commit(
+    access_token: str,
+) -> None:
+    """コミット前の行を同時のリクエストがキャッシュしても、コミット後に削除されるかテスト"""
+    async with async_test_session() as session:
+        user_me = await user_services.get_user_me_by_token(
+            access_token,
+            session,
+        )
+    token_cache.clear()
+
+    async with async_test_session() as session:
+        await user_services.update_user(
+            user_me,
+            user_schemas.UserUpdate(username=TEST_UPDATE_USER_NAME),
+            session,
+        )
+        async with async_test_session() as concurrent_session:
+            await user_services.get_user_me_by_token(
+                access_token,
+                concurrent_session,
+            )
+        assert token_cache.get(access_token) is not None
+
+        await session.commit()
+        await run_after_commit(session)
+
+    assert token_cache.get(access_token) is None
+
+
+@pytest.mark.asyncio
+async def test_commit_only_writes(
+    async_client: AsyncClient,
+    access_token: str,
+) -> None:
+    """読み取りのみのリクエストではCOMMITせず、書き込みのみCOMMITするかテスト"""
+    commits: list[Any] = []
+
+    def count_commit(conn: Any) -> None:
+        commits.append(conn)
+
+    event.listen(async_test_engine.sync_engine, "commit", count_commit)
+    try:
+        headers = {"Authorization": f"Bearer {access_token}"}
+        res = await async_client.post(
+            "/token",
+            data={"username": TEST_USER_NAME, "password": TEST_USER_PASSWORD},
+        )
+        assert res.status_code == status.HTTP_200_OK
+        res = await async_client.get("/user/me", headers=headers)
+        assert res.status_code == status.HTTP_200_OK
+
+        assert commits == []
+        assert not await db.read_your_writes.has_recent_write(TEST_USER_NAME)
+
+        res = await async_client.patch(
+            "/user/update",
+            json={"email": TEST_UPDATE_USER_EMAIL},
+            headers=headers,
+        )
+        assert res.status_code == status.HTTP_200_OK
+
+        assert len(commits) == 1
+        assert await db.read_your_writes.has_recent_write(TEST_USER_NAME)
+    finally:
+        event.remove(async_test_engine.sync_engine, "commit", count_commit)